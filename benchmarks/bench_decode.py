@@ -0,0 +1,100 @@
+"""
+Alpaca bar decoding: SDK models + DataFrame-of-dicts (previous path) vs the
+columnar raw decoder in src.data._raw_bars_to_frame.
+
+    python benchmarks/bench_decode.py [--repeat 3]
+
+Runs offline on synthetic raw payloads shaped like the v2 bars endpoint
+(year of 1m and 15m bars, extended hours included).
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.data import _raw_bars_to_frame
+
+try:
+    from alpaca.data.models import BarSet
+    HAVE_ALPACA_MODELS = True
+except Exception:
+    HAVE_ALPACA_MODELS = False
+
+
+def synthetic_raw(symbol: str, minutes: int, days: int = 252, seed: int = 0):
+    """Raw {symbol: [bar dict, ...]} for `days` sessions of 04:00-20:00 ET bars."""
+    rng = np.random.default_rng(seed)
+    sessions = pd.bdate_range("2024-01-02", periods=days)
+    per_day = (16 * 60) // minutes
+    offs = pd.to_timedelta(np.arange(per_day) * minutes + 9 * 60, unit="min")  # 04:00 ET == 09:00 UTC
+    ts = (sessions.values[:, None] + offs.values[None, :]).ravel()
+    n = len(ts)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    opn = np.r_[close[0], close[:-1]]
+    high = np.maximum(opn, close) * (1 + rng.uniform(0, 1e-3, n))
+    low = np.minimum(opn, close) * (1 - rng.uniform(0, 1e-3, n))
+    vol = rng.integers(100, 100_000, n)
+    stamps = pd.DatetimeIndex(ts).strftime("%Y-%m-%dT%H:%M:%SZ")
+    rows = [
+        {"t": t, "o": o, "h": h, "l": lo, "c": c, "v": int(v), "n": 10, "vw": c}
+        for t, o, h, lo, c, v in zip(stamps, opn, high, low, close, vol)
+    ]
+    return {symbol: rows}
+
+
+def legacy_decode(raw, symbol: str) -> pd.DataFrame:
+    """The pre-columnar path: BarSet models -> list of __dict__ -> rename/set_index/sort/dropna."""
+    bars = BarSet(raw)
+    df = pd.DataFrame([b.__dict__ for b in bars.data[symbol]])
+    rename_map = {"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume", "t": "timestamp"}
+    for src, dst in rename_map.items():
+        if src in df.columns and dst not in df.columns:
+            df[dst] = df[src]
+    if "timestamp" in df.columns:
+        df = df.set_index(pd.to_datetime(df["timestamp"], utc=True)).tz_convert("America/New_York")
+        df = df.drop(columns=[c for c in ["timestamp"] if c in df.columns])
+    cols = [c for c in ["open", "high", "low", "close", "volume"] if c in df.columns]
+    df = df[cols].sort_index()
+    return df.dropna()
+
+
+def columnar_decode(raw, symbol: str) -> pd.DataFrame:
+    return _raw_bars_to_frame(raw[symbol])
+
+
+def measure(fn, raw, symbol: str, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(raw, symbol)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    out = fn(raw, symbol)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak, out
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    print(f"{'case':<10} {'bars':>8} {'path':<9} {'best_s':>8} {'peak_MB':>9}")
+    for label, minutes in (("1y@1m", 1), ("1y@15m", 15)):
+        raw = synthetic_raw("SYN", minutes)
+        n = len(raw["SYN"])
+        new_t, new_peak, new_df = measure(columnar_decode, raw, "SYN", args.repeat)
+        if HAVE_ALPACA_MODELS:
+            old_t, old_peak, old_df = measure(legacy_decode, raw, "SYN", args.repeat)
+            pd.testing.assert_frame_equal(new_df, old_df, check_names=False, check_dtype=False)
+            print(f"{label:<10} {n:>8} {'legacy':<9} {old_t:>8.3f} {old_peak / 2**20:>9.1f}")
+        print(f"{label:<10} {n:>8} {'columnar':<9} {new_t:>8.3f} {new_peak / 2**20:>9.1f}")
+        if HAVE_ALPACA_MODELS:
+            print(f"{'':<10} {'':>8} {'speedup':<9} {old_t / new_t:>7.1f}x {old_peak / new_peak:>8.1f}x less")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Portfolio equity from per-symbol curves: dense per-bar Series aligned with
+`pd.concat(...).ffill().mean(axis=1)` (previous `BacktestEngine.run`)
+against change-point `SparseEquity` curves and `portfolio_mean`.
+
+    python benchmarks/bench_equity.py [--symbols 500] [--years 5] [--trades 200]
+
+Runs offline on synthetic 15m RTH timestamps; each symbol's curve moves on
+`--trades` random bars a year.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.equity import SparseEquity, portfolio_mean
+from benchmarks.bench_simulate import synthetic_bars
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbols", type=int, default=500)
+    p.add_argument("--years", type=int, default=5)
+    p.add_argument("--trades", type=int, default=200)
+    args = p.parse_args()
+
+    index = synthetic_bars(args.years, 0).index
+    dense = []
+    for k in range(args.symbols):
+        rng = np.random.default_rng(k)
+        steps = np.ones(len(index))
+        hits = rng.integers(1, len(index), args.trades * args.years)
+        steps[hits] = 1 + rng.normal(0, 0.01, len(hits))
+        a = int(rng.integers(0, len(index) // 4))   # staggered listings
+        dense.append(pd.Series(np.cumprod(steps[a:]), index=index[a:]))
+
+    t0 = time.perf_counter()
+    ref = pd.concat(dense, axis=1).ffill().fillna(1.0).mean(axis=1)
+    t_dense = time.perf_counter() - t0
+
+    sparse = [SparseEquity.from_series(s) for s in dense]
+    t0 = time.perf_counter()
+    out = portfolio_mean(sparse, ref.index)
+    t_sparse = time.perf_counter() - t0
+
+    mb_dense = sum(s.memory_usage(index=True) for s in dense) / 2**20
+    mb_sparse = sum(c.ts.nbytes + c.values.nbytes for c in sparse) / 2**20
+    print(f"{'':>8} {'curves MB':>10} {'aggregate s':>12}")
+    print(f"{'dense':>8} {mb_dense:>10.1f} {t_dense:>12.3f}")
+    print(f"{'sparse':>8} {mb_sparse:>10.1f} {t_sparse:>12.3f}")
+    print(f"max abs diff {np.abs(out.to_numpy() - ref.to_numpy()).max():.2e}")
+
+
+if __name__ == "__main__":
+    main()
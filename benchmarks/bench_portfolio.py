@@ -0,0 +1,47 @@
+"""
+Portfolio simulation (`simulate_portfolio`) over a large universe: one
+merged timeline, shared capital and the live portfolio limits.
+
+    python benchmarks/bench_portfolio.py [--symbols 300] [--years 1]
+
+Runs offline on synthetic 15m RTH bars with ~20% of bars signalling LONG
+(signals are precomputed, so only the merge and the event loop are timed).
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.portfolio_sim import simulate_portfolio
+from src.config import load_config
+from src.strategy import Signal
+from benchmarks.bench_simulate import synthetic_bars
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--symbols", type=int, default=300)
+    p.add_argument("--years", type=int, default=1)
+    args = p.parse_args()
+
+    cfg = load_config("config.yaml")
+    cfg.risk.spread_bps_max = 1e9   # synthetic bars are wider than the live spread filter
+    frames, sigs = {}, {}
+    for k in range(args.symbols):
+        df = synthetic_bars(args.years, k)
+        frames[f"S{k:03d}"] = df
+        sigs[f"S{k:03d}"] = pd.Series(np.where(np.random.default_rng(k).random(len(df)) < 0.2, Signal.LONG, Signal.NONE),
+                                      index=df.index)
+    start = str(next(iter(frames.values())).index[0].date())
+
+    t0 = time.perf_counter()
+    eq, tl, _ = simulate_portfolio(cfg, frames, start, sigs)
+    dt = time.perf_counter() - t0
+    n = sum(len(df) for df in frames.values())
+    print(f"{'symbols':>8} {'bars':>10} {'stamps':>8} {'trades':>7} {'secs':>7} {'bars/s':>10}")
+    print(f"{args.symbols:>8} {n:>10} {len(eq):>8} {len(tl):>7} {dt:>7.2f} {n / dt:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+BacktestEngine.simulate_symbol: the per-bar `df.iloc` loop (previous path)
+vs the array path, `simulate_resolved` (numba-compiled when available).
+
+    python benchmarks/bench_simulate.py [--years 3] [--symbols 5] [--repeat 3]
+
+Runs offline on synthetic 15m RTH bars with ~20% of bars signalling LONG,
+and checks equity curves and trade logs are bit-identical.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.engine import BacktestEngine
+from src.config import load_config
+from src.indicators import atr
+from src.kernels import HAVE_NUMBA
+from src.strategy import Signal
+from tests.conftest import bar_index, legacy_simulate, ohlcv
+
+
+def synthetic_bars(years: int, seed: int) -> pd.DataFrame:
+    return ohlcv(bar_index(sessions=252 * years, start="2021-01-04"), seed)
+
+
+def best_of(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--years", type=int, default=3)
+    p.add_argument("--symbols", type=int, default=5)
+    p.add_argument("--repeat", type=int, default=3)
+    args = p.parse_args()
+
+    cfg = load_config("config.yaml")
+    engine = BacktestEngine(cfg, None)
+    data = []
+    for k in range(args.symbols):
+        df = synthetic_bars(args.years, k)
+        sig = pd.Series(np.where(np.random.default_rng(k).random(len(df)) < 0.2, Signal.LONG, Signal.NONE), index=df.index)
+        data.append((df, sig, atr(df, 14).bfill().ffill()))
+    start = str(data[0][0].index[0].date())
+    if HAVE_NUMBA:  # compile outside the timed region
+        engine.simulate_symbol("SYN", start, start, df=data[0][0].iloc[:50], sig=data[0][1].iloc[:50])
+
+    old_t, old = best_of(lambda: [legacy_simulate(df, sig, a, cfg) for df, sig, a in data], 1)
+    new_t, new = best_of(lambda: [engine.simulate_symbol("SYN", start, start, df=df, sig=sig) for df, sig, _ in data],
+                         args.repeat)
+    for (oe, ot), (ne, nt) in zip(old, new):
+        pd.testing.assert_series_equal(ne, oe, check_exact=True)
+        pd.testing.assert_frame_equal(nt, ot, check_exact=True)
+    n = sum(len(d[0]) for d in data)
+    print(f"{'path':<12} {'bars':>9} {'best_s':>8}")
+    print(f"{'iloc loop':<12} {n:>9} {old_t:>8.3f}")
+    print(f"{'arrays':<12} {n:>9} {new_t:>8.3f}   (numba={'on' if HAVE_NUMBA else 'off'}, incl. signal/ATR prep)")
+    print(f"{'speedup':<12} {'':>9} {old_t / new_t:>7.1f}x  (equity + trade log bit-identical)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""
+Microbenchmark suite with JSON baselines: indicators, signals, sizing, the
+HTF regime, the backtest loop and the portfolio limits.
+
+    python benchmarks/suite.py [--full] [--only ema,adx] [--repeat 5]
+                               [--baseline benchmarks/baseline.json] [--save] [--threshold 0.25]
+
+Runs offline on synthetic 15m RTH OHLCV. Bar-count cases run at 1k and 100k
+bars (and 1M with `--full`); symbol-count cases at 10 and 100 symbols (and
+1,000 with `--full`). Each case reports its best-of-`--repeat` wall time.
+Untagged frames bypass the indicator cache, so every repeat recomputes.
+
+`--save` writes the results to `--baseline`. Baselines only compare on the
+same machine, so save one per machine. Otherwise, when the baseline file
+exists, every case slower than baseline * (1 + `--threshold`) is flagged
+and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.backtest.engine import BacktestEngine
+from src.config import load_config
+from src.indicators import adx, atr, ema, rsi
+from src.kernels import HAVE_NUMBA
+from src.portfolio import enforce_portfolio_limits
+from src.regime import compute_htf_regime
+from src.risk import position_size
+from src.strategy import Signal, compute_signals
+from tests.conftest import bar_index, ohlcv
+
+BAR_SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+SYMBOL_COUNTS = {"10": 10, "100": 100, "1000": 1_000}
+QUICK = ("1k", "100k", "10", "100")
+BARS_PER_SYMBOL = 500   # bars of each frame in the symbol-count cases
+NOISE_FLOOR = 1e-4      # seconds; smaller slowdowns are timer noise, never flagged
+
+
+def synthetic_ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    """`n` 15m RTH bars (26 per session) of a lognormal walk."""
+    return ohlcv(bar_index(n, start="2000-01-03"), seed, volume=None)
+
+
+@dataclass
+class Case:
+    name: str
+    size: str
+    setup: Callable[[], Callable[[], object]]   # builds inputs, returns the timed call
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}[{self.size}]"
+
+
+def _cases(cfg, sizes: Tuple[str, ...]) -> List[Case]:
+    engine = BacktestEngine(cfg, None)
+    out: List[Case] = []
+    for size in (s for s in BAR_SIZES if s in sizes):
+        n = BAR_SIZES[size]
+        out += [
+            _on_bars("ema", size, lambda df: ema(df["close"], 21)),
+            _on_bars("rsi", size, lambda df: rsi(df["close"], 14)),
+            _on_bars("atr", size, lambda df: atr(df, 14)),
+            _on_bars("adx", size, lambda df: adx(df, 14)),
+            _on_bars("compute_signals", size, lambda df: compute_signals(df, cfg)),
+            _on_bars("compute_htf_regime", size,
+                     lambda df: compute_htf_regime(df, cfg.regime.trend_adx_min, cfg.regime.chop_adx_max)),
+            Case("simulate_symbol", size, lambda n=n: _simulate(engine, synthetic_ohlcv(n))),
+        ]
+    for size in (s for s in SYMBOL_COUNTS if s in sizes):
+        k = SYMBOL_COUNTS[size]
+        out += [
+            Case("position_size", size, lambda k=k: _sizing(cfg, k)),
+            Case("enforce_portfolio_limits", size, lambda k=k: _limits(cfg, k)),
+        ]
+    return out
+
+
+def _on_bars(name: str, size: str, fn: Callable[[pd.DataFrame], object]) -> Case:
+    def setup():
+        df = synthetic_ohlcv(BAR_SIZES[size])
+        return lambda: fn(df)
+    return Case(name, size, setup)
+
+
+def _simulate(engine: BacktestEngine, df: pd.DataFrame) -> Callable[[], object]:
+    sig = pd.Series(np.where(np.random.default_rng(1).random(len(df)) < 0.2, Signal.LONG, Signal.NONE), index=df.index)
+    start = str(df.index[0].date())
+    engine.simulate_symbol("SYN", start, start, df=df.iloc[:50], sig=sig.iloc[:50])   # numba compile, untimed
+    return lambda: engine.simulate_symbol("SYN", start, start, df=df, sig=sig)
+
+
+def _sizing(cfg, k: int) -> Callable[[], object]:
+    frames = [synthetic_ohlcv(BARS_PER_SYMBOL, seed) for seed in range(k)]
+    return lambda: [position_size(cfg, df, float(df["close"].iloc[-1]), 100_000.0) for df in frames]
+
+
+def _limits(cfg, k: int) -> Callable[[], object]:
+    rng = np.random.default_rng(k)
+    open_pos = {f"O{i:04d}": float(v) for i, v in enumerate(rng.uniform(100.0, 2_000.0, k))}
+    proposed = [f"P{i:04d}" for i in range(k)]
+    return lambda: enforce_portfolio_limits(cfg, open_pos, proposed, 1e9)
+
+
+def time_case(case: Case, repeat: int) -> float:
+    fn = case.setup()
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def is_regression(now: float, base: Optional[float], threshold: float) -> bool:
+    return base is not None and now > base * (1 + threshold) and now - base > NOISE_FLOOR
+
+
+def meta() -> Dict[str, str]:
+    return {"python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+            "numba": str(HAVE_NUMBA), "machine": platform.machine(), "node": platform.node(),
+            "when": pd.Timestamp.now("UTC").isoformat(timespec="seconds")}
+
+
+def main():
+    p = argparse.ArgumentParser()
+    p.add_argument("--full", action="store_true", help="add 1M bars and 1,000 symbols")
+    p.add_argument("--only", default="", help="comma-separated case names")
+    p.add_argument("--repeat", type=int, default=5)
+    p.add_argument("--baseline", default=str(Path(__file__).with_name("baseline.json")))
+    p.add_argument("--save", action="store_true", help="write results as the new baseline")
+    p.add_argument("--threshold", type=float, default=0.25, help="flag cases this much slower than baseline")
+    args = p.parse_args()
+
+    cfg = load_config("config.yaml")
+    sizes = tuple(BAR_SIZES) + tuple(SYMBOL_COUNTS) if args.full else QUICK
+    only = {s.strip() for s in args.only.split(",") if s.strip()}
+    cases = [c for c in _cases(cfg, sizes) if not only or c.name in only]
+
+    path = Path(args.baseline)
+    base = json.loads(path.read_text())["results"] if path.exists() and not args.save else {}
+    results: Dict[str, float] = {}
+    regressions = []
+    print(f"{'case':<34} {'best_s':>10} {'base_s':>10} {'ratio':>7}")
+    for case in cases:
+        now = results[case.key] = time_case(case, args.repeat)
+        ref = base.get(case.key)
+        flag = is_regression(now, ref, args.threshold)
+        if flag:
+            regressions.append(case.key)
+        ratio = f"{now / ref:>6.2f}x" if ref else f"{'-':>7}"
+        print(f"{case.key:<34} {now:>10.5f} {ref if ref else float('nan'):>10.5f} {ratio}{'  REGRESSION' if flag else ''}")
+
+    if args.save:
+        old = json.loads(path.read_text())["results"] if path.exists() else {}
+        path.write_text(json.dumps({"meta": meta(), "results": {**old, **results}}, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written: {path}")
+    elif regressions:
+        print(f"{len(regressions)} regression(s) beyond +{args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
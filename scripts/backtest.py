@@ -4,11 +4,13 @@ from pathlib import Path
 from typing import Dict, Any, List
 
 import numpy as np
+import pandas as pd
 
 from src.config import load_config
 from src.logging_utils import get_logger
-from src.backtest.engine import BacktestEngine
+from src.backtest.engine import BacktestEngine, periods_per_year
 from src.backtest.metrics import summarize_metrics
+from src.backtest.montecarlo import METHODS, monte_carlo, portfolio_returns
 from src.utils import read_tickers_file
 
 
@@ -17,6 +19,12 @@ def parse_args():
     p.add_argument("--config", required=True)
     p.add_argument("--start", required=True)
     p.add_argument("--end", required=True)
+    p.add_argument("--chunk-days", type=int, default=None, help="stream the range in N-day chunks (bounded memory)")
+    p.add_argument("--portfolio", action="store_true", help="shared capital under the live portfolio limits")
+    p.add_argument("--mc-paths", type=int, default=0, help="Monte Carlo paths over the trade log (0 = off; needs --portfolio)")
+    p.add_argument("--mc-method", choices=METHODS, default="iid", help="iid / block bootstrap of the trades, or shuffled order")
+    p.add_argument("--mc-block", type=int, default=5, help="block length for --mc-method block")
+    p.add_argument("--workers", type=int, default=None, help="processes to simulate symbols on (default: backtest.workers)")
     return p.parse_args()
 
 
@@ -51,6 +59,15 @@ def _render_per_symbol_table(per_symbol: Dict[str, Dict[str, Any]]) -> str:
     return "\n".join(lines) + "\n"
 
 
+def _render_monte_carlo(bands, n_paths: int, method: str) -> str:
+    formats = {"final_equity": "{:.4f}".format, "max_drawdown": _format_pct, "sharpe": "{:.2f}".format}
+    lines = [f"{'Metric':<13} " + " ".join(f"{c:>9}" for c in bands.columns)]
+    for name, row in bands.iterrows():
+        lines.append(f"{name:<13} " + " ".join(f"{formats[name](v):>9}" for v in row))
+    note = "actual = the closed trades as they happened; drawdown and Sharpe are per trade, not per bar"
+    return f"{n_paths} paths, {method}\n{note}\n" + "\n".join(lines) + "\n"
+
+
 def main():
     args = parse_args()
     cfg = load_config(args.config)
@@ -65,11 +82,19 @@ def main():
     outdir = Path(cfg.reporting.outdir)
     outdir.mkdir(parents=True, exist_ok=True)
 
+    if args.chunk_days is not None:
+        cfg.backtest.chunk_days = args.chunk_days
+    if args.portfolio:
+        cfg.backtest.portfolio = True
+    if args.mc_paths > 0 and not cfg.backtest.portfolio:
+        # per-symbol logs compound each symbol on its own and carry no times
+        raise SystemExit("--mc-paths needs --portfolio: only the shared-capital trade log is one account in time order")
+
     engine = BacktestEngine(cfg, logger)
-    equity_curve, trade_log, per_symbol = engine.run(tickers, args.start, args.end)
+    equity_curve, trade_log, per_symbol = engine.run(tickers, args.start, args.end, workers=args.workers)
 
     # Portfolio-level summary (existing function)
-    portfolio_report = summarize_metrics(equity_curve, trade_log)
+    portfolio_report = summarize_metrics(equity_curve, trade_log, periods_per_year(cfg))
 
     # Per-symbol table
     per_symbol_section = _render_per_symbol_table(per_symbol)
@@ -81,6 +106,12 @@ def main():
         + "--- Per Ticker Performance ---\n"
         + per_symbol_section
     )
+    if args.mc_paths > 0 and not trade_log.empty:
+        years = max((pd.Timestamp(args.end) - pd.Timestamp(args.start)).days / 365.25, 1 / 365.25)
+        trades = portfolio_returns(trade_log, cfg.backtest.initial_equity)
+        mc = monte_carlo(trades, args.mc_paths, args.mc_method, args.mc_block, trades_per_year=len(trades) / years,
+                         seed=cfg.general.seed, column="ret", risk_per_r=1.0)
+        report += "\n--- Monte Carlo (shared-capital trade returns) ---\n" + _render_monte_carlo(mc.bands(), args.mc_paths, args.mc_method)
 
     report_path = outdir / "backtest_report.txt"
     report_path.write_text(report)
@@ -0,0 +1,92 @@
+"""
+Parameter sweep over StrategyCfg. Bars are downloaded once and each
+distinct indicator is computed once for the whole grid.
+
+    python scripts/sweep.py --config config.yaml --grid grid.yaml --start 2024-01-01 --end 2024-12-31
+
+grid.yaml maps StrategyCfg fields to lists of values, e.g.
+
+    ema_fast: [5, 9, 13]
+    ema_slow: [21, 34]
+    adx_min: [18, 22, 26]
+    ema_slope_bps: [0, 6, 12]
+
+With --walk-forward the grid is re-optimized on each rolling train window
+and the winner is run on the following test window:
+
+    python scripts/sweep.py ... --walk-forward --train-days 90 --test-days 30 --workers 4
+"""
+import argparse
+import random
+from pathlib import Path
+
+import numpy as np
+
+from src.config import load_config
+from src.logging_utils import get_logger
+from src.backtest.sweep import METRICS, expand_grid, load_grid, run_sweep
+from src.backtest.walkforward import run_walk_forward
+from src.utils import read_tickers_file
+
+
+def parse_args():
+    p = argparse.ArgumentParser()
+    p.add_argument("--config", required=True)
+    p.add_argument("--grid", required=True, help="YAML of StrategyCfg field -> list of values")
+    p.add_argument("--start", required=True)
+    p.add_argument("--end", required=True)
+    p.add_argument("--rank-by", default="sharpe", choices=METRICS)
+    p.add_argument("--top", type=int, default=20, help="rows to print")
+    p.add_argument("--out", default=None, help="CSV path (default: <reporting.outdir>/sweep_results.csv)")
+    p.add_argument("--walk-forward", action="store_true", help="rolling train/test optimization instead of one sweep")
+    p.add_argument("--train-days", type=int, default=90)
+    p.add_argument("--test-days", type=int, default=30)
+    p.add_argument("--step-days", type=int, default=None, help="window step (default: --test-days)")
+    p.add_argument("--workers", type=int, default=1, help="processes for walk-forward windows")
+    return p.parse_args()
+
+
+def main():
+    args = parse_args()
+    cfg = load_config(args.config)
+    logger = get_logger("sweep")
+
+    random.seed(cfg.general.seed)
+    np.random.seed(cfg.general.seed)
+
+    tickers = read_tickers_file("tickers.txt")
+    grid = load_grid(args.grid)
+    n_combos = len(expand_grid(grid))
+    outdir = Path(cfg.reporting.outdir)
+
+    if args.walk_forward:
+        wf = run_walk_forward(
+            cfg, tickers, args.start, args.end, grid, args.train_days, args.test_days,
+            step_days=args.step_days, rank_by=args.rank_by, workers=args.workers,
+        )
+        out = Path(args.out) if args.out else outdir / "walkforward_windows.csv"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        wf.windows.to_csv(out, index=False)
+        eq_path = out.with_name("walkforward_equity.csv")
+        wf.equity.rename("equity").to_csv(eq_path)
+        logger.info({"event": "walkforward_complete", "windows": len(wf.windows), "combinations": n_combos,
+                     "results": str(out), "equity": str(eq_path)})
+        print(f"\n=== Walk-forward: {len(wf.windows)} windows x {n_combos} combinations, ranked by {args.rank_by} ===\n")
+        print(wf.windows.to_string(index=False))
+        if not wf.equity.empty:
+            print(f"\nStitched out-of-sample equity (normed): {wf.equity.iloc[-1]:.4f}")
+        return
+
+    table = run_sweep(cfg, tickers, args.start, args.end, grid, rank_by=args.rank_by)
+
+    out = Path(args.out) if args.out else outdir / "sweep_results.csv"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(out, index=False)
+    logger.info({"event": "sweep_complete", "combinations": n_combos, "tickers": len(tickers), "results": str(out)})
+
+    print(f"\n=== Sweep: {n_combos} combinations, ranked by {args.rank_by} ===\n")
+    print(table.head(args.top).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
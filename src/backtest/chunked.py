@@ -0,0 +1,204 @@
+"""
+Bounded-memory backtest: bars are pulled in time-ordered chunks of
+`backtest.chunk_days` across the whole universe, and everything that spans
+chunks is carried as state instead of history -- indicators in a
+`SignalStream` / `ATRState` per symbol, the open position in the
+`_simulate_resume` state vector, per-symbol metrics in running
+accumulators and portfolio equity as each symbol's last value. Peak memory
+follows the chunk size, not the length of the range; only the portfolio
+equity curve (one float per bar) and the trade log grow with it. Chunks
+are read past the bar store's in-memory LRU, which would otherwise keep
+every day read.
+
+The universe is fixed by the liquidity screen on the warm-up bars before
+`start` (the batch path screens on the whole range, which peeks ahead);
+every screened symbol counts in the portfolio mean from `start`, at 1.0
+until its first bar. ATR is forward-filled only -- with a full warm-up it
+is valid from the first traded bar, where the batch path's back-fill never
+reaches. The HTF regime gate is resampled from the base bars as they
+arrive; a bin still open at a chunk boundary waits for the next chunk.
+"""
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..bar_store import to_market_ts
+from ..calendar import _parse_timeframe
+from ..config import Config
+from ..data import download_ohlc_many, illiquidity_pass
+from ..resample import bar_ends, can_resample, resample_session
+from ..strategy import SignalStream
+from ..streaming import ADXState, ATRState, EMAState
+from ..warmup import REGIME_ADX, REGIME_EMA
+from .engine import SIM_STATE_SIZE, _simulate_resume, periods_per_year
+from .metrics import EquityStats, TradeStats, symbol_metrics
+
+
+class _HTFRegime:
+    """`regime.htf_regime_gate` fed base bars chunk by chunk, on streaming EMA/ADX states."""
+
+    def __init__(self, cfg: Config):
+        g = cfg.general
+        self.base_tf, self.htf_tf, self.rth_only = g.bar_timeframe, g.htf_timeframe, g.rth_only
+        self.step = _parse_timeframe(g.htf_timeframe)
+        self.trend_min, self.chop_max = cfg.regime.trend_adx_min, cfg.regime.chop_adx_max
+        self.ema_fast, self.ema_slow = (EMAState(n) for n in REGIME_EMA)
+        self.adx = ADXState(REGIME_ADX)
+        self.pending = None   # base bars of the HTF bin still open
+        self.ok = False       # regime of the last closed HTF bar
+
+    def update(self, df: pd.DataFrame) -> np.ndarray:
+        buf = df if self.pending is None else pd.concat([self.pending, df])
+        htf = resample_session(buf, self.base_tf, self.htf_tf, self.rth_only)
+        ok = np.zeros(len(htf), dtype=bool)
+        cols = (htf[k].to_numpy(dtype=np.float64).tolist() for k in ("high", "low", "close"))
+        for i, (h, lo, c) in enumerate(zip(*cols)):
+            fast, slow = self.ema_fast.update(c), self.ema_slow.update(c)
+            adx_val = self.adx.update(h, lo, c)[0]
+            ok[i] = fast > slow and adx_val >= self.trend_min and not adx_val <= self.chop_max
+        self.pending = buf[buf.index >= htf.index[-1] + self.step] if len(htf) else buf
+        pos = np.searchsorted(bar_ends(htf.index, self.htf_tf, self.rth_only),
+                              bar_ends(df.index, self.base_tf, self.rth_only), side="right") - 1
+        gate = np.where(pos >= 0, ok[np.maximum(pos, 0)], self.ok)
+        if len(ok):
+            self.ok = bool(ok[-1])
+        return gate
+
+
+class _SymbolRun:
+    def __init__(self, cfg: Config):
+        self.stream = SignalStream(cfg)
+        self.htf = _HTFRegime(cfg) if cfg.strategy.htf_align_required else None
+        self.atr = ATRState(14)
+        self.last_atr = float("nan")
+        self.sim = np.zeros(SIM_STATE_SIZE)
+        self.stats = EquityStats(periods_per_year(cfg))
+        self.trade_stats = TradeStats()
+        self.trades: List[pd.DataFrame] = []
+        self.n_bars = 0
+
+    def warm(self, df: pd.DataFrame) -> None:
+        """Feed warm-up bars to the indicators only."""
+        self._indicators(df)
+
+    def _indicators(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        h, lo, c = (df[k].to_numpy(dtype=np.float64) for k in ("high", "low", "close"))
+        longs = self.stream.update_many(df.index, h, lo, c)
+        if self.htf is not None:
+            longs &= self.htf.update(df)
+        a = np.empty(len(c))
+        last = self.last_atr
+        for i, (hi, li, ci) in enumerate(zip(h.tolist(), lo.tolist(), c.tolist())):
+            v = self.atr.update(hi, li, ci)
+            if v == v:
+                last = v
+            a[i] = last
+        self.last_atr = last
+        return longs, a
+
+    def step(self, df: pd.DataFrame, cfg: Config) -> np.ndarray:
+        longs, a = self._indicators(df)
+        risk = cfg.risk
+        eq, entries, exits, rs, n = _simulate_resume(
+            np.ascontiguousarray(df["open"].to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(df["high"].to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(df["low"].to_numpy(dtype=np.float64)),
+            longs, a, self.sim,
+            float(1 + (risk.slippage_bps + risk.commission_bps) * 1e-4),
+            float(risk.atr_k_stop), float(risk.take_profit_R),
+        )
+        self.trade_stats.update_many(rs[:n])
+        if n:
+            self.trades.append(pd.DataFrame({"side": ["long"] * n, "entry": entries[:n], "exit": exits[:n], "R": rs[:n]}))
+        self.stats.update_many(eq)
+        self.n_bars += len(eq)
+        return eq
+
+    def trade_log(self) -> pd.DataFrame:
+        return pd.concat(self.trades, ignore_index=True) if self.trades else pd.DataFrame()
+
+
+def _before(frames: Dict[str, pd.DataFrame], end: str) -> Dict[str, pd.DataFrame]:
+    """`frames` cut to bars stamped before `end`; loaders include the end bound, and a bar
+    exactly on a chunk boundary (any midnight-stamped daily bar) belongs to the next chunk."""
+    t = to_market_ts(end)
+    return {s: df.iloc[: int(df.index.searchsorted(t))] for s, df in frames.items() if df is not None}
+
+
+def chunk_bounds(start: str, end: str, chunk_days: int) -> List[Tuple[str, str]]:
+    t0, t1 = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+    out = []
+    while t0 < t1:
+        nxt = min(t0 + pd.Timedelta(days=chunk_days), t1)
+        out.append((t0.strftime("%Y-%m-%d"), nxt.strftime("%Y-%m-%d")))
+        t0 = nxt
+    return out
+
+
+def run_chunked(
+    cfg: Config, tickers: List[str], start: str, end: str, warmup_start: str,
+    chunk_days: int, timeframe: str = "15m", logger=None,
+) -> Tuple[pd.Series, pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """Same outputs as `BacktestEngine.run`, computed chunk by chunk."""
+    tickers = list(dict.fromkeys(tickers))
+    g, u = cfg.general, cfg.universe
+    if cfg.backtest.intrabar_timeframe:
+        raise ValueError("chunked backtest does not resolve intrabar fill order; unset backtest.intrabar_timeframe")
+    if cfg.strategy.htf_align_required and not can_resample(g.bar_timeframe, g.htf_timeframe):
+        raise ValueError(f"chunked backtest resamples HTF bars; {g.htf_timeframe} cannot be built from {g.bar_timeframe}")
+    warm = _before(download_ohlc_many(tickers, warmup_start, start, timeframe, cfg, cache=False), start)
+    runs: Dict[str, _SymbolRun] = {}
+    for sym in tickers:
+        df = warm.get(sym)
+        if df is None or df.empty or not illiquidity_pass(df, u.min_price, u.min_dollar_vol_20d):
+            continue
+        runs[sym] = _SymbolRun(cfg)
+        runs[sym].warm(df)
+    del warm
+
+    universe = list(runs)
+    last_eq = np.ones(len(universe))   # symbols contribute 1.0 until their first bar
+    port_parts: List[pd.Series] = []
+    bounds = chunk_bounds(start, end, chunk_days)
+    for j, (c0, c1) in enumerate(bounds):
+        frames = download_ohlc_many(universe, c0, c1, timeframe, cfg, cache=False) if universe else {}
+        if j < len(bounds) - 1:   # the last chunk keeps the bar at `end`, as the batch path does
+            frames = _before(frames, c1)
+        curves = []
+        for k, sym in enumerate(universe):
+            df = frames.get(sym)
+            if df is None or df.empty:
+                continue
+            curves.append((k, df.index.asi8, runs[sym].step(df, cfg)))
+        if not curves:
+            continue
+        stamps = np.unique(np.concatenate([ts for _, ts, _ in curves]))
+        total = np.zeros(len(stamps))
+        seen = np.zeros(len(universe), dtype=bool)
+        for k, ts, eq in curves:
+            pos = np.searchsorted(ts, stamps, side="right") - 1
+            total += np.where(pos >= 0, eq[np.maximum(pos, 0)], last_eq[k])
+            last_eq[k] = eq[-1]
+            seen[k] = True
+        total += last_eq[~seen].sum()
+        tz = frames[universe[curves[0][0]]].index.tz
+        idx = pd.DatetimeIndex(stamps).tz_localize("UTC").tz_convert(tz) if tz is not None else pd.DatetimeIndex(stamps)
+        port_parts.append(pd.Series(total / len(universe), index=idx))
+        if logger is not None:
+            logger.info({"event": "backtest_chunk", "from": c0, "to": c1, "bars": int(sum(len(eq) for _, _, eq in curves))})
+
+    per_symbol: Dict[str, Dict[str, Any]] = {}
+    logs: List[pd.DataFrame] = []
+    for sym in universe:
+        run = runs[sym]
+        tl = run.trade_log()
+        if run.n_bars:
+            per_symbol[sym] = symbol_metrics(run.stats, run.trade_stats)
+        if not tl.empty:
+            tl["symbol"] = sym
+            logs.append(tl)
+
+    eq_total = pd.concat(port_parts) if port_parts else pd.Series(dtype=float)
+    trade_log = pd.concat(logs, ignore_index=True) if logs else pd.DataFrame()
+    return eq_total, trade_log, per_symbol
@@ -1,153 +1,330 @@
-import math
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
+import numpy as np
 import pandas as pd
 
 from ..config import Config
-from ..data import download_ohlc, illiquidity_pass
+from ..data import download_ohlc, download_ohlc_many, illiquidity_pass
 from ..strategy import compute_signals, Signal
-from ..indicators import atr
+from ..panel import build_panel, compute_panel_signals
+from ..indicator_cache import atr
+from .. import indicator_cache
+from ..regime import align_htf
+from ..resample import can_resample
 from ..risk import estimate_spread_bps
+from ..bar_store import to_market_ts
+from ..warmup import plan_fetch_starts
+from ..kernels import njit
+from .equity import SparseEquity, portfolio_mean
+from .intrabar import FIRST_STOP, FIRST_UNKNOWN, IntrabarResolver
+from .metrics import EquityStats, TradeStats, bars_per_year, max_drawdown, symbol_metrics
+from .parallel import simulate_many
+from .portfolio_sim import simulate_portfolio
+from .result_cache import get_result_cache, result_key
 
 
 def _max_drawdown(series: pd.Series) -> float:
     """Return max drawdown as a negative fraction, e.g., -0.12 for -12%."""
-    if series.empty:
-        return 0.0
-    roll_max = series.cummax()
-    dd = series / roll_max - 1.0
-    return float(dd.min()) if len(dd) else 0.0
+    return max_drawdown(series) if series is not None else 0.0
 
 
-def _sharpe_from_equity(
-    eq: pd.Series,
-    bars_per_day: int = 26,   # ~15m bars per regular session
-    trading_days: int = 252,
-) -> float:
+def _sharpe_from_equity(eq: pd.Series, periods_per_year: float = bars_per_year()) -> float:
     """Annualized Sharpe from equity curve."""
-    if eq is None or eq.empty or eq.iloc[0] == 0:
-        return 0.0
-    rets = eq.pct_change().fillna(0.0)
-    vol = float(rets.std())
-    if vol == 0.0:
+    if eq is None or eq.empty:
         return 0.0
-    scale = math.sqrt(bars_per_day * trading_days)
-    return float(rets.mean() / vol * scale)
+    st = EquityStats(periods_per_year)
+    st.update_many(eq.to_numpy(dtype=np.float64))
+    return st.sharpe
 
 
-def _profit_factor_from_R(trade_log: pd.DataFrame) -> float:
-    if trade_log is None or trade_log.empty or "R" not in trade_log.columns:
-        return 0.0
-    pos = float(trade_log.loc[trade_log["R"] > 0, "R"].sum())
-    neg = float(trade_log.loc[trade_log["R"] < 0, "R"].sum())
-    return pos / abs(neg) if neg != 0 else (pos if pos > 0 else 0.0)
+def periods_per_year(cfg: Config) -> int:
+    """Bars per year of `general.bar_timeframe`, for annualizing per-bar returns."""
+    return bars_per_year(cfg.general.bar_timeframe, cfg.general.rth_only)
 
 
-def _hitrate_from_R(trade_log: pd.DataFrame) -> float:
-    if trade_log is None or trade_log.empty or "R" not in trade_log.columns:
-        return 0.0
-    wins = int((trade_log["R"] > 0).sum())
-    total = int(len(trade_log))
-    return wins / total if total > 0 else 0.0
+@njit(cache=True)
+def _simulate_arrays(o, h, lo, long_prev, a_prev, first, cost_mult, k_stop, tp_r):
+    """
+    Bar loop of `simulate_symbol` over contiguous arrays. `long_prev[i]` /
+    `a_prev[i]` hold bar i's signal and ATR; entries use bar i-1's.
+    `first[i]` (int8) says which level filled first on bar i when both were
+    touched; FIRST_UNKNOWN takes the take-profit and records the bar.
+    Returns (equity, entries, exits, Rs, n_trades, amb, amb_tp, amb_stop,
+    n_amb); the trade arrays hold `n_trades` trades and the amb arrays the
+    `n_amb` unresolved ambiguous bars with their levels.
+    """
+    n = o.shape[0]
+    eq = np.empty(n)
+    entries = np.empty(n)
+    exits = np.empty(n)
+    rs = np.empty(n)
+    amb = np.empty(n, dtype=np.int64)
+    amb_tp = np.empty(n)
+    amb_stop = np.empty(n)
+    n_trades = 0
+    n_amb = 0
+    if n == 0:
+        return eq, entries, exits, rs, n_trades, amb, amb_tp, amb_stop, n_amb
+    eq[0] = 1.0
+    pos = 0
+    entry = 0.0
+    stop = 0.0
+    tp = 0.0
+    for i in range(1, n):
+        e = eq[i - 1]
+        if pos > 0:
+            if h[i] >= tp and lo[i] <= stop and first[i] == FIRST_UNKNOWN:
+                amb[n_amb], amb_tp[n_amb], amb_stop[n_amb] = i, tp, stop
+                n_amb += 1
+            if h[i] >= tp and (lo[i] > stop or first[i] != FIRST_STOP):
+                r = (tp - entry) / (entry - stop)
+                e = e * (1 + r * 0.01)
+                entries[n_trades], exits[n_trades], rs[n_trades] = entry, tp, r
+                n_trades += 1
+                pos = 0
+            elif lo[i] <= stop:
+                r = (stop - entry) / (entry - stop)
+                e = e * (1 + r * 0.01)
+                entries[n_trades], exits[n_trades], rs[n_trades] = entry, stop, r
+                n_trades += 1
+                pos = 0
+        eq[i] = e
+
+        # New entries on prior bar signal to avoid look-ahead
+        if pos == 0 and long_prev[i - 1]:
+            entry = o[i] * cost_mult
+            stop = entry - k_stop * a_prev[i - 1]
+            tp = entry + tp_r * (entry - stop)
+            pos = 1
+    return eq, entries, exits, rs, n_trades, amb, amb_tp, amb_stop, n_amb
+
+
+def simulate_resolved(o, h, lo, long_prev, a_prev, cost_mult, k_stop, tp_r, index=None, resolve=None):
+    """
+    `_simulate_arrays`, re-run with ambiguous bars settled by
+    `resolve(bar_ts, tps, stops) -> first codes` until none are left (a
+    changed exit can open new ones). Without `resolve` the take-profit
+    wins, as before. Returns (equity, entries, exits, Rs, n_trades).
+    """
+    first = np.zeros(o.shape[0], dtype=np.int8)
+    while True:
+        eq, entries, exits, rs, n, amb, amb_tp, amb_stop, n_amb = _simulate_arrays(
+            o, h, lo, long_prev, a_prev, first, cost_mult, k_stop, tp_r)
+        if resolve is None or n_amb == 0:
+            return eq, entries, exits, rs, n
+        bars = amb[:n_amb]
+        first[bars] = resolve(index.asi8[bars], amb_tp[:n_amb], amb_stop[:n_amb])
+
+
+# resumable loop state: equity, pos, entry, stop, tp, prev bar LONG, prev bar ATR, started
+SIM_STATE_SIZE = 8
+
+
+@njit(cache=True)
+def _simulate_resume(o, h, lo, long_, a, state, cost_mult, k_stop, tp_r):
+    """
+    `_simulate_arrays` over one chunk of a longer series: `state` (see
+    SIM_STATE_SIZE) carries the position and the previous bar's signal/ATR
+    across chunk boundaries and is updated in place.
+    """
+    n = o.shape[0]
+    eq = np.empty(n)
+    entries = np.empty(n)
+    exits = np.empty(n)
+    rs = np.empty(n)
+    n_trades = 0
+    e, pos, entry, stop, tp = state[0], state[1], state[2], state[3], state[4]
+    prev_long, prev_a, started = state[5], state[6], state[7]
+    for i in range(n):
+        if started == 0.0:
+            e = 1.0
+            started = 1.0
+        else:
+            if pos > 0:
+                if h[i] >= tp:
+                    r = (tp - entry) / (entry - stop)
+                    e = e * (1 + r * 0.01)
+                    entries[n_trades], exits[n_trades], rs[n_trades] = entry, tp, r
+                    n_trades += 1
+                    pos = 0.0
+                elif lo[i] <= stop:
+                    r = (stop - entry) / (entry - stop)
+                    e = e * (1 + r * 0.01)
+                    entries[n_trades], exits[n_trades], rs[n_trades] = entry, stop, r
+                    n_trades += 1
+                    pos = 0.0
+            if pos == 0 and prev_long != 0.0:
+                entry = o[i] * cost_mult
+                stop = entry - k_stop * prev_a
+                tp = entry + tp_r * (entry - stop)
+                pos = 1.0
+        eq[i] = e
+        prev_long = 1.0 if long_[i] else 0.0
+        prev_a = a[i]
+    state[0], state[1], state[2], state[3], state[4] = e, pos, entry, stop, tp
+    state[5], state[6], state[7] = prev_long, prev_a, started
+    return eq, entries, exits, rs, n_trades
+
+
+def load_htf_frames(cfg: Config, tickers: List[str], start: str, end: str) -> Dict[str, pd.DataFrame]:
+    """
+    HTF bars for the regime gate when they cannot be resampled from base
+    bars; {} when they can (the gate resamples) or alignment is off.
+    """
+    g = cfg.general
+    if not cfg.strategy.htf_align_required or can_resample(g.bar_timeframe, g.htf_timeframe):
+        return {}
+    htf_start = plan_fetch_starts(cfg, start)["htf"].strftime("%Y-%m-%d")
+    return download_ohlc_many(tickers, htf_start, end, g.htf_timeframe, cfg)
 
 
 class BacktestEngine:
     def __init__(self, cfg: Config, logger):
         self.cfg = cfg
         self.logger = logger
+        indicator_cache.configure(cfg)
+        self.intrabar = IntrabarResolver(cfg) if cfg.backtest.intrabar_timeframe else None
 
-    def simulate_symbol(self, sym: str, start: str, end: str) -> Tuple[pd.Series, pd.DataFrame]:
+    def warmup_start(self, start: str) -> str:
+        """Fetch start that gives the indicators (and a resampled HTF regime) converged values by `start`."""
+        return plan_fetch_starts(self.cfg, start)["base"].strftime("%Y-%m-%d")
+
+    def signals(self, sym: str, df: pd.DataFrame, end: str, sig: Optional[pd.Series] = None,
+                htf: Optional[pd.DataFrame] = None) -> pd.Series:
+        """Entry signals for `df` (computed unless given) gated by the HTF regime when required."""
+        if sig is None:
+            sig = compute_signals(df, self.cfg)
+        if htf is None and self.cfg.strategy.htf_align_required:
+            htf = load_htf_frames(self.cfg, [sym], str(df.index[0].date()), end).get(sym)
+        return align_htf(self.cfg, df, sig, htf)
+
+    def simulate_symbol(
+        self, sym: str, start: str, end: str, df: Optional[pd.DataFrame] = None,
+        sig: Optional[pd.Series] = None, sparse: bool = False,
+    ) -> Tuple[pd.Series, pd.DataFrame]:
         """
         Returns:
-          equity_curve (Series, base=1.0),
+          equity_curve (Series, base=1.0; a `SparseEquity` with `sparse`),
           trade_log (DataFrame with columns: side, entry, exit, R)
+        `df` skips the download when bars were already fetched and `sig`
+        supplies final signals for `df`, HTF alignment included (see
+        `run`). Bars before `start` only warm up the indicators; trading
+        begins at `start`.
         """
-        df = download_ohlc(sym, start, end, "15m", self.cfg)
+        none = SparseEquity.empty() if sparse else pd.Series(dtype=float)
+        if df is None:
+            df = download_ohlc(sym, self.warmup_start(start), end, self.cfg.general.bar_timeframe, self.cfg)
         if df.empty or not illiquidity_pass(df, self.cfg.universe.min_price, self.cfg.universe.min_dollar_vol_20d):
-            return pd.Series(dtype=float), pd.DataFrame()
+            return none, pd.DataFrame()
 
-        sig = compute_signals(df, self.cfg)
+        if sig is None:
+            sig = self.signals(sym, df, end)
 
         a = atr(df, 14)
         a = a.bfill().ffill()
 
+        i0 = int(df.index.searchsorted(to_market_ts(start)))
+        if i0:
+            df, sig, a = df.iloc[i0:], sig.iloc[i0:], a.iloc[i0:]
+            if df.empty:
+                return none, pd.DataFrame()
+
         # Hook retained for later enhancements
         _ = estimate_spread_bps(df)
 
-        eq = [1.0]
-        pos = 0
-        entry = 0.0
-        stop = 0.0
-        tp = 0.0
-        trades = []
-
-        for i in range(1, len(df)):
-            bar = df.iloc[i]
-            price_open = float(bar["open"])
-            price_high = float(bar["high"])
-            price_low = float(bar["low"])
+        risk = self.cfg.risk
+        eq, entries, exits, rs, n_trades = simulate_resolved(
+            np.ascontiguousarray(df["open"].to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(df["high"].to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(df["low"].to_numpy(dtype=np.float64)),
+            np.ascontiguousarray(sig.to_numpy() == Signal.LONG),
+            np.ascontiguousarray(a.to_numpy(dtype=np.float64)),
+            float(1 + (risk.slippage_bps + risk.commission_bps) * 1e-4),
+            float(risk.atr_k_stop), float(risk.take_profit_R),
+            df.index, self.intrabar.for_symbol(sym) if self.intrabar is not None else None,
+        )
 
-            # Manage existing position
-            if pos > 0:
-                if price_high >= tp:
-                    r = (tp - entry) / (entry - stop)
-                    eq.append(eq[-1] * (1 + r * 0.01))
-                    trades.append({"side": "long", "entry": entry, "exit": tp, "R": r})
-                    pos = 0
-                elif price_low <= stop:
-                    r = (stop - entry) / (entry - stop)
-                    eq.append(eq[-1] * (1 + r * 0.01))
-                    trades.append({"side": "long", "entry": entry, "exit": stop, "R": r})
-                    pos = 0
-                else:
-                    eq.append(eq[-1])
-            else:
-                eq.append(eq[-1])
-
-            # New entries on prior bar signal to avoid look-ahead
-            if pos == 0 and sig.iloc[i - 1] == Signal.LONG:
-                entry = price_open * (1 + (self.cfg.risk.slippage_bps + self.cfg.risk.commission_bps) * 1e-4)
-                stop = entry - self.cfg.risk.atr_k_stop * float(a.iloc[i - 1])
-                tp = entry + self.cfg.risk.take_profit_R * (entry - stop)
-                pos = 1
-
-        equity_curve = pd.Series(eq, index=df.index[: len(eq)])
-        trade_log = pd.DataFrame(trades)
+        if sparse:
+            equity_curve = SparseEquity.from_dense(eq, df.index)
+        else:
+            equity_curve = pd.Series(eq, index=df.index[: len(eq)])
+        if n_trades == 0:
+            return equity_curve, pd.DataFrame()
+        trade_log = pd.DataFrame({
+            "side": ["long"] * n_trades, "entry": entries[:n_trades], "exit": exits[:n_trades], "R": rs[:n_trades],
+        })
         return equity_curve, trade_log
 
     def run(
-        self, tickers: List[str], start: str, end: str
+        self, tickers: List[str], start: str, end: str, workers: Optional[int] = None,
     ) -> Tuple[pd.Series, pd.DataFrame, Dict[str, Dict[str, Any]]]:
         """
         Returns:
           eq_total: portfolio equity (mean of per-symbol equity, base=1.0)
           trade_log: concatenated trade logs with `symbol`
           per_symbol: dict[symbol] -> metrics dict
+        `workers` (default `backtest.workers`) > 1 simulates symbols on a
+        process pool; results are merged in `tickers` order either way.
+        `backtest.intrabar_timeframe` settles bars that touch both take-profit
+        and stop from finer bars (see `intrabar.IntrabarResolver`).
+        `backtest.chunk_days` > 0 switches to the bounded-memory chunked
+        path (see `chunked.run_chunked`) and `backtest.portfolio` to one
+        shared-capital simulation under the live portfolio limits (see
+        `portfolio_sim.simulate_portfolio`). With `backtest.result_cache_dir`
+        set, only symbols whose config, range, bars or code changed since a
+        previous run are simulated.
         """
-        curves: List[pd.Series] = []
+        curves: List[SparseEquity] = []
         logs: List[pd.DataFrame] = []
         per_symbol: Dict[str, Dict[str, Any]] = {}
+        bars: List[pd.DatetimeIndex] = []
 
+        workers = self.cfg.backtest.workers if workers is None else workers
+        tickers = list(dict.fromkeys(tickers))
+        if self.cfg.backtest.chunk_days > 0:
+            if self.cfg.backtest.portfolio or self.intrabar is not None:
+                raise ValueError("backtest.chunk_days supports neither backtest.portfolio nor backtest.intrabar_timeframe")
+            from .chunked import run_chunked
+            return run_chunked(self.cfg, tickers, start, end, self.warmup_start(start),
+                               self.cfg.backtest.chunk_days, self.cfg.general.bar_timeframe, self.logger)
+
+        frames = download_ohlc_many(tickers, self.warmup_start(start), end, self.cfg.general.bar_timeframe, self.cfg)
+        htf = load_htf_frames(self.cfg, tickers, start, end)
+        if self.cfg.backtest.portfolio:
+            return simulate_portfolio(self.cfg, {s: frames[s] for s in tickers}, start,
+                                      self._signals_for(tickers, frames, end, htf, always=True), self.intrabar)
+
+        cache = get_result_cache(self.cfg.backtest.result_cache_dir)
+        keys = {s: result_key(self.cfg, s, start, end, frames[s], htf.get(s)) for s in tickers} if cache is not None else {}
+        done = {s: cache.get(keys[s]) for s in tickers} if cache is not None else {}
+        todo = [s for s in tickers if done.get(s) is None]
+        sigs = self._signals_for(todo, frames, end, htf)
+
+        if workers > 1 and len(todo) > 1:
+            longs = {s: (sig.to_numpy() == Signal.LONG).astype(np.float64) for s, sig in sigs.items()}
+            fresh = simulate_many(self.cfg, frames, todo, start, end, workers, longs=longs or None)
+        else:
+            fresh = [self.simulate_symbol(s, start, end, df=frames[s], sig=sigs.get(s), sparse=True) for s in todo]
+        for sym, res in zip(todo, fresh):
+            done[sym] = res
+            if cache is not None:
+                cache.put(keys[sym], *res)
+        if cache is not None and self.logger is not None:
+            self.logger.info({"event": "backtest_result_cache", "cached": len(tickers) - len(todo), "simulated": len(todo)})
+        if self.intrabar is not None and self.logger is not None and not (workers > 1 and len(todo) > 1):
+            self.logger.info({"event": "backtest_intrabar", **self.intrabar.stats()})
+
+        ppy = periods_per_year(self.cfg)
         for sym in tickers:
-            eq, tl = self.simulate_symbol(sym, start, end)
+            eq, tl = done[sym]
 
             # Per-symbol metrics
-            if not eq.empty:
-                net_pnl = float(eq.iloc[-1] - 1.0)
-                sharpe = _sharpe_from_equity(eq)
-                mdd = _max_drawdown(eq)
-                pf = _profit_factor_from_R(tl)
-                hr = _hitrate_from_R(tl)
-                trades = int(len(tl)) if tl is not None else 0
-
-                per_symbol[sym] = {
-                    "trades": trades,
-                    "net_pnl": net_pnl,
-                    "hitrate": hr,
-                    "profit_factor": pf,
-                    "sharpe": sharpe,
-                    "maxdd": mdd,
-                }
-                curves.append(eq.rename(sym))
+            if not eq.is_empty:
+                trade_stats = TradeStats()
+                if tl is not None and not tl.empty:
+                    trade_stats.update_many(tl["R"].to_numpy(dtype=np.float64))
+                per_symbol[sym] = symbol_metrics(eq.stats(ppy), trade_stats)
+                curves.append(eq)
+                bars.append(frames[sym].index[-eq.n:])
 
             if tl is not None and not tl.empty:
                 tl = tl.copy()
@@ -155,10 +332,32 @@ class BacktestEngine:
                 logs.append(tl)
 
         if curves:
-            aligned = pd.concat(curves, axis=1).ffill().fillna(1.0)
-            eq_total = aligned.mean(axis=1)
+            # Only the union of bar stamps is dense; the curves stay as change points
+            eq_total = portfolio_mean(curves, bars[0].append(bars[1:]).unique().sort_values())
         else:
             eq_total = pd.Series(dtype=float)
 
         trade_log = pd.concat(logs, ignore_index=True) if logs else pd.DataFrame()
         return eq_total, trade_log, per_symbol
+
+    def _signals_for(self, syms: List[str], frames: Dict[str, pd.DataFrame], end: str,
+                     htf: Dict[str, pd.DataFrame], always: bool = False) -> Dict[str, pd.Series]:
+        """
+        Precomputed (HTF-aligned) signals for `syms`. Empty unless the panel
+        engine is on, HTF bars were fetched separately or `always` -- otherwise
+        `simulate_symbol` computes them itself (in the worker, when parallel).
+        """
+        panel = self.cfg.strategy.signal_engine == "panel"
+        if not syms or not (panel or htf or always):
+            return {}
+        raw: Dict[str, pd.Series] = {}
+        if panel:
+            panel_sigs = compute_panel_signals(build_panel({s: frames[s] for s in syms}), self.cfg)
+            raw = {s: panel_sigs.signal_series(s) for s in panel_sigs.symbols}
+        out = {}
+        for s in syms:
+            df = frames[s]
+            if df is None or df.empty:
+                continue
+            out[s] = self.signals(s, df, end, raw.get(s), htf.get(s, pd.DataFrame()) if htf else None)
+        return out
@@ -0,0 +1,108 @@
+"""
+Sparse equity curves.
+
+A per-symbol backtest curve only moves on the bars where a trade exits, so
+`SparseEquity` keeps just those change points -- plus the first and the
+last bar -- as (int64 ns timestamp, value) arrays and the bar count.
+Between stored points the curve is flat. `densify` puts it back on any bar
+index, and `portfolio_mean` averages many curves on a shared index from
+their change points alone (no symbols x bars matrix): each curve adds its
+step deltas to one time-sorted event stream, whose running sum is the
+portfolio mean.
+"""
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .metrics import EquityStats
+
+
+@dataclass
+class SparseEquity:
+    ts: np.ndarray        # int64 ns (UTC) of the first bar, each change and the last bar
+    values: np.ndarray    # equity from each stamp until the next one
+    n: int                # bars covered
+    tz: Optional[str] = None
+    name: Optional[str] = None   # index name of the bars
+
+    @classmethod
+    def empty(cls) -> "SparseEquity":
+        return cls(np.empty(0, dtype=np.int64), np.empty(0), 0)
+
+    @classmethod
+    def from_dense(cls, eq: np.ndarray, index: pd.DatetimeIndex) -> "SparseEquity":
+        """Change points of per-bar equity `eq` on `index` (same length)."""
+        eq = np.asarray(eq, dtype=np.float64)
+        n = len(eq)
+        if n == 0:
+            return cls.empty()
+        keep = np.empty(n, dtype=bool)
+        keep[0] = keep[-1] = True
+        keep[1:-1] = eq[1:-1] != eq[:-2]
+        tz = getattr(index, "tz", None)
+        return cls(index.asi8[:n][keep], eq[keep], n, None if tz is None else str(tz), index.name)
+
+    @classmethod
+    def from_series(cls, eq: pd.Series) -> "SparseEquity":
+        return cls.from_dense(eq.to_numpy(dtype=np.float64), eq.index) if eq is not None else cls.empty()
+
+    @property
+    def is_empty(self) -> bool:
+        return self.n == 0
+
+    @property
+    def last(self) -> float:
+        return float(self.values[-1]) if self.n else float("nan")
+
+    def stats(self, periods_per_year: float) -> EquityStats:
+        """`EquityStats` of the dense curve, from the change points."""
+        st = EquityStats(periods_per_year)
+        st.update_steps(self.values, self.n)
+        return st
+
+    def densify(self, index: pd.DatetimeIndex, before: float = 1.0) -> pd.Series:
+        """The curve on `index`, held flat between points and `before` ahead of the first bar."""
+        pos = np.searchsorted(self.ts, index.asi8, side="right") - 1
+        vals = np.where(pos >= 0, self.values[np.maximum(pos, 0)] if self.n else before, before)
+        return pd.Series(vals, index=index)
+
+    def to_series(self) -> pd.Series:
+        """Only the stored points, as a Series on their timestamps."""
+        return pd.Series(self.values, index=_stamps(self.ts, self.tz, self.name))
+
+    def to_frame(self) -> pd.DataFrame:
+        """Stored points plus the bar count, the layout `ResultCache` writes."""
+        return pd.DataFrame({"equity": self.values, "bars": np.full(len(self.ts), self.n, dtype=np.int64)},
+                            index=_stamps(self.ts, self.tz, self.name))
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> "SparseEquity":
+        if frame.empty:
+            return cls.empty()
+        tz = frame.index.tz
+        return cls(frame.index.asi8.copy(), frame["equity"].to_numpy(dtype=np.float64),
+                   int(frame["bars"].iloc[0]), None if tz is None else str(tz), frame.index.name)
+
+
+def _stamps(ts: np.ndarray, tz: Optional[str], name: Optional[str]) -> pd.DatetimeIndex:
+    idx = pd.DatetimeIndex(ts.view("datetime64[ns]"), name=name)
+    return idx.tz_localize("UTC").tz_convert(tz) if tz is not None else idx
+
+
+def portfolio_mean(curves: List[SparseEquity], index: pd.DatetimeIndex, before: float = 1.0) -> pd.Series:
+    """
+    Mean of `curves` on `index`, each held flat between its points and at
+    `before` until its first bar -- what concatenating the dense curves,
+    forward-filling and averaging across columns gives.
+    """
+    curves = [c for c in curves if c.n]
+    if not curves:
+        return pd.Series(np.full(len(index), before), index=index)
+    ts = np.concatenate([c.ts for c in curves])
+    deltas = np.concatenate([np.diff(c.values, prepend=before) for c in curves])
+    order = np.argsort(ts, kind="stable")
+    level = before + np.cumsum(deltas[order]) / len(curves)
+    pos = np.searchsorted(ts[order], index.asi8, side="right") - 1
+    return pd.Series(np.where(pos >= 0, level[np.maximum(pos, 0)], before), index=index)
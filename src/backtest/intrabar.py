@@ -0,0 +1,81 @@
+"""
+Fill order for bars that touch both the take-profit and the stop.
+
+A base-timeframe bar cannot say which level it crossed first. The
+resolver fetches `backtest.intrabar_timeframe` bars only for the sessions
+that hold such bars, keeps them per symbol and session, and walks the
+finer bars inside the ambiguous one: the first to reach either level
+decides. A finer bar that still touches both counts as the stop
+(pessimistic); with no finer bar touching either (missing or mismatched
+data) the take-profit wins, as without the resolver.
+"""
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..calendar import _parse_timeframe
+from ..config import Config
+from ..data import download_ohlc
+
+# which level an ambiguous bar (high >= tp and low <= stop) filled first
+FIRST_UNKNOWN, FIRST_TP, FIRST_STOP = 0, 1, 2
+
+_DAY = pd.Timedelta(days=1)
+
+
+class IntrabarResolver:
+    def __init__(self, cfg: Config, fetch: Optional[Callable[[str, str, str], pd.DataFrame]] = None):
+        """`fetch(symbol, start, end)` returns finer bars; defaults to `download_ohlc`."""
+        self.cfg = cfg
+        self.timeframe = cfg.backtest.intrabar_timeframe
+        self.base_step = _parse_timeframe(cfg.general.bar_timeframe).value
+        self.fetch = fetch
+        self._sessions: Dict[Tuple[str, pd.Timestamp], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+        self.resolved = 0
+        self.stop_first = 0
+        self.fallbacks = 0
+        self.fetches = 0
+
+    def _download(self, sym: str, start: str, end: str) -> pd.DataFrame:
+        if self.fetch is not None:
+            return self.fetch(sym, start, end)
+        return download_ohlc(sym, start, end, self.timeframe, self.cfg)
+
+    def _session(self, sym: str, day: pd.Timestamp) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        got = self._sessions.get((sym, day))
+        if got is None:
+            df = self._download(sym, day.strftime("%Y-%m-%d"), (day + _DAY).strftime("%Y-%m-%d"))
+            self.fetches += 1
+            if df is None or df.empty:
+                got = (np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+            else:
+                got = (df.index.asi8, df["high"].to_numpy(dtype=np.float64), df["low"].to_numpy(dtype=np.float64))
+            self._sessions[(sym, day)] = got
+        return got
+
+    def first_touch(self, sym: str, bar_ts: np.ndarray, tps: np.ndarray, stops: np.ndarray) -> np.ndarray:
+        """FIRST_TP / FIRST_STOP for each ambiguous bar starting at `bar_ts` (int64 ns)."""
+        days = pd.DatetimeIndex(bar_ts).tz_localize("UTC").tz_convert("America/New_York").tz_localize(None).normalize()
+        out = np.full(len(bar_ts), FIRST_TP, dtype=np.int8)
+        for j, (t, day, tp, stop) in enumerate(zip(bar_ts.tolist(), days, tps.tolist(), stops.tolist())):
+            ts, hi, lo = self._session(sym, day)
+            a, b = np.searchsorted(ts, [t, t + self.base_step])
+            touch_stop = lo[a:b] <= stop
+            touch = (hi[a:b] >= tp) | touch_stop
+            if not touch.any():
+                self.fallbacks += 1
+                continue
+            if touch_stop[touch.argmax()]:
+                out[j] = FIRST_STOP
+                self.stop_first += 1
+        self.resolved += len(bar_ts)
+        return out
+
+    def for_symbol(self, sym: str) -> Callable[[np.ndarray, np.ndarray, np.ndarray], np.ndarray]:
+        """`first_touch` bound to `sym`, the `resolve` callback of `simulate_resolved`."""
+        return lambda bar_ts, tps, stops: self.first_touch(sym, bar_ts, tps, stops)
+
+    def stats(self) -> Dict[str, int]:
+        return {"resolved": self.resolved, "stop_first": self.stop_first, "fallbacks": self.fallbacks,
+                "fetches": self.fetches}
@@ -1,38 +1,218 @@
-import pandas as pd, numpy as np
-from typing import Tuple
+"""
+Performance metrics as O(1)-memory accumulators.
+
+`EquityStats` takes an equity curve one bar (`update`) or one block of bars
+(`update_many`) at a time and keeps only running return moments (Welford;
+blocks merged with Chan et al.'s pairwise update), the peak and the max
+drawdown. `TradeStats` does the same for R-multiples. Annualization comes
+from the bar timeframe (`bars_per_year`), not a fixed 26 bars/day. The
+Series helpers below (`sharpe`, `max_drawdown`, `calmar`,
+`summarize_metrics`) are thin wrappers over the accumulators.
+"""
+import math
+from typing import Any, Dict, Iterable
+
+import numpy as np
+import pandas as pd
+
+from ..warmup import bars_per_session
+
+TRADING_DAYS = 252
+
+
+def bars_per_year(timeframe: str = "15m", rth_only: bool = True, trading_days: int = TRADING_DAYS) -> int:
+    return bars_per_session(timeframe, rth_only) * trading_days
+
+
+class ReturnStats:
+    """Running count / mean / M2 of per-period returns and the annualized Sharpe."""
+
+    def __init__(self, periods_per_year: float = bars_per_year()):
+        self.scale = math.sqrt(periods_per_year)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, r: float) -> None:
+        self.n += 1
+        d = r - self.mean
+        self.mean += d / self.n
+        self.m2 += d * (r - self.mean)
+
+    def update_many(self, rets: np.ndarray) -> None:
+        if len(rets):
+            mb = float(rets.mean())
+            self.merge(len(rets), mb, float(((rets - mb) ** 2).sum()))
+
+    def merge(self, nb: int, mb: float, m2b: float) -> None:
+        """Fold in another sample's count / mean / M2."""
+        if not nb:
+            return
+        n = self.n + nb
+        d = mb - self.mean
+        self.m2 += m2b + d * d * self.n * nb / n
+        self.mean += d * nb / n
+        self.n = n
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else float("nan")
+
+    @property
+    def sharpe(self) -> float:
+        vol = self.std
+        if not vol > 0.0:
+            return 0.0
+        return self.mean / vol * self.scale
+
+
+class EquityStats:
+    """Return moments, peak, max drawdown and Calmar of an equity curve fed in order."""
+
+    def __init__(self, periods_per_year: float = bars_per_year()):
+        self.periods_per_year = periods_per_year
+        self.returns = ReturnStats(periods_per_year)
+        self.n = 0
+        self.first = float("nan")
+        self.last = float("nan")
+        self.peak = -math.inf
+        self.maxdd = 0.0
+
+    def update(self, value: float) -> None:
+        value = float(value)
+        if self.n:
+            self.returns.update(value / self.last - 1.0)
+        else:
+            self.first = value
+        self.n += 1
+        self.last = value
+        if value > self.peak:
+            self.peak = value
+        self.maxdd = min(self.maxdd, value / self.peak - 1.0)
+
+    def update_many(self, values: Iterable[float]) -> None:
+        eq = np.asarray(values, dtype=np.float64)
+        if not len(eq):
+            return
+        prev = np.r_[self.last, eq[:-1]] if self.n else eq[:-1]
+        self.returns.update_many(eq[len(eq) - len(prev):] / prev - 1.0)
+        if not self.n:
+            self.first = float(eq[0])
+        self.n += len(eq)
+        self.last = float(eq[-1])
+        peaks = np.maximum.accumulate(np.r_[self.peak, eq])[1:]
+        self.maxdd = min(self.maxdd, float((eq / peaks - 1.0).min()))
+        self.peak = float(peaks[-1])
+
+    def update_steps(self, values: Iterable[float], n: int) -> None:
+        """
+        `n` bars of a curve that only moves at `values` (its first bar, each
+        change and its last bar) and is flat in between: the missing bars
+        are zero returns and cannot set a new peak or drawdown.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self.update_many(values)
+        flat = n - len(values)
+        if flat > 0:
+            self.returns.merge(flat, 0.0, 0.0)
+            self.n += flat
+
+    @property
+    def sharpe(self) -> float:
+        return 0.0 if self.n == 0 or self.first == 0 else self.returns.sharpe
+
+    @property
+    def total_return(self) -> float:
+        return self.last / self.first - 1.0 if self.n else 0.0
+
+    @property
+    def cagr(self) -> float:
+        years = (self.n - 1) / self.periods_per_year
+        if years <= 0 or not self.last / self.first > 0:
+            return 0.0
+        return (self.last / self.first) ** (1.0 / years) - 1.0
+
+    @property
+    def calmar(self) -> float:
+        return self.cagr / (abs(self.maxdd) or 1e-6)
+
+
+class TradeStats:
+    """Running trade count, hit rate and R-multiple profit factor."""
+
+    def __init__(self):
+        self.n = 0
+        self.wins = 0
+        self.gross_win = 0.0
+        self.gross_loss = 0.0
+
+    def update(self, r: float) -> None:
+        self.update_many(np.array([r], dtype=np.float64))
+
+    def update_many(self, rs: Iterable[float]) -> None:
+        r = np.asarray(rs, dtype=np.float64)
+        self.n += len(r)
+        self.wins += int((r > 0).sum())
+        self.gross_win += float(r[r > 0].sum())
+        self.gross_loss += float(r[r < 0].sum())
+
+    @property
+    def hitrate(self) -> float:
+        return self.wins / self.n if self.n else 0.0
+
+    @property
+    def profit_factor(self) -> float:
+        if self.gross_loss != 0:
+            return self.gross_win / abs(self.gross_loss)
+        return self.gross_win if self.gross_win > 0 else 0.0
+
+
+def symbol_metrics(eq: EquityStats, trades: TradeStats) -> Dict[str, Any]:
+    """The per-symbol metrics row `BacktestEngine.run` reports (equity based at 1.0)."""
+    return {
+        "trades": int(trades.n),
+        "net_pnl": float(eq.last - 1.0) if eq.n else 0.0,
+        "hitrate": float(trades.hitrate),
+        "profit_factor": float(trades.profit_factor),
+        "sharpe": float(eq.sharpe),
+        "maxdd": float(eq.maxdd),
+    }
+
+
+def sharpe(returns: pd.Series, periods_per_year: float = bars_per_year()) -> float:
+    st = ReturnStats(periods_per_year)
+    st.update_many(np.asarray(returns, dtype=np.float64))
+    return st.sharpe
 
-def sharpe(returns: pd.Series) -> float:
-    if returns.std() == 0: return 0.0
-    return (returns.mean() / returns.std()) * np.sqrt(252*26)  # 15m bars ~ 26/day
 
 def max_drawdown(equity: pd.Series) -> float:
-    roll_max = equity.cummax()
-    dd = (equity / roll_max) - 1.0
-    return dd.min()
+    st = EquityStats()
+    st.update_many(equity)
+    return st.maxdd
+
 
-def calmar(equity: pd.Series) -> float:
-    cagr = (equity.iloc[-1] / equity.iloc[0]) ** (252/len(equity)) - 1 if len(equity)>1 else 0
-    mdd = abs(max_drawdown(equity)) or 1e-6
-    return cagr / mdd
+def calmar(equity: pd.Series, periods_per_year: float = bars_per_year()) -> float:
+    st = EquityStats(periods_per_year)
+    st.update_many(equity)
+    return st.calmar
 
-def summarize_metrics(equity: pd.Series, trades: pd.DataFrame) -> str:
+
+def summarize_metrics(equity: pd.Series, trades: pd.DataFrame, periods_per_year: float = bars_per_year()) -> str:
     if equity.empty:
         return "No results.\n"
-    ret = equity.pct_change().dropna()
-    s = sharpe(ret)
-    mdd = max_drawdown(equity)
-    cal = calmar(equity)
-    pf = (trades.loc[trades["R"]>0,"R"].sum() / abs(trades.loc[trades["R"]<0,"R"].sum())) if not trades.empty else 0
-    hr = (trades["R"]>0).mean() if not trades.empty else 0
+    st = EquityStats(periods_per_year)
+    st.update_many(equity.to_numpy(dtype=np.float64))
+    tr = TradeStats()
+    if not trades.empty:
+        tr.update_many(trades["R"].to_numpy(dtype=np.float64))
     lines = [
-        f"Bars: {len(equity)}",
-        f"Sharpe: {s:.2f}",
-        f"MaxDD: {mdd:.2%}",
-        f"Calmar: {cal:.2f}",
-        f"ProfitFactor: {pf:.2f}",
-        f"HitRate: {hr:.2%}",
-        f"Trades: {len(trades)}",
-        f"Final Equity (normed): {equity.iloc[-1]:.4f}",
+        f"Bars: {st.n}",
+        f"Sharpe: {st.sharpe:.2f}",
+        f"MaxDD: {st.maxdd:.2%}",
+        f"Calmar: {st.calmar:.2f}",
+        f"ProfitFactor: {tr.profit_factor:.2f}",
+        f"HitRate: {tr.hitrate:.2%}",
+        f"Trades: {tr.n}",
+        f"Final Equity (normed): {st.last:.4f}",
     ]
     return "\n".join(lines) + "\n"
-
@@ -0,0 +1,120 @@
+"""
+Monte Carlo / bootstrap confidence bands for a trade log.
+
+Paths are R-multiple sequences drawn from the trade log -- iid resampling,
+a circular block bootstrap (keeps runs of wins/losses together) or a
+reshuffle of the actual trades -- and compounded as the engine does, at
+1% of equity per R. Each batch of paths is one 2D array: index sampling,
+`cumprod`, the running peak and the drawdown are all row-wise NumPy
+operations. Batches bound memory to ~`max_cells` floats.
+
+The trades must come from one account in time order. The per-symbol
+engine's log is neither (each symbol compounds on its own, logs are
+concatenated by ticker), so only the shared-capital log of
+`backtest.portfolio` qualifies: `portfolio_returns` turns it into returns
+on account equity in exit order, resampled with `risk_per_r=1`.
+"""
+import math
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+METHODS = ("iid", "block", "shuffle")
+RISK_PER_R = 0.01   # engine: equity *= 1 + R * 0.01
+
+
+def sample_indices(n: int, n_paths: int, method: str, rng: np.random.Generator, block: int = 5) -> np.ndarray:
+    """(n_paths, n) trade indices for one batch of paths."""
+    if method == "iid":
+        return rng.integers(0, n, size=(n_paths, n))
+    if method == "block":
+        block = max(1, min(block, n))
+        starts = rng.integers(0, n, size=(n_paths, -(-n // block)))
+        return ((starts[:, :, None] + np.arange(block)) % n).reshape(n_paths, -1)[:, :n]
+    if method == "shuffle":
+        return np.argsort(rng.random((n_paths, n)), axis=1)
+    raise ValueError(f"Unknown Monte Carlo method: {method!r} (expected one of {METHODS})")
+
+
+def equity_paths(r: np.ndarray, risk_per_r: float = RISK_PER_R) -> np.ndarray:
+    """Compounded equity of each row of R-multiples, base 1.0 in column 0."""
+    out = np.empty((r.shape[0], r.shape[1] + 1))
+    out[:, 0] = 1.0
+    np.cumprod(1.0 + r * risk_per_r, axis=1, out=out[:, 1:])
+    return out
+
+
+def max_drawdowns(eq: np.ndarray) -> np.ndarray:
+    """Max drawdown per row, a negative fraction as `engine._max_drawdown`."""
+    return (eq / np.maximum.accumulate(eq, axis=1) - 1.0).min(axis=1)
+
+
+def sharpes(r: np.ndarray, risk_per_r: float = RISK_PER_R, trades_per_year: Optional[float] = None) -> np.ndarray:
+    """Per-trade Sharpe of each row, annualized by sqrt(trades_per_year) when given."""
+    rets = r * risk_per_r
+    vol = rets.std(axis=1, ddof=1) if r.shape[1] > 1 else np.full(r.shape[0], np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = np.where(vol > 0, rets.mean(axis=1) / vol, 0.0)
+    return out * math.sqrt(trades_per_year) if trades_per_year else out
+
+
+def portfolio_returns(trade_log: pd.DataFrame, initial_equity: float) -> pd.DataFrame:
+    """
+    A `backtest.portfolio` trade log in exit order, with `ret`: each trade's
+    cash P&L over realized equity before it (`initial_equity` plus earlier
+    exits), so compounding `ret` gives the realized final equity exactly.
+    """
+    tl = trade_log.sort_values("exit_ts", kind="stable").reset_index(drop=True)
+    pnl = tl["pnl"].to_numpy(dtype=np.float64)
+    tl["ret"] = pnl / (initial_equity + np.r_[0.0, np.cumsum(pnl)[:-1]])
+    return tl
+
+
+@dataclass
+class MonteCarloResult:
+    method: str
+    final_equity: np.ndarray   # one value per path
+    max_drawdown: np.ndarray
+    sharpe: np.ndarray
+    actual: dict               # the same metrics on the trade log as it happened
+
+    def bands(self, percentiles: Sequence[float] = (5, 25, 50, 75, 95)) -> pd.DataFrame:
+        """Percentiles of each metric over the paths; NaN when there are none."""
+        rows = {m: np.percentile(v, percentiles) if len(v) else np.full(len(percentiles), np.nan)
+                for m, v in ((m, getattr(self, m)) for m in ("final_equity", "max_drawdown", "sharpe"))}
+        out = pd.DataFrame.from_dict(rows, orient="index", columns=[f"p{p:g}" for p in percentiles])
+        out.insert(0, "actual", [self.actual[m] for m in rows])
+        return out
+
+
+def monte_carlo(
+    trade_log: pd.DataFrame, n_paths: int = 10_000, method: str = "iid", block: int = 5,
+    trades_per_year: Optional[float] = None, seed: int = 42, max_cells: int = 4_000_000,
+    column: str = "R", risk_per_r: float = RISK_PER_R,
+) -> MonteCarloResult:
+    """
+    Resampled final equity / max drawdown / Sharpe over `n_paths` paths of
+    the log's length, each trade moving equity by `column` * `risk_per_r`.
+    """
+    r = trade_log[column].to_numpy(dtype=np.float64) if trade_log is not None and not trade_log.empty else np.empty(0)
+    if method not in METHODS:
+        raise ValueError(f"Unknown Monte Carlo method: {method!r} (expected one of {METHODS})")
+    n = len(r)
+    if n == 0:
+        empty = np.empty(0)
+        return MonteCarloResult(method, empty, empty, empty, {"final_equity": 1.0, "max_drawdown": 0.0, "sharpe": 0.0})
+    rng = np.random.default_rng(seed)
+    batch = max(1, max_cells // (n + 1))
+    finals, dds, shs = [np.empty(0)], [np.empty(0)], [np.empty(0)]   # n_paths <= 0 gives no batches
+    for lo in range(0, n_paths, batch):
+        paths = r[sample_indices(n, min(batch, n_paths - lo), method, rng, block)]
+        eq = equity_paths(paths, risk_per_r)
+        finals.append(eq[:, -1])
+        dds.append(max_drawdowns(eq))
+        shs.append(sharpes(paths, risk_per_r, trades_per_year))
+    eq = equity_paths(r[None, :], risk_per_r)
+    actual = {"final_equity": float(eq[0, -1]), "max_drawdown": float(max_drawdowns(eq)[0]),
+              "sharpe": float(sharpes(r[None, :], risk_per_r, trades_per_year)[0])}
+    return MonteCarloResult(method, np.concatenate(finals), np.concatenate(dds), np.concatenate(shs), actual)
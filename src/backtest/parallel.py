@@ -0,0 +1,112 @@
+"""
+Process-pool fan-out for `BacktestEngine.run`.
+
+All symbols' bars are packed once into a single shared-memory block (one
+float64 row per bar: open, high, low, close, volume, LONG flag) with an
+int64 block of timestamps; workers get only (symbol, offset, length) per
+task and rebuild each frame as a zero-copy view. Results come back in
+input order, so the merge in `run` is deterministic whatever order the
+workers finish in.
+"""
+import random
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..config import Config
+from ..strategy import signal_codes
+from .equity import SparseEquity
+
+_COLS = ("open", "high", "low", "close", "volume")
+_W = len(_COLS) + 1  # + LONG flag (NaN when signals are computed in the worker)
+
+_state: Dict[str, Any] = {}
+
+
+class SharedFrames:
+    """Owner side of the packed bar block; use as a context manager."""
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], longs: Optional[Dict[str, np.ndarray]] = None):
+        self.layout: Dict[str, Tuple[int, int, Optional[str], Optional[str]]] = {}
+        total = 0
+        for sym, df in frames.items():
+            tz = getattr(df.index, "tz", None)
+            self.layout[sym] = (total, len(df), None if tz is None else str(tz), df.index.name)
+            total += len(df)
+        self.n = total
+        self._vals = shared_memory.SharedMemory(create=True, size=max(1, total * _W * 8))
+        self._ts = shared_memory.SharedMemory(create=True, size=max(1, total * 8))
+        vals = np.ndarray((total, _W), dtype=np.float64, buffer=self._vals.buf)
+        ts = np.ndarray((total,), dtype=np.int64, buffer=self._ts.buf)
+        for sym, df in frames.items():
+            off, n = self.layout[sym][:2]
+            if not n:
+                continue
+            for j, c in enumerate(_COLS):
+                vals[off:off + n, j] = df[c].to_numpy(dtype=np.float64) if c in df.columns else np.nan
+            vals[off:off + n, -1] = longs[sym] if longs is not None and sym in longs else np.nan
+            ts[off:off + n] = df.index.asi8
+        del vals, ts  # drop buffer exports so close() can release the mapping
+
+    @property
+    def names(self) -> Tuple[str, str]:
+        return self._vals.name, self._ts.name
+
+    def close(self) -> None:
+        for shm in (self._vals, self._ts):
+            shm.close()
+            shm.unlink()
+
+    def __enter__(self) -> "SharedFrames":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _init_worker(cfg_data: Dict[str, Any], names: Tuple[str, str], n: int) -> None:
+    from .engine import BacktestEngine
+
+    cfg = Config(**cfg_data)
+    random.seed(cfg.general.seed)
+    np.random.seed(cfg.general.seed)
+    # Pool workers share the owner's resource tracker, so attaching here needs no unregister
+    vals_shm, ts_shm = (shared_memory.SharedMemory(name=nm) for nm in names)
+    _state.update(
+        engine=BacktestEngine(cfg, None), shms=(vals_shm, ts_shm),
+        vals=np.ndarray((n, _W), dtype=np.float64, buffer=vals_shm.buf),
+        ts=np.ndarray((n,), dtype=np.int64, buffer=ts_shm.buf),
+    )
+
+
+def _run_one(task):
+    sym, (off, n, tz, name), start, end = task
+    vals, ts = _state["vals"][off:off + n], _state["ts"][off:off + n]
+    idx = pd.DatetimeIndex(ts.view("datetime64[ns]"), name=name)
+    if tz is not None:
+        idx = idx.tz_localize("UTC").tz_convert(tz)
+    df = pd.DataFrame(vals[:, :len(_COLS)], index=idx, columns=list(_COLS), copy=False)
+    df.attrs.update(symbol=sym)
+    flags = vals[:, -1]
+    sig = None
+    if n and not np.isnan(flags).all():
+        sig = signal_codes(flags > 0, idx)
+    return _state["engine"].simulate_symbol(sym, start, end, df=df, sig=sig, sparse=True)
+
+
+def simulate_many(
+    cfg: Config, frames: Dict[str, pd.DataFrame], tickers: List[str], start: str, end: str, workers: int,
+    longs: Optional[Dict[str, np.ndarray]] = None,
+) -> List[Tuple[SparseEquity, pd.DataFrame]]:
+    """`simulate_symbol` (sparse equity) for each ticker on `workers` processes; results in `tickers` order."""
+    frames = {s: frames[s] for s in tickers}
+    with SharedFrames(frames, longs) as shared:
+        tasks = [(s, shared.layout[s], start, end) for s in tickers]
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(tickers)), initializer=_init_worker,
+            initargs=(cfg.model_dump(), shared.names, shared.n),
+        ) as ex:
+            return list(ex.map(_run_one, tasks, chunksize=max(1, len(tasks) // (workers * 4))))
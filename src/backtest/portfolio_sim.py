@@ -0,0 +1,182 @@
+"""
+Portfolio backtest: every symbol on one time-ordered event stream with
+shared capital and the limits the live path applies.
+
+Per-symbol bar arrays are merged into a single timeline (ordered by time,
+then by symbol) and walked once. Each timestamp is handled like one
+`OMS.trade_cycle`:
+  - open positions with a bar at that time exit on take-profit / stop,
+    checked as `simulate_symbol` does;
+  - symbols whose previous bar signalled LONG go through
+    `enforce_portfolio_limits` (net exposure, per-position cap,
+    `max_concurrent_positions`), then the symbol cooloff;
+  - survivors are sized by `plan_trade` against mark-to-market equity and
+    bought at this bar's open, capped by the cash on hand.
+A symbol holds at most one position (one bracket) at a time.
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..bar_store import to_market_ts
+from ..config import Config
+from ..data import illiquidity_pass
+from ..indicator_cache import atr
+from ..portfolio import enforce_portfolio_limits
+from ..regime import align_htf
+from ..risk import plan_trade
+from ..strategy import Signal, compute_signals
+from .intrabar import FIRST_STOP, IntrabarResolver
+
+
+def merged_timeline(stamps: List[np.ndarray]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    (timestamp, symbol no., bar no.) of every bar across the sorted
+    per-symbol `stamps`, ordered by time then symbol. The stable sort is
+    timsort, which merges the already-sorted runs -- a k-way merge in C.
+    """
+    if not stamps:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty
+    ts = np.concatenate(stamps)
+    sym = np.repeat(np.arange(len(stamps)), [len(s) for s in stamps])
+    bar = np.concatenate([np.arange(len(s)) for s in stamps])
+    order = np.argsort(ts, kind="stable")
+    return ts[order], sym[order], bar[order]
+
+
+def simulate_portfolio(
+    cfg: Config, frames: Dict[str, pd.DataFrame], start: str,
+    sigs: Optional[Dict[str, pd.Series]] = None, intrabar: Optional[IntrabarResolver] = None,
+) -> Tuple[pd.Series, pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """
+    Same outputs as `BacktestEngine.run`: portfolio equity (base=1.0 on
+    `backtest.initial_equity`), the trade log with `symbol`, entry/exit
+    times, `qty` and cash `pnl`, and per-symbol trade metrics. Bars before
+    `start` only warm up the indicators. `sigs` are final (HTF-aligned)
+    signals; missing ones are computed with HTF bars resampled from `frames`.
+    `intrabar` settles bars that touch both take-profit and stop.
+    """
+    risk, u = cfg.risk, cfg.universe
+    t0 = to_market_ts(start)
+    syms: List[str] = []
+    bars: List[Dict[str, np.ndarray]] = []
+    tz = None
+    for sym, df in frames.items():
+        if df is None or df.empty or not illiquidity_pass(df, u.min_price, u.min_dollar_vol_20d):
+            continue
+        i0 = int(df.index.searchsorted(t0))
+        if i0 >= len(df):
+            continue
+        sig = sigs.get(sym) if sigs else None
+        if sig is None:
+            sig = align_htf(cfg, df, compute_signals(df, cfg))
+        w = df.iloc[i0:]
+        b = {c: w[c].to_numpy(dtype=np.float64) for c in ("open", "high", "low", "close")}
+        b["ts"] = w.index.asi8
+        b["atr"] = atr(df, 14).bfill().ffill().to_numpy(dtype=np.float64)[i0:]
+        b["spread"] = (b["high"] - b["low"]) / b["close"] * 10000.0   # estimate_spread_bps, per bar
+        long_ = sig.to_numpy()[i0:] == Signal.LONG
+        b["enter"] = np.r_[False, long_[:-1]]   # entries act on the prior bar's signal
+        syms.append(sym)
+        bars.append(b)
+        tz = tz or getattr(df.index, "tz", None)
+
+    ts, sk, bk = merged_timeline([b["ts"] for b in bars])
+    offs = np.r_[0, np.cumsum([len(b["ts"]) for b in bars])].astype(np.int64)
+    enter = np.concatenate([b["enter"] for b in bars] or [np.empty(0, dtype=bool)])[offs[sk] + bk]
+    cuts = np.flatnonzero(np.diff(ts)) + 1
+    lo_g, hi_g = (np.r_[0, cuts], np.r_[cuts, len(ts)]) if len(ts) else (cuts, cuts)
+
+    equity0 = float(cfg.backtest.initial_equity)
+    cost_mult = 1 + (risk.slippage_bps + risk.commission_bps) * 1e-4
+    cool_ns = int(risk.symbol_cooloff_min * 60 * 1e9)
+    cooloff = np.full(len(syms), np.iinfo(np.int64).min)
+    cursor = np.zeros(len(syms), dtype=np.int64)   # bars of each symbol seen so far
+    sym_no = {s: k for k, s in enumerate(syms)}
+    cash = equity0
+    held: Dict[int, Dict[str, Any]] = {}
+    trades: List[Dict[str, Any]] = []
+    eq_out = np.empty(len(lo_g))
+
+    for g in range(len(lo_g)):
+        a, z = lo_g[g], hi_g[g]
+        t = int(ts[a])
+        cursor[sk[a:z]] = bk[a:z] + 1
+
+        # 1) exits on this bar
+        for k in list(held):
+            i = cursor[k] - 1
+            b = bars[k]
+            if i < 0 or b["ts"][i] != t:
+                continue
+            p = held[k]
+            hit_tp, hit_stop = b["high"][i] >= p["tp"], b["low"][i] <= p["stop"]
+            if not (hit_tp or hit_stop):
+                continue
+            if hit_tp and hit_stop and intrabar is not None:
+                hit_tp = intrabar.first_touch(syms[k], np.array([t]), np.array([p["tp"]]),
+                                              np.array([p["stop"]]))[0] != FIRST_STOP
+            px = p["tp"] if hit_tp else p["stop"]
+            cash += p["qty"] * px
+            trades.append({
+                "symbol": syms[k], "side": "long", "entry_ts": p["entry_ts"], "exit_ts": t, "qty": p["qty"],
+                "entry": p["entry"], "exit": px, "R": (px - p["entry"]) / (p["entry"] - p["stop"]),
+                "pnl": p["qty"] * (px - p["entry"]),
+            })
+            del held[k]
+
+        # 2) entries on the prior bar's LONG signals, through the live limits
+        cands = sk[a:z][enter[a:z]]
+        if len(cands):
+            open_pos = {syms[k]: p["qty"] * p["mark"] for k, p in held.items()}
+            equity = cash + sum(open_pos.values())
+            allowed = enforce_portfolio_limits(cfg, open_pos, [syms[k] for k in cands.tolist()], equity)
+            for sym in allowed:
+                k = sym_no[sym]
+                if k in held or cooloff[k] >= t:
+                    continue
+                b, i = bars[k], cursor[k] - 1
+                entry = b["open"][i] * cost_mult
+                plan = plan_trade(cfg, entry, b["atr"][i - 1], b["spread"][i - 1], equity)
+                qty = min(plan.qty, int(cash // entry))
+                if qty <= 0 or qty * entry < risk.min_notional:
+                    continue
+                cash -= qty * entry
+                held[k] = {"qty": qty, "entry": entry, "stop": plan.stop_price, "tp": plan.take_profit,
+                           "entry_ts": t, "mark": entry}
+                cooloff[k] = t + cool_ns
+
+        # 3) mark to market at this bar's close
+        for k, p in held.items():
+            i = cursor[k] - 1
+            if i >= 0 and bars[k]["ts"][i] == t:
+                p["mark"] = bars[k]["close"][i]
+        eq_out[g] = (cash + sum(p["qty"] * p["mark"] for p in held.values())) / equity0
+
+    idx = pd.DatetimeIndex(ts[lo_g])
+    if tz is not None:
+        idx = idx.tz_localize("UTC").tz_convert(tz)
+    eq_total = pd.Series(eq_out, index=idx)
+    trade_log = pd.DataFrame(trades)
+    if not trade_log.empty:
+        for c in ("entry_ts", "exit_ts"):
+            stamps = pd.DatetimeIndex(trade_log[c].to_numpy(dtype="datetime64[ns]"))
+            trade_log[c] = stamps.tz_localize("UTC").tz_convert(tz) if tz is not None else stamps
+    return eq_total, trade_log, _per_symbol(syms, trade_log, equity0)
+
+
+def _per_symbol(syms: List[str], trade_log: pd.DataFrame, equity0: float) -> Dict[str, Dict[str, Any]]:
+    out: Dict[str, Dict[str, Any]] = {}
+    for sym in syms:
+        tl = trade_log[trade_log["symbol"] == sym] if not trade_log.empty else trade_log
+        r = tl["R"] if not tl.empty else pd.Series(dtype=float)
+        pos, neg = float(r[r > 0].sum()), float(r[r < 0].sum())
+        out[sym] = {
+            "trades": int(len(tl)),
+            "net_pnl": float(tl["pnl"].sum() / equity0) if not tl.empty else 0.0,   # share of starting capital
+            "hitrate": float((r > 0).sum() / len(r)) if len(r) else 0.0,
+            "profit_factor": pos / abs(neg) if neg != 0 else (pos if pos > 0 else 0.0),
+        }
+    return out
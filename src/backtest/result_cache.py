@@ -0,0 +1,111 @@
+"""
+Content-addressed store of per-symbol backtest results.
+
+A result is keyed by a hash of everything that can change it: the config
+sections the simulation reads, the symbol and date range, a fingerprint of
+the bars it ran on (warm-up included, and HTF bars when fetched separately)
+and the source of the `src` package.
+Entries are immutable -- a changed input is a different key -- so reads
+never need invalidation. Sparse equity curves (change points only) and
+trade logs are stored as parquet, one pair of files per key.
+"""
+import functools
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..bar_store import HAVE_PARQUET, OHLCV_COLS
+from ..config import Config
+from .equity import SparseEquity
+
+_CACHES: Dict[str, "ResultCache"] = {}
+
+
+@functools.lru_cache(maxsize=1)
+def code_version() -> str:
+    """Hash of every module under src/, so any code change invalidates cached results."""
+    root = Path(__file__).resolve().parents[1]
+    h = hashlib.sha256()
+    for p in sorted(root.rglob("*.py")):
+        h.update(p.relative_to(root).as_posix().encode())
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    h = hashlib.sha256()
+    if df is None or df.empty:
+        return "empty"
+    h.update(np.ascontiguousarray(df.index.asi8).tobytes())
+    for c in OHLCV_COLS:
+        if c in df.columns:
+            h.update(c.encode())
+            h.update(np.ascontiguousarray(df[c].to_numpy(dtype=np.float64)).tobytes())
+    return h.hexdigest()
+
+
+def result_key(cfg: Config, symbol: str, start: str, end: str, df: pd.DataFrame,
+               htf: Optional[pd.DataFrame] = None) -> str:
+    payload = {
+        "general": cfg.general.model_dump(),
+        "universe": cfg.universe.model_dump(),
+        "strategy": cfg.strategy.model_dump(),
+        "regime": cfg.regime.model_dump(),
+        "risk": cfg.risk.model_dump(),
+        "warmup_tol": cfg.perf.warmup_tol,
+        "intrabar": cfg.backtest.intrabar_timeframe,
+        "symbol": symbol, "start": str(start), "end": str(end),
+        "data": data_fingerprint(df),
+        "htf": None if htf is None else data_fingerprint(htf),   # only when fetched, not resampled
+        "code": code_version(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.hits = 0
+        self.misses = 0
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        d = self.root / key[:2]
+        return d / f"{key}.equity.parquet", d / f"{key}.trades.parquet"
+
+    def get(self, key: str) -> Optional[Tuple[SparseEquity, pd.DataFrame]]:
+        eq_p, tl_p = self._paths(key)
+        if not (eq_p.exists() and tl_p.exists()):
+            self.misses += 1
+            return None
+        try:
+            eq = SparseEquity.from_frame(pd.read_parquet(eq_p))
+            tl = pd.read_parquet(tl_p)
+        except Exception:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return eq, tl
+
+    def put(self, key: str, eq: SparseEquity, tl: pd.DataFrame) -> None:
+        eq_p, tl_p = self._paths(key)
+        eq_p.parent.mkdir(parents=True, exist_ok=True)
+        # equity last: get() needs both files, so an interrupted put reads as a miss
+        for frame, p in ((tl if tl is not None else pd.DataFrame(), tl_p), (eq.to_frame(), eq_p)):
+            tmp = p.with_suffix(".tmp")
+            frame.to_parquet(tmp)
+            os.replace(tmp, p)
+
+
+def get_result_cache(root: str) -> Optional[ResultCache]:
+    """Process-wide cache per root directory; None if disabled or parquet is unavailable."""
+    if not root or not HAVE_PARQUET:
+        return None
+    cache = _CACHES.get(root)
+    if cache is None:
+        cache = _CACHES[root] = ResultCache(root)
+    return cache
@@ -0,0 +1,215 @@
+"""
+Parameter sweep over StrategyCfg with shared indicators.
+
+Bars are loaded once for the whole grid. Each distinct indicator (an EMA
+length, an ADX/RSI length) is computed once per symbol and reused by every
+combination that needs it, and so is the HTF regime gate (no swept
+parameter changes it); threshold parameters (`adx_min`, `rsi_min`,
+`rsi_max`, `ema_slope_bps`) only change a vectorized comparison. The bar
+loop is the same `simulate_resolved` kernel `simulate_symbol` uses, so each
+row reproduces what `BacktestEngine.run` reports for that configuration.
+"""
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import yaml
+
+from ..bar_store import to_market_ts
+from ..config import Config
+from ..data import download_ohlc_many, illiquidity_pass
+from ..indicators import adx, atr, ema, ema_slope_bps, rsi
+from ..regime import htf_regime_gate
+from ..warmup import plan_fetch_starts
+from .engine import load_htf_frames, periods_per_year, simulate_resolved
+from .equity import SparseEquity, portfolio_mean
+from .intrabar import IntrabarResolver
+from .metrics import EquityStats, TradeStats, symbol_metrics
+
+INDICATOR_PARAMS = ("ema_fast", "ema_slow", "adx_len", "rsi_len")
+THRESHOLD_PARAMS = ("adx_min", "rsi_min", "rsi_max", "ema_slope_bps")
+METRICS = ("trades", "net_pnl", "hitrate", "profit_factor", "sharpe", "maxdd")
+
+
+def load_grid(path: str) -> Dict[str, List[Any]]:
+    """YAML mapping of StrategyCfg field -> list of values (a scalar is a one-value list)."""
+    with open(path, "r") as f:
+        raw = yaml.safe_load(f) or {}
+    raw = raw.get("strategy", raw)
+    return {k: v if isinstance(v, list) else [v] for k, v in raw.items()}
+
+
+def expand_grid(grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+    unknown = set(grid) - set(INDICATOR_PARAMS) - set(THRESHOLD_PARAMS)
+    if unknown:
+        raise ValueError(f"Unsupported sweep parameters: {sorted(unknown)}")
+    keys = list(grid)
+    return [dict(zip(keys, vals)) for vals in itertools.product(*(grid[k] for k in keys))]
+
+
+@dataclass
+class _SymbolData:
+    symbol: str
+    frame: pd.DataFrame   # full history incl. warm-up, for indicators
+    i0: int               # first bar of the trading window
+    index: pd.DatetimeIndex
+    o: np.ndarray
+    h: np.ndarray
+    lo: np.ndarray
+    atr: np.ndarray
+    gate: Optional[np.ndarray]   # HTF regime per bar, None when alignment is off
+
+
+Window = Optional[Tuple[pd.Timestamp, pd.Timestamp]]
+
+
+class SweepRunner:
+    def __init__(self, cfg: Config, frames: Dict[str, pd.DataFrame], start: str,
+                 htf: Optional[Dict[str, pd.DataFrame]] = None):
+        """`htf`: fetched HTF bars (see `load_htf_frames`); by default the gate resamples `frames`."""
+        self.cfg = cfg
+        # finer bars are kept per session, so every combination reuses what earlier ones fetched
+        self.intrabar = IntrabarResolver(cfg) if cfg.backtest.intrabar_timeframe else None
+        self._ind: Dict[Tuple[str, str, int], np.ndarray] = {}
+        self.symbols: List[_SymbolData] = []
+        t0 = to_market_ts(start)
+        u = cfg.universe
+        for sym, df in frames.items():
+            if df is None or df.empty or not illiquidity_pass(df, u.min_price, u.min_dollar_vol_20d):
+                continue
+            i0 = int(df.index.searchsorted(t0))
+            if i0 >= len(df):
+                continue
+            w = df.iloc[i0:]
+            a = atr(df, 14).bfill().ffill().to_numpy(dtype=np.float64)[i0:]
+            gate = None
+            if cfg.strategy.htf_align_required:
+                gate = htf_regime_gate(cfg, df, htf.get(sym, pd.DataFrame()) if htf else None)[i0:]
+            self.symbols.append(_SymbolData(
+                sym, df, i0, w.index,
+                *(np.ascontiguousarray(w[c].to_numpy(dtype=np.float64)) for c in ("open", "high", "low")),
+                np.ascontiguousarray(a), gate,
+            ))
+        self._windows: Dict[Window, Tuple[List[Tuple[_SymbolData, int, int]], pd.DatetimeIndex]] = {}
+
+    @property
+    def indicators_computed(self) -> int:
+        return len(self._ind)
+
+    def _full(self, s: _SymbolData, name: str, length: int) -> pd.Series:
+        df = s.frame
+        if name == "ema":
+            return ema(df["close"], length)
+        if name == "slope":
+            return ema_slope_bps(ema(df["close"], length), 3)
+        if name == "adx":
+            return adx(df, length)[0]
+        return rsi(df["close"], length)
+
+    def _get(self, s: _SymbolData, name: str, length: int) -> np.ndarray:
+        key = (s.symbol, name, length)
+        out = self._ind.get(key)
+        if out is None:
+            # indicators run over the warm-up too; only the trading window is compared
+            out = self._ind[key] = self._full(s, name, length).to_numpy(dtype=np.float64)[s.i0:]
+        return out
+
+    def prepare(self, combos: List[Dict[str, Any]]) -> None:
+        """Compute every indicator the grid needs up front (e.g. before forking workers)."""
+        for p in combos:
+            st = self.cfg.strategy.model_copy(update=p)
+            for s in self.symbols:
+                for name, n in (("ema", st.ema_fast), ("ema", st.ema_slow), ("slope", st.ema_fast),
+                                ("adx", st.adx_len), ("rsi", st.rsi_len)):
+                    self._get(s, name, n)
+
+    def _window(self, window: Window):
+        """Per-symbol [a, b) bar ranges inside `window` and their union index."""
+        got = self._windows.get(window)
+        if got is None:
+            spans = []
+            for s in self.symbols:
+                a, b = (0, len(s.index)) if window is None else (
+                    int(s.index.searchsorted(window[0])), int(s.index.searchsorted(window[1])))
+                if b > a:
+                    spans.append((s, a, b))
+            if spans:
+                idx = [s.index[a:b] for s, a, b in spans]
+                # Portfolio equity in `run` is the mean of per-symbol curves forward-filled on the union index
+                union = idx[0].append(idx[1:]).unique().sort_values()
+            else:
+                union = pd.DatetimeIndex([])
+            got = self._windows[window] = (spans, union)
+        return got
+
+    def equity(self, params: Dict[str, Any], window: Window = None) -> Tuple[pd.Series, Dict[str, Any]]:
+        """Portfolio equity curve and metrics for one parameter set, optionally within [t0, t1)."""
+        st = self.cfg.strategy.model_copy(update=params)
+        risk = self.cfg.risk
+        cost = float(1 + (risk.slippage_bps + risk.commission_bps) * 1e-4)
+        spans, union = self._window(window)
+        curves, rs = [], []
+        with np.errstate(invalid="ignore"):
+            for s, a, b in spans:
+                r = self._get(s, "rsi", st.rsi_len)[a:b]
+                longs = (
+                    (self._get(s, "ema", st.ema_fast)[a:b] > self._get(s, "ema", st.ema_slow)[a:b])
+                    & (self._get(s, "adx", st.adx_len)[a:b] >= st.adx_min)
+                    & (r >= st.rsi_min) & (r <= st.rsi_max)
+                    & (self._get(s, "slope", st.ema_fast)[a:b] >= st.ema_slope_bps)
+                )
+                if s.gate is not None:
+                    longs &= s.gate[a:b]
+                eq, _, _, r_arr, n = simulate_resolved(
+                    s.o[a:b], s.h[a:b], s.lo[a:b], np.ascontiguousarray(longs), s.atr[a:b], cost,
+                    float(risk.atr_k_stop), float(risk.take_profit_R),
+                    s.index[a:b], self.intrabar.for_symbol(s.symbol) if self.intrabar is not None else None,
+                )
+                curves.append(SparseEquity.from_dense(eq, s.index[a:b]))
+                rs.append(r_arr[:n])
+        if not curves:
+            return pd.Series(dtype=float), self._summarize(np.empty(0), np.empty(0))
+        eq_total = portfolio_mean(curves, union)
+        return eq_total, self._summarize(eq_total.to_numpy(), np.concatenate(rs))
+
+    def evaluate(self, params: Dict[str, Any], window: Window = None) -> Dict[str, Any]:
+        return {**params, **self.equity(params, window)[1]}
+
+    def _summarize(self, eq_total: np.ndarray, r: np.ndarray) -> Dict[str, Any]:
+        eq_stats, trade_stats = EquityStats(periods_per_year(self.cfg)), TradeStats()
+        eq_stats.update_many(eq_total)
+        trade_stats.update_many(r)
+        return symbol_metrics(eq_stats, trade_stats)
+
+    def run(self, combos: List[Dict[str, Any]], rank_by: str = "sharpe", window: Window = None) -> pd.DataFrame:
+        rows = [self.evaluate(p, window) for p in combos]
+        out = pd.DataFrame(rows)
+        if out.empty:
+            return out
+        return out.sort_values(rank_by, ascending=False, kind="stable").reset_index(drop=True)
+
+
+def _warmup_cfg(cfg: Config, combos: List[Dict[str, Any]]) -> Config:
+    """Config with the longest indicator lengths in the grid, for sizing the warm-up."""
+    longest = {k: max([c[k] for c in combos if k in c] + [getattr(cfg.strategy, k)]) for k in INDICATOR_PARAMS}
+    return cfg.model_copy(update={"strategy": cfg.strategy.model_copy(update=longest)})
+
+
+def load_frames(cfg: Config, tickers: List[str], start: str, end: str,
+                combos: List[Dict[str, Any]]) -> Dict[str, pd.DataFrame]:
+    """One download for the whole grid, warmed up for its longest indicator lengths (and the HTF regime)."""
+    fetch_from = plan_fetch_starts(_warmup_cfg(cfg, combos), start)["base"]
+    return download_ohlc_many(tickers, fetch_from.strftime("%Y-%m-%d"), end, cfg.general.bar_timeframe, cfg)
+
+
+def run_sweep(
+    cfg: Config, tickers: List[str], start: str, end: str, grid: Dict[str, List[Any]],
+    rank_by: str = "sharpe", frames: Optional[Dict[str, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """Ranked results table, one row per grid combination (best first by `rank_by`)."""
+    combos = expand_grid(grid)
+    if frames is None:
+        frames = load_frames(cfg, tickers, start, end, combos)
+    return SweepRunner(cfg, frames, start, load_htf_frames(cfg, tickers, start, end)).run(combos, rank_by)
@@ -0,0 +1,99 @@
+"""
+Walk-forward optimization: slide a train window and the test window that
+follows it across the date range, pick the best grid combination in each
+train window and run it on the next test window.
+
+Bars are loaded once and every indicator is computed once over the full
+span (`SweepRunner.prepare`); windows only slice those arrays. Windows are
+independent and run on a process pool; the out-of-sample curves are
+chained into one stitched equity series.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from ..bar_store import to_market_ts
+from ..config import Config
+from .engine import load_htf_frames
+from .sweep import SweepRunner, expand_grid, load_frames
+
+_runner: Dict[str, Any] = {}
+
+
+@dataclass
+class WalkForwardResult:
+    windows: pd.DataFrame   # one row per window: bounds, chosen params, train score, test metrics
+    equity: pd.Series       # stitched out-of-sample equity (base=1.0)
+
+
+def make_windows(start: str, end: str, train_days: int, test_days: int,
+                 step_days: Optional[int] = None) -> List[Tuple[pd.Timestamp, ...]]:
+    """[(train_start, train_end, test_start, test_end), ...]; ends are exclusive, calendar days."""
+    step_days = step_days or test_days
+    if step_days < test_days:
+        raise ValueError("step_days < test_days would overlap test windows")
+    t0, t_end = to_market_ts(start), to_market_ts(end)
+    out = []
+    while True:
+        train_end = t0 + pd.Timedelta(days=train_days)
+        test_end = train_end + pd.Timedelta(days=test_days)
+        if test_end > t_end + pd.Timedelta(days=1):
+            break
+        out.append((t0, train_end, train_end, test_end))
+        t0 = t0 + pd.Timedelta(days=step_days)
+    return out
+
+
+def _init_worker(runner: SweepRunner) -> None:
+    _runner["r"] = runner
+
+
+def _run_window(task) -> Tuple[Dict[str, Any], pd.Series]:
+    k, (tr0, tr1, te0, te1), combos, rank_by = task
+    runner: SweepRunner = _runner["r"]
+    train = runner.run(combos, rank_by, window=(tr0, tr1))
+    params = {c: train.iloc[0][c] for c in combos[0]} if not train.empty and combos[0] else {}
+    params = {c: v.item() if hasattr(v, "item") else v for c, v in params.items()}
+    eq, test = runner.equity(params, window=(te0, te1))
+    row = {
+        "window": k, "train_start": tr0, "train_end": tr1, "test_start": te0, "test_end": te1,
+        **params, f"train_{rank_by}": float(train.iloc[0][rank_by]) if not train.empty else float("nan"),
+        **{f"test_{m}": v for m, v in test.items()},
+    }
+    return row, eq
+
+
+def stitch(curves: List[pd.Series]) -> pd.Series:
+    """Chain per-window curves (each base=1.0) into one compounding equity series."""
+    parts, level = [], 1.0
+    for eq in curves:
+        if eq.empty:
+            continue
+        parts.append(eq * level)
+        level *= float(eq.iloc[-1])
+    return pd.concat(parts) if parts else pd.Series(dtype=float)
+
+
+def run_walk_forward(
+    cfg: Config, tickers: List[str], start: str, end: str, grid: Dict[str, List[Any]],
+    train_days: int, test_days: int, step_days: Optional[int] = None, rank_by: str = "sharpe",
+    workers: int = 1, frames: Optional[Dict[str, pd.DataFrame]] = None,
+) -> WalkForwardResult:
+    combos = expand_grid(grid)
+    windows = make_windows(start, end, train_days, test_days, step_days)
+    if frames is None:
+        frames = load_frames(cfg, tickers, start, end, combos)
+    runner = SweepRunner(cfg, frames, start, load_htf_frames(cfg, tickers, start, end))
+    runner.prepare(combos)
+    tasks = [(k, w, combos, rank_by) for k, w in enumerate(windows)]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_worker,
+                                 initargs=(runner,)) as ex:
+            results = list(ex.map(_run_window, tasks))
+    else:
+        _init_worker(runner)
+        results = [_run_window(t) for t in tasks]
+    rows = pd.DataFrame([r for r, _ in results])
+    return WalkForwardResult(rows, stitch([eq for _, eq in results]))
@@ -0,0 +1,203 @@
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+# Parquet needs pyarrow; without it the store is simply unavailable
+try:
+    import pyarrow  # noqa
+    HAVE_PARQUET = True
+except Exception:
+    HAVE_PARQUET = False
+
+MARKET_TZ = "America/New_York"
+OHLCV_COLS = ["open", "high", "low", "close", "volume"]
+
+
+def to_market_ts(value) -> pd.Timestamp:
+    """Naive values are read as exchange-local time; aware values are converted."""
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize(MARKET_TZ)
+    return ts.tz_convert(MARKET_TZ)
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [c for c in OHLCV_COLS if c in df.columns]
+    out = df[cols].astype("float64")
+    idx = pd.DatetimeIndex(out.index)
+    idx = idx.tz_localize(MARKET_TZ) if idx.tz is None else idx.tz_convert(MARKET_TZ)
+    out.index = idx.rename("timestamp")
+    out = out[~out.index.duplicated(keep="last")]
+    return out if out.index.is_monotonic_increasing else out.sort_index()
+
+
+class BarStore:
+    """
+    Local OHLCV cache, one parquet file per (symbol, timeframe, session day):
+
+        <root>/<SYMBOL>/<timeframe>/<YYYY-MM-DD>.parquet
+
+    Each (symbol, timeframe) directory also keeps a `_manifest.json` with the
+    span already requested from the provider, so callers can tell "no bars
+    exist there" (holiday, weekend) apart from "never asked".
+
+    Day files are immutable once a session is over; recently read frames are
+    kept in a small in-memory LRU so a live loop doesn't re-read parquet
+    every cycle. A cached frame keeps every day read into it, so one-off
+    scans over long spans read with `cache=False`.
+    """
+
+    def __init__(self, root: str, max_cached_frames: int = 256):
+        self.root = Path(root)
+        self.max_cached_frames = max_cached_frames
+        # (symbol, timeframe) -> (frame of loaded days, set of loaded day keys)
+        self._mem: "OrderedDict[Tuple[str, str], Tuple[pd.DataFrame, set]]" = OrderedDict()
+
+    # ---------- layout ----------
+    def _dir(self, symbol: str, timeframe: str) -> Path:
+        return self.root / symbol.upper() / timeframe.lower()
+
+    def _manifest_path(self, symbol: str, timeframe: str) -> Path:
+        return self._dir(symbol, timeframe) / "_manifest.json"
+
+    def _day_path(self, symbol: str, timeframe: str, day: str) -> Path:
+        return self._dir(symbol, timeframe) / f"{day}.parquet"
+
+    # ---------- manifest ----------
+    def coverage(self, symbol: str, timeframe: str) -> Optional[Tuple[pd.Timestamp, pd.Timestamp]]:
+        p = self._manifest_path(symbol, timeframe)
+        if not p.exists():
+            return None
+        try:
+            meta = json.loads(p.read_text())
+            return to_market_ts(meta["start"]), to_market_ts(meta["end"])
+        except Exception:
+            return None
+
+    def _set_coverage(self, symbol: str, timeframe: str, start: pd.Timestamp, end: pd.Timestamp) -> None:
+        p = self._manifest_path(symbol, timeframe)
+        tmp = p.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"start": start.isoformat(), "end": end.isoformat()}))
+        os.replace(tmp, p)
+
+    def last_timestamp(self, symbol: str, timeframe: str) -> Optional[pd.Timestamp]:
+        days = self._days_on_disk(symbol, timeframe)
+        if not days:
+            return None
+        df = self._load_days(symbol, timeframe, [days[-1]])
+        return df.index[-1] if not df.empty else None
+
+    def missing_from(self, symbol: str, timeframe: str, start, end, now=None) -> Optional[pd.Timestamp]:
+        """
+        Return where a provider fetch for [start, end] has to begin, or None
+        if the store already covers the span. The last stored bar is always
+        re-requested so a bar that was still forming gets replaced.
+        """
+        start, end = to_market_ts(start), to_market_ts(end)
+        cov = self.coverage(symbol, timeframe)
+        if cov is None or start < cov[0]:
+            return start
+        if end <= cov[1]:
+            return None
+        last = self.last_timestamp(symbol, timeframe)
+        return max(start, last if last is not None else cov[1])
+
+    # ---------- io ----------
+    def _days_on_disk(self, symbol: str, timeframe: str):
+        d = self._dir(symbol, timeframe)
+        if not d.exists():
+            return []
+        return sorted(p.stem for p in d.glob("*.parquet"))
+
+    def _load_days(self, symbol: str, timeframe: str, days) -> pd.DataFrame:
+        key = (symbol.upper(), timeframe.lower())
+        frame, loaded = self._mem.get(key, (pd.DataFrame(columns=OHLCV_COLS), set()))
+        todo = [d for d in days if d not in loaded]
+        if todo:
+            parts = [frame] if not frame.empty else []
+            for day in todo:
+                p = self._day_path(symbol, timeframe, day)
+                if p.exists():
+                    parts.append(pd.read_parquet(p))
+            frame = _normalize(pd.concat(parts)) if parts else frame
+            loaded = loaded | set(todo)
+        self._remember(key, frame, loaded)
+        return frame
+
+    def _read_days(self, symbol: str, timeframe: str, days) -> pd.DataFrame:
+        """`days` from disk, bypassing the LRU."""
+        parts = [pd.read_parquet(p) for p in (self._day_path(symbol, timeframe, d) for d in days) if p.exists()]
+        return _normalize(pd.concat(parts)) if parts else pd.DataFrame(columns=OHLCV_COLS)
+
+    def _remember(self, key, frame: pd.DataFrame, loaded: set) -> None:
+        self._mem[key] = (frame, loaded)
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_cached_frames:
+            self._mem.popitem(last=False)
+
+    def read(self, symbol: str, timeframe: str, start=None, end=None, cache: bool = True) -> pd.DataFrame:
+        """Stored bars in [start, end]; `cache=False` leaves the in-memory LRU untouched."""
+        days = self._days_on_disk(symbol, timeframe)
+        if start is not None:
+            s = to_market_ts(start).strftime("%Y-%m-%d")
+            days = [d for d in days if d >= s]
+        if end is not None:
+            e = to_market_ts(end).strftime("%Y-%m-%d")
+            days = [d for d in days if d <= e]
+        if not days:
+            return pd.DataFrame()
+        df = self._load_days(symbol, timeframe, days) if cache else self._read_days(symbol, timeframe, days)
+        lo = to_market_ts(start) if start is not None else None
+        hi = to_market_ts(end) if end is not None else None
+        return df.loc[lo:hi]
+
+    def write(self, symbol: str, timeframe: str, df: pd.DataFrame, covered_start=None, covered_end=None) -> None:
+        """
+        Merge `df` into the day files (new rows win on duplicate timestamps)
+        and extend the manifest by [covered_start, covered_end] when given.
+        """
+        d = self._dir(symbol, timeframe)
+        d.mkdir(parents=True, exist_ok=True)
+        key = (symbol.upper(), timeframe.lower())
+
+        if df is not None and not df.empty:
+            new = _normalize(df)
+            for day, part in new.groupby(new.index.strftime("%Y-%m-%d")):
+                p = self._day_path(symbol, timeframe, day)
+                if p.exists():
+                    old = pd.read_parquet(p)
+                    part = _normalize(pd.concat([old, part]))
+                tmp = p.with_suffix(".tmp")
+                part.to_parquet(tmp)
+                os.replace(tmp, p)
+            # keep the hot frame consistent with disk
+            if key in self._mem:
+                frame, loaded = self._mem[key]
+                frame = _normalize(pd.concat([frame, new])) if not frame.empty else new
+                loaded = loaded | set(new.index.strftime("%Y-%m-%d"))
+                self._remember(key, frame, loaded)
+
+        if covered_start is not None and covered_end is not None:
+            cs, ce = to_market_ts(covered_start), to_market_ts(covered_end)
+            cov = self.coverage(symbol, timeframe)
+            # only union spans that touch; otherwise the gap would be lost
+            if cov is not None and cs <= cov[1] and ce >= cov[0]:
+                cs, ce = min(cs, cov[0]), max(ce, cov[1])
+            self._set_coverage(symbol, timeframe, cs, ce)
+
+
+_STORES: Dict[str, BarStore] = {}
+
+
+def get_bar_store(root: str) -> Optional[BarStore]:
+    """Process-wide store per root directory; None if disabled or parquet is unavailable."""
+    if not root or not HAVE_PARQUET:
+        return None
+    store = _STORES.get(root)
+    if store is None:
+        store = _STORES[root] = BarStore(root)
+    return store
@@ -4,6 +4,7 @@ from alpaca.trading.client import TradingClient
 from alpaca.trading.requests import MarketOrderRequest, TakeProfitRequest, StopLossRequest
 from alpaca.trading.enums import OrderSide, TimeInForce
 from .base import BrokerBase
+from ..instrument import watch_session
 
 def _time_in_force(tif: str):
     tif = tif.lower()
@@ -28,6 +29,7 @@ class AlpacaBroker(BrokerBase):
     def __init__(self):
         key, sec, base = _read_alpaca_credentials()
         self.tc = TradingClient(api_key=key, secret_key=sec, paper=("paper" in base.lower()))
+        watch_session(getattr(self.tc, "_session", None), "broker")
         self.locked = False
 
     def account_equity(self) -> float:
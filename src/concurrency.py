@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: `rate_per_min` tokens refill continuously,
+    up to `burst` banked. `acquire()` blocks until a token is available.
+    A non-positive rate disables limiting.
+    """
+
+    def __init__(self, rate_per_min: float, burst: Optional[int] = None):
+        self.rate = max(0.0, float(rate_per_min)) / 60.0
+        self.capacity = float(burst if burst is not None else max(1, int(rate_per_min // 10) or 1))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens`, sleeping as needed. Returns the time spent waiting."""
+        if self.rate <= 0:
+            return 0.0
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+def map_ordered(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    workers: int = 1,
+    limiter: Optional[TokenBucket] = None,
+) -> List[Tuple[Any, Any, Optional[BaseException]]]:
+    """
+    Run `fn(item)` over `items` on a thread pool and return
+    [(item, result, error), ...] in input order. An exception in one item
+    is captured in its `error` slot instead of failing the batch.
+    """
+    items = list(items)
+
+    def _call(item):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            return fn(item), None
+        except Exception as e:
+            return None, e
+
+    if workers <= 1 or len(items) <= 1:
+        results = [_call(it) for it in items]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(items))) as ex:
+            results = list(ex.map(_call, items))
+    return [(it, res, err) for it, (res, err) in zip(items, results)]
@@ -26,6 +26,7 @@ class StrategyCfg(BaseModel):
     rsi_min: float = 50.0
     rsi_max: float = 75.0
     htf_align_required: bool = True
+    signal_engine: str = "batch"   # "batch" | "stream" (per-symbol O(1) updates) | "panel" (whole universe as arrays)
 
 class RegimeCfg(BaseModel):
     trend_adx_min: float = 20.0
@@ -64,6 +65,31 @@ class ReportingCfg(BaseModel):
     slack_webhook: str = ""
     outdir: str = "reports"
 
+class DataCfg(BaseModel):
+    provider: str = "auto"
+    http_proxy: str = ""
+    https_proxy: str = ""
+    store_dir: str = "data/bars"   # local parquet bar store; "" disables it
+    batch_size: int = 50           # symbols per multi-symbol bars request
+    fetch_workers: int = 4         # concurrent provider requests
+    alpaca_rate_limit_per_min: float = 200.0
+    yahoo_rate_limit_per_min: float = 60.0
+
+class BacktestCfg(BaseModel):
+    workers: int = 1   # processes for BacktestEngine.run; 1 = serial
+    result_cache_dir: str = "data/backtest_cache"   # per-symbol result cache; "" disables it
+    chunk_days: int = 0   # >0: stream the range in chunks of this many days (bounded memory)
+    portfolio: bool = False   # one merged timeline with shared capital and the live portfolio limits
+    initial_equity: float = 100_000.0   # starting capital of the portfolio simulation
+    intrabar_timeframe: str = ""   # e.g. "1m": settle bars touching both TP and stop from finer bars; "" = TP first
+
+class PerfCfg(BaseModel):
+    indicator_cache_mb: float = 64.0   # shared indicator memo (LRU); 0 disables it
+    warmup_tol: float = 0.01           # EMA seed weight left when counted as converged (sizes lookback)
+    metrics_file: str = "logs/cycle_metrics.jsonl"   # per-cycle timings + p50/p95/p99; "" disables
+    metrics_file_mb: float = 10.0      # rotate the metrics file at this size
+    metrics_file_backups: int = 3
+
 class Config(BaseModel):
     general: GeneralCfg
     universe: UniverseCfg
@@ -73,6 +99,9 @@ class Config(BaseModel):
     portfolio: PortfolioCfg
     execution: ExecutionCfg
     reporting: ReportingCfg
+    data: DataCfg = DataCfg()
+    perf: PerfCfg = PerfCfg()
+    backtest: BacktestCfg = BacktestCfg()
 
 def load_config(path: str) -> Config:
     with open(path, "r") as f:
@@ -1,7 +1,15 @@
 import os
-from typing import Optional
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 import pandas as pd
 from .config import Config
+from .bar_store import get_bar_store, to_market_ts
+from .concurrency import TokenBucket, map_ordered
+from .instrument import count_call, watch_session
+from .logging_utils import get_logger
+
+_log = get_logger("data")
 
 # Optional yfinance fallback
 try:
@@ -10,6 +18,10 @@ try:
 except Exception:
     HAVE_YF = False
 
+# yf.download resets and reads module-global result dicts (yfinance 0.2.x),
+# so concurrent calls clear each other's results; one call at a time
+_YF_LOCK = threading.Lock()
+
 # Alpaca Market Data
 try:
     from alpaca.data.historical import StockHistoricalDataClient
@@ -30,6 +42,9 @@ def _alpaca_timeframe(tf_str: str):
     tf_str = tf_str.strip().lower()
     if tf_str.endswith("m"):
         n = int(tf_str[:-1])
+        # Alpaca only takes 1-59 minutes; express 60m/120m/... in hours
+        if n >= 60 and n % 60 == 0:
+            return TimeFrame(n // 60, TimeFrameUnit.Hour)
         return TimeFrame(n, TimeFrameUnit.Minute)
     if tf_str.endswith("h"):
         n = int(tf_str[:-1])
@@ -39,47 +54,80 @@ def _alpaca_timeframe(tf_str: str):
     return TimeFrame(15, TimeFrameUnit.Minute)
 
 
-def _download_alpaca(symbol: str, start: str, end: str, tf_str: str) -> pd.DataFrame:
-    key = os.getenv("ALPACA_KEY") or os.getenv("APCA_API_KEY_ID")
-    sec = os.getenv("ALPACA_SECRET") or os.getenv("APCA_API_SECRET_KEY")
+_CLIENT = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def _alpaca_client():
+    """One StockHistoricalDataClient per process so its HTTP session (and connection pool) is reused."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            key = os.getenv("ALPACA_KEY") or os.getenv("APCA_API_KEY_ID")
+            sec = os.getenv("ALPACA_SECRET") or os.getenv("APCA_API_SECRET_KEY")
+            # raw_data skips the SDK's per-bar pydantic models; see _raw_bars_to_frame
+            _CLIENT = StockHistoricalDataClient(api_key=key, secret_key=sec, raw_data=True)
+            watch_session(getattr(_CLIENT, "_session", None), "alpaca")
+        return _CLIENT
+
 
-    client = StockHistoricalDataClient(api_key=key, secret_key=sec)
-    tf = _alpaca_timeframe(tf_str)
+_RAW_FIELDS = (("o", "open"), ("h", "high"), ("l", "low"), ("c", "close"), ("v", "volume"))
 
+
+def _raw_bars_to_frame(rows: List[dict]) -> pd.DataFrame:
+    """
+    Decode raw Alpaca bar dicts ({"t","o","h","l","c","v",...}) straight
+    into one preallocated (5, n) float64 block and wrap it without copying:
+    no per-bar model objects, no rename pass, no re-indexing copies.
+    """
+    n = len(rows)
+    if n == 0:
+        return pd.DataFrame()
+    block = np.empty((len(_RAW_FIELDS), n), dtype=np.float64)
+    for j, (key, _) in enumerate(_RAW_FIELDS):
+        block[j] = np.fromiter((r[key] for r in rows), dtype=np.float64, count=n)
+    idx = pd.DatetimeIndex(pd.to_datetime([r["t"] for r in rows], utc=True, format="ISO8601"), name="timestamp")
+    idx = idx.tz_convert("America/New_York")  # relabels tz, same int64 buffer
+
+    # Block is (columns, rows); its transpose is exactly pandas' internal layout
+    df = pd.DataFrame(block.T, index=idx, columns=[name for _, name in _RAW_FIELDS], copy=False)
+    if not idx.is_monotonic_increasing:
+        df = df.sort_index()
+    if np.isnan(block).any():
+        df = df.dropna()
+    return df
+
+
+def _download_alpaca_many(symbols: List[str], start, end, tf_str: str) -> Dict[str, pd.DataFrame]:
+    """
+    One multi-symbol StockBarsRequest. The SDK follows `next_page_token`
+    until the whole span is returned, so a chunk costs one round-trip per
+    10k bars rather than one per symbol.
+    """
     req = StockBarsRequest(
-        symbol_or_symbols=symbol,
-        timeframe=tf,
-        start=pd.Timestamp(start).tz_localize("America/New_York"),
-        end=pd.Timestamp(end).tz_localize("America/New_York"),
+        symbol_or_symbols=list(symbols),
+        timeframe=_alpaca_timeframe(tf_str),
+        start=to_market_ts(start),
+        end=to_market_ts(end),
         adjustment=None,
         limit=None,
         feed="iex",  # free feed for paper
     )
-    bars = client.get_stock_bars(req)
-    if symbol not in bars.data:
-        return pd.DataFrame()
+    raw = _alpaca_client().get_stock_bars(req)
+    return {sym: _raw_bars_to_frame(raw[sym]) for sym in symbols if raw.get(sym)}
 
-    df = pd.DataFrame([b.__dict__ for b in bars.data[symbol]])
-    # Normalize
-    rename_map = {"o": "open", "h": "high", "l": "low", "c": "close", "v": "volume", "t": "timestamp"}
-    for src, dst in rename_map.items():
-        if src in df.columns and dst not in df.columns:
-            df[dst] = df[src]
 
-    if "timestamp" in df.columns:
-        df = df.set_index(pd.to_datetime(df["timestamp"], utc=True)).tz_convert("America/New_York")
-        df = df.drop(columns=[c for c in ["timestamp"] if c in df.columns])
-
-    cols = [c for c in ["open", "high", "low", "close", "volume"] if c in df.columns]
-    df = df[cols].sort_index()
-    return df.dropna()
+def _download_alpaca(symbol: str, start: str, end: str, tf_str: str) -> pd.DataFrame:
+    return _download_alpaca_many([symbol], start, end, tf_str).get(symbol, pd.DataFrame())
 
 
-def _download_yahoo(symbol: str, start: str, end: str, tf_str: str, proxies: Optional[dict] = None) -> pd.DataFrame:
+def _fetch_yahoo(symbol: str, start: str, end: str, tf_str: str, proxies: Optional[dict] = None) -> pd.DataFrame:
+    """`_download_yahoo` that raises instead of returning an empty frame on failure."""
     if not HAVE_YF:
-        return pd.DataFrame()
+        raise RuntimeError("yfinance is not installed")
     interval = tf_str.lower()
-    try:
+    count_call("yahoo")   # yfinance does not expose its responses; calls only
+    with _YF_LOCK:
         df = yf.download(
             symbol,
             start=start,
@@ -90,17 +138,22 @@ def _download_yahoo(symbol: str, start: str, end: str, tf_str: str, proxies: Opt
             threads=False,
             proxies=proxies or None,
         )
-        if df is None or df.empty:
-            return pd.DataFrame()
-        df = df.rename(columns=str.lower)
-        if "adj close" in df.columns:
-            df = df.drop(columns=["adj close"])
-        return df.dropna()
+    if df is None or df.empty:
+        return pd.DataFrame()
+    df = df.rename(columns=str.lower)
+    if "adj close" in df.columns:
+        df = df.drop(columns=["adj close"])
+    return df.dropna()
+
+
+def _download_yahoo(symbol: str, start: str, end: str, tf_str: str, proxies: Optional[dict] = None) -> pd.DataFrame:
+    try:
+        return _fetch_yahoo(symbol, start, end, tf_str, proxies)
     except Exception:
         return pd.DataFrame()
 
 
-def download_ohlc(symbol: str, start: str, end: str, interval: str, cfg: Optional[Config] = None) -> pd.DataFrame:
+def _provider_opts(cfg: Optional[Config]):
     provider = "auto"
     proxies = None
     if cfg is not None and hasattr(cfg, "data") and cfg.data is not None:
@@ -113,20 +166,132 @@ def download_ohlc(symbol: str, start: str, end: str, interval: str, cfg: Optiona
                 proxies["http"] = http_proxy
             if https_proxy:
                 proxies["https"] = https_proxy
+    return provider, proxies
+
+
+def _store_for(cfg: Optional[Config]):
+    if cfg is None or getattr(cfg, "data", None) is None:
+        return None
+    return get_bar_store(getattr(cfg.data, "store_dir", "") or "")
+
+
+_LIMITERS: Dict[Tuple[str, float], TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def _limiter(provider: str, rate_per_min: float) -> TokenBucket:
+    """Process-wide bucket per provider so concurrent callers share one budget."""
+    with _LIMITERS_LOCK:
+        key = (provider, float(rate_per_min))
+        if key not in _LIMITERS:
+            _LIMITERS[key] = TokenBucket(rate_per_min)
+        return _LIMITERS[key]
+
+
+def _fetch_opts(cfg: Optional[Config]):
+    d = getattr(cfg, "data", None)
+    batch_size = max(1, int(getattr(d, "batch_size", 50) or 50))
+    workers = max(1, int(getattr(d, "fetch_workers", 4) or 1))
+    alpaca_rate = float(getattr(d, "alpaca_rate_limit_per_min", 200) or 0)
+    yahoo_rate = float(getattr(d, "yahoo_rate_limit_per_min", 60) or 0)
+    return batch_size, workers, alpaca_rate, yahoo_rate
+
+
+def _download_many(jobs: List[Tuple[List[str], Any]], end, interval: str, provider: str,
+                   proxies: Optional[dict], cfg: Optional[Config]) -> Dict[str, Tuple[Any, pd.DataFrame]]:
+    """
+    Fetch every (symbols, start) job up to `end` on a rate-limited thread
+    pool. Alpaca jobs are chunked into multi-symbol requests; symbols it
+    did not return fall back to Yahoo one by one, on a single worker. A failing request only
+    loses its own symbols. Returns {symbol: (start, frame)} for every
+    symbol whose request succeeded; the frame is empty when the provider
+    has no bars in the span (holiday, weekend), which is still coverage.
+    """
+    batch_size, workers, alpaca_rate, yahoo_rate = _fetch_opts(cfg)
+    out: Dict[str, Tuple[Any, pd.DataFrame]] = {}
+    start_of = {sym: start for syms, start in jobs for sym in syms}
 
-    # 1) Alpaca if allowed & available
     if provider in ("auto", "alpaca") and HAVE_ALPACA_DATA and _has_alpaca_creds():
-        df = _download_alpaca(symbol, start, end, interval)
-        if not df.empty:
-            return df
+        chunks = [(syms[i:i + batch_size], start) for syms, start in jobs for i in range(0, len(syms), batch_size)]
+        results = map_ordered(
+            lambda job: _download_alpaca_many(job[0], job[1], end, interval),
+            chunks, workers, _limiter("alpaca", alpaca_rate),
+        )
+        for (syms, start), got, err in results:
+            if err is not None:
+                _log.warning({"event": "fetch_error", "provider": "alpaca", "symbols": syms, "error": str(err)})
+                continue
+            out.update({s: (start, got.get(s, pd.DataFrame())) for s in syms})
 
-    # 2) Yahoo fallback
+    # Yahoo has no multi-symbol bar endpoint worth using here; fall back per symbol,
+    # serially since yfinance calls are serialized anyway (see _YF_LOCK)
     if provider in ("auto", "yahoo"):
-        df = _download_yahoo(symbol, start, end, interval, proxies=proxies)
-        if not df.empty:
-            return df
+        todo = [sym for sym in start_of if sym not in out or out[sym][1].empty]
+        results = map_ordered(
+            lambda sym: _fetch_yahoo(sym, start_of[sym], end, interval, proxies=proxies),
+            todo, 1, _limiter("yahoo", yahoo_rate),
+        )
+        for sym, df, err in results:
+            if err is None and df is not None and (not df.empty or sym not in out):
+                out[sym] = (start_of[sym], df)
+    return out
+
+
+def _tag(df: pd.DataFrame, symbol: str, interval: str) -> pd.DataFrame:
+    # identifies the frame to the shared indicator cache
+    df.attrs.update(symbol=symbol, timeframe=interval)
+    return df
+
+
+def download_ohlc_many(symbols: List[str], start: str, end: str, interval: str,
+                       cfg: Optional[Config] = None, cache: bool = True) -> Dict[str, pd.DataFrame]:
+    """
+    Batched `download_ohlc`: symbols are grouped by where their fetch has
+    to start (store tail or `start`) and sent as multi-symbol requests of
+    `data.batch_size`, `data.fetch_workers` at a time. Returns
+    {symbol: frame} in input order; symbols with no data map to an empty
+    frame. `cache=False` reads the bar store without keeping the frames in
+    its LRU, for callers that walk a long span once.
+    """
+    provider, proxies = _provider_opts(cfg)
+    store = _store_for(cfg)
+    symbols = list(dict.fromkeys(symbols))
+
+    if store is None:
+        got = _download_many([(symbols, start)], end, interval, provider, proxies, cfg)
+        return {s: _tag(got[s][1] if s in got else pd.DataFrame(), s, interval) for s in symbols}
 
-    return pd.DataFrame()
+    # Group by the session day the fetch resumes on; each group starts at its earliest point
+    groups: Dict[str, List[str]] = {}
+    resume: Dict[str, pd.Timestamp] = {}
+    for sym in symbols:
+        fetch_from = store.missing_from(sym, interval, start, end)
+        if fetch_from is None:
+            continue
+        day = fetch_from.strftime("%Y-%m-%d")
+        groups.setdefault(day, []).append(sym)
+        resume[day] = min(resume.get(day, fetch_from), fetch_from)
+
+    if groups:
+        now = pd.Timestamp.now(tz="America/New_York")
+        covered_end = min(to_market_ts(end), now)
+        jobs = [(syms, resume[day]) for day, syms in groups.items()]
+        got = _download_many(jobs, end, interval, provider, proxies, cfg)
+        for sym in symbols:
+            if sym in got:
+                fetch_from, df = got[sym]
+                store.write(sym, interval, df, covered_start=fetch_from, covered_end=covered_end)
+
+    return {s: _tag(store.read(s, interval, start, end, cache=cache), s, interval) for s in symbols}
+
+
+def download_ohlc(symbol: str, start: str, end: str, interval: str, cfg: Optional[Config] = None) -> pd.DataFrame:
+    """
+    OHLCV for [start, end]. With `data.store_dir` set, bars are served from
+    the local bar store and only the tail after the last stored bar is
+    requested from the provider.
+    """
+    return download_ohlc_many([symbol], start, end, interval, cfg)[symbol]
 
 
 def rolling_dollar_vol(df: pd.DataFrame, win: int = 20) -> pd.Series:
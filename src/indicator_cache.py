@@ -0,0 +1,144 @@
+"""
+Process-wide memo of indicator series, shared by strategy, regime, risk and
+the backtest so each series is computed once per bar per symbol.
+
+Entries are keyed by (symbol, timeframe, indicator, params, first bar,
+bar count, last bar timestamp and last bar's OHLC) -- the last bar's values
+are part of the key because a still-forming bar is revised between fetches.
+Frames identify themselves through `df.attrs["symbol"]` /
+`df.attrs["timeframe"]` (set by `data.download_ohlc_many` and
+`resample.HTFResampler`); untagged frames are computed directly, uncached.
+Eviction is least-recently-used under a byte budget.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import indicators
+
+_LAST_COLS = ("open", "high", "low", "close")
+
+
+def _nbytes(value: Any) -> int:
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return int(np.sum(value.memory_usage(index=True, deep=False)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return 64
+
+
+def frame_key(df: pd.DataFrame) -> Optional[Tuple[Hashable, ...]]:
+    """Identity of a bar frame for caching, or None if it is not tagged with a symbol."""
+    sym = df.attrs.get("symbol")
+    if sym is None or df.empty:
+        return None
+    last = df.iloc[-1]
+    return (
+        sym, df.attrs.get("timeframe"), df.index[0].value, len(df), df.index[-1].value,
+        tuple(float(last[c]) for c in _LAST_COLS if c in df.columns),
+    )
+
+
+class IndicatorCache:
+    def __init__(self, max_mb: float = 64.0):
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Tuple, Tuple[Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, df: pd.DataFrame, name: str, params: Tuple, compute: Callable[[], Any]) -> Any:
+        fk = frame_key(df) if self.max_bytes > 0 else None
+        if fk is None:
+            return compute()
+        key = (name, params) + fk
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return hit[0]
+            self.misses += 1
+        value = compute()
+        size = _nbytes(value)
+        with self._lock:
+            if size > self.max_bytes:
+                return value
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, sz) = self._entries.popitem(last=False)
+                self._bytes -= sz
+                self.evictions += 1
+        return value
+
+    def resize(self, max_mb: float) -> None:
+        with self._lock:
+            self.max_bytes = int(max_mb * 1024 * 1024)
+            while self._entries and self._bytes > self.max_bytes:
+                _, (_, sz) = self._entries.popitem(last=False)
+                self._bytes -= sz
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+                "entries": len(self._entries), "bytes": self._bytes,
+            }
+
+
+_CACHE = IndicatorCache()
+
+
+def get_cache() -> IndicatorCache:
+    return _CACHE
+
+
+def configure(cfg) -> IndicatorCache:
+    """Apply `perf.indicator_cache_mb` to the shared cache."""
+    _CACHE.resize(cfg.perf.indicator_cache_mb)
+    return _CACHE
+
+
+# ---------- cached indicator accessors (same return types as `indicators`) ----------
+
+def dmi(df: pd.DataFrame, length: int = 14) -> Dict[str, pd.Series]:
+    return _CACHE.get(df, "dmi", (length,), lambda: indicators.dmi(df, length))
+
+
+def atr(df: pd.DataFrame, length: int = 14) -> pd.Series:
+    # TR/ATR fall out of the fused DMI pass, so ATR and ADX of the same length share one entry
+    return dmi(df, length)["atr"]
+
+
+def adx(df: pd.DataFrame, length: int = 14):
+    d = dmi(df, length)
+    return d["adx"], d["plus_di"], d["minus_di"]
+
+
+def ema(df: pd.DataFrame, length: int, col: str = "close") -> pd.Series:
+    return _CACHE.get(df, "ema", (col, length), lambda: indicators.ema(df[col], length))
+
+
+def rsi(df: pd.DataFrame, length: int = 14, col: str = "close") -> pd.Series:
+    return _CACHE.get(df, "rsi", (col, length), lambda: indicators.rsi(df[col], length))
@@ -1,4 +1,6 @@
 import pandas as pd, numpy as np
+from typing import Dict
+from . import kernels
 
 def ema(series: pd.Series, length: int) -> pd.Series:
     return series.ewm(span=length, adjust=False).mean()
@@ -11,27 +13,30 @@ def rsi(series: pd.Series, length: int = 14) -> pd.Series:
     out = 100 - (100 / (1 + rs))
     return out.fillna(0)
 
+def _hlc(df: pd.DataFrame):
+    return (df["high"].to_numpy(dtype=np.float64), df["low"].to_numpy(dtype=np.float64),
+            df["close"].to_numpy(dtype=np.float64))
+
 def true_range(df: pd.DataFrame) -> pd.Series:
-    prev_close = df["close"].shift(1)
-    tr = pd.concat([df["high"]-df["low"], (df["high"]-prev_close).abs(), (df["low"]-prev_close).abs()], axis=1).max(axis=1)
-    return tr
+    return pd.Series(kernels.true_range(*_hlc(df)), index=df.index)
 
 def atr(df: pd.DataFrame, length: int = 14) -> pd.Series:
-    return true_range(df).rolling(length).mean()
+    return pd.Series(kernels.atr(*_hlc(df), length), index=df.index)
+
+def dmi(df: pd.DataFrame, length: int = 14) -> Dict[str, pd.Series]:
+    """TR, ATR, +DI, -DI and ADX from one fused pass (DI/ADX NaN-filled with 0 as in `adx`)."""
+    tr, atr_n, pdi, mdi, adx_val = kernels.dmi(*_hlc(df), length)
+    s = lambda a: pd.Series(a, index=df.index)
+    return {
+        "tr": s(tr), "atr": s(atr_n),
+        "plus_di": s(np.nan_to_num(pdi, nan=0.0)), "minus_di": s(np.nan_to_num(mdi, nan=0.0)),
+        "adx": s(np.nan_to_num(adx_val, nan=0.0)),
+    }
 
 def adx(df: pd.DataFrame, length: int = 14):
-    # Simple ADX approximation for brevity
-    up_move = df["high"].diff()
-    down_move = -df["low"].diff()
-    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
-    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
-    tr = true_range(df)
-    atr_n = tr.rolling(length).mean()
-    plus_di = 100 * pd.Series(plus_dm, index=df.index).rolling(length).sum() / atr_n
-    minus_di = 100 * pd.Series(minus_dm, index=df.index).rolling(length).sum() / atr_n
-    dx = ( (plus_di - minus_di).abs() / (plus_di + minus_di).replace(0,np.nan) ) * 100
-    adx_val = dx.rolling(length).mean()
-    return adx_val.fillna(0), plus_di.fillna(0), minus_di.fillna(0)
+    # Simple ADX approximation for brevity (fused in kernels.dmi)
+    d = dmi(df, length)
+    return d["adx"], d["plus_di"], d["minus_di"]
 
 def ema_slope_bps(series: pd.Series, bars: int = 3) -> pd.Series:
     # slope as (ema_t - ema_t-bars)/ema_t * 10,000
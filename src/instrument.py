@@ -0,0 +1,217 @@
+"""
+Cheap always-on instrumentation for the live trade cycle.
+
+`CycleMetrics` times the stages of one `OMS.trade_cycle` and the
+per-symbol work inside them (`time.perf_counter`, about a microsecond per
+timer). Durations also go into process-wide `Histogram`s: fixed
+log-spaced buckets, so recording is O(1), memory is bounded and
+p50/p95/p99 come back within one bucket width (10%). Network calls and
+response bytes are counted process-wide by `NET`, which provider code
+updates through `count_call` or `watch_session` (a `requests` response
+hook). `MetricsFile` appends one JSON line per cycle to a size-rotated
+file.
+"""
+import json
+import logging
+import math
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import resource
+    HAVE_RESOURCE = True
+except Exception:   # not on Windows
+    HAVE_RESOURCE = False
+
+PERCENTILES = (50, 95, 99)
+_DARWIN = sys.platform == "darwin"
+
+
+class Histogram:
+    """Counts of values (seconds) in log-spaced buckets from `lo` up, growing by `growth`."""
+
+    def __init__(self, lo: float = 1e-6, growth: float = 1.1, n_buckets: int = 256):
+        self.lo = lo
+        self.log_growth = math.log(growth)
+        self.growth = growth
+        self.counts = [0] * n_buckets
+        self.n = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        b = 0 if value <= self.lo else min(len(self.counts) - 1, int(math.log(value / self.lo) / self.log_growth) + 1)
+        self.counts[b] += 1
+        self.n += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, p: float) -> float:
+        """Upper edge of the bucket holding the p-th percentile (capped at the max seen)."""
+        if not self.n:
+            return float("nan")
+        rank = math.ceil(p / 100.0 * self.n)
+        seen = 0
+        for b, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank:
+                return min(self.lo * self.growth ** b, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        out = {"n": self.n, "mean_ms": 1e3 * self.total / self.n if self.n else float("nan")}
+        out.update({f"p{p}_ms": 1e3 * self.percentile(p) for p in PERCENTILES})
+        out["max_ms"] = 1e3 * self.max
+        return out
+
+
+class NetCounters:
+    """Thread-safe call and byte counts per provider (fetches run on a thread pool)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {}
+
+    def record(self, provider: str, nbytes: int = 0) -> None:
+        with self._lock:
+            self.calls[provider] = self.calls.get(provider, 0) + 1
+            self.bytes[provider] = self.bytes.get(provider, 0) + int(nbytes)
+
+    def snapshot(self) -> Tuple[Dict[str, int], Dict[str, int]]:
+        with self._lock:
+            return dict(self.calls), dict(self.bytes)
+
+    def since(self, snap: Tuple[Dict[str, int], Dict[str, int]]) -> Dict[str, Dict[str, int]]:
+        """Calls and bytes per provider since `snap`."""
+        calls, nbytes = self.snapshot()
+        return {p: {"calls": calls[p] - snap[0].get(p, 0), "bytes": nbytes.get(p, 0) - snap[1].get(p, 0)}
+                for p in calls if calls[p] != snap[0].get(p, 0)}
+
+
+NET = NetCounters()
+
+
+def count_call(provider: str, nbytes: int = 0) -> None:
+    NET.record(provider, nbytes)
+
+
+def watch_session(session: Any, provider: str) -> None:
+    """Count every response of a `requests.Session` (bytes from Content-Length, else the body)."""
+    def _hook(resp, *args, **kwargs):
+        size = resp.headers.get("Content-Length")
+        NET.record(provider, int(size) if size is not None else len(resp.content or b""))
+        return resp
+
+    hooks = getattr(session, "hooks", None)
+    if hooks is None or getattr(session, "_net_provider", None):
+        return
+    session._net_provider = provider
+    hooks.setdefault("response", []).append(_hook)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far."""
+    if not HAVE_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if _DARWIN else peak / 2**10   # bytes on macOS, KiB elsewhere
+
+
+def frames_mb(frames: Dict[str, pd.DataFrame]) -> float:
+    return sum(int(df.memory_usage(index=True, deep=False).sum()) for df in frames.values()) / 2**20
+
+
+_HISTS: Dict[str, Histogram] = {}
+_HISTS_LOCK = threading.Lock()
+
+
+def histogram(name: str) -> Histogram:
+    """Process-wide histogram per name."""
+    with _HISTS_LOCK:
+        h = _HISTS.get(name)
+        if h is None:
+            h = _HISTS[name] = Histogram()
+        return h
+
+
+def histograms() -> Dict[str, Dict[str, float]]:
+    with _HISTS_LOCK:
+        return {k: h.summary() for k, h in sorted(_HISTS.items())}
+
+
+class CycleMetrics:
+    """Stage and per-symbol timers of one trade cycle, plus what it fetched and held."""
+
+    def __init__(self, top_symbols: int = 5):
+        self.t0 = time.perf_counter()
+        self.net0 = NET.snapshot()
+        self.stages: Dict[str, float] = {}
+        self.symbols: Dict[str, float] = {}
+        self.top_symbols = top_symbols
+        self.extra: Dict[str, Any] = {}
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            dt = time.perf_counter() - t
+            self.stages[name] = self.stages.get(name, 0.0) + dt
+            histogram(f"stage.{name}").record(dt)
+
+    @contextmanager
+    def symbol(self, sym: str) -> Iterator[None]:
+        """Per-symbol work inside a stage; a symbol's times add up across stages."""
+        t = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.symbols[sym] = self.symbols.get(sym, 0.0) + time.perf_counter() - t
+
+    def latency(self, name: str, seconds: float) -> None:
+        histogram(name).record(max(0.0, seconds))
+        self.extra.setdefault(name + "_ms", []).append(round(1e3 * seconds, 1))
+
+    def finish(self, **extra: Any) -> Dict[str, Any]:
+        """The cycle's record: stage ms, slowest symbols, network, memory and `extra`."""
+        total = time.perf_counter() - self.t0
+        histogram("cycle").record(total)
+        sym_hist = histogram("symbol")
+        for dt in self.symbols.values():
+            sym_hist.record(dt)
+        slow: List[Tuple[str, float]] = sorted(self.symbols.items(), key=lambda kv: -kv[1])[: self.top_symbols]
+        return {
+            "cycle_ms": round(1e3 * total, 2),
+            "stages_ms": {k: round(1e3 * v, 2) for k, v in self.stages.items()},
+            "slowest_symbols_ms": {s: round(1e3 * v, 2) for s, v in slow},
+            "net": NET.since(self.net0),
+            "peak_rss_mb": peak_rss_mb(),
+            **self.extra, **extra,
+        }
+
+
+class MetricsFile:
+    """JSON-lines metrics file rotated at `max_mb`, keeping `backups` old files."""
+
+    def __init__(self, path: str, max_mb: float = 10.0, backups: int = 3):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._log = logging.getLogger(f"metrics.{path}")
+        self._log.propagate = False
+        self._log.setLevel(logging.INFO)
+        if not self._log.handlers:
+            h = RotatingFileHandler(path, maxBytes=int(max_mb * 2**20), backupCount=backups)
+            h.setFormatter(logging.Formatter("%(message)s"))
+            self._log.addHandler(h)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._log.info(json.dumps(record, default=str))
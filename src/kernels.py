@@ -0,0 +1,297 @@
+"""
+Fused array kernels for the bar indicators (true range, ATR, +DI/-DI,
+ADX, plus the EMA/RSI recurrences the panel engine needs).
+
+Inputs are float64 arrays with time on the last axis: 1D for one symbol,
+2D (symbols x bars) for a panel. With numba installed each row is done in
+a single compiled pass that reproduces pandas' rolling bookkeeping
+(compensated add/remove, same-value runs, sign clamping), so results match
+the pandas implementations bit for bit. Without numba the windows go
+through pandas' own rolling aggregations (one column per row), so the
+fallback matches bit for bit too.
+"""
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except Exception:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):  # keeps the decorated kernels importable (and callable) without numba
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+
+
+def _as_2d(x) -> np.ndarray:
+    a = np.ascontiguousarray(x, dtype=np.float64)
+    return a.reshape(1, -1) if a.ndim == 1 else a
+
+
+def _use_jit(jit: Optional[bool]) -> bool:
+    return HAVE_NUMBA if jit is None else (jit and HAVE_NUMBA)
+
+
+# ---------- compiled path ----------
+
+# rolling state slots: nobs, neg_ct, sum_x, comp_add, comp_remove, same_ct, prev
+@njit(cache=True)
+def _roll_step(st, v_in, v_out, remove, length, is_sum):
+    if remove and v_out == v_out and not np.isinf(v_out):
+        st[0] -= 1
+        if np.signbit(v_out):
+            st[1] -= 1
+        y = -v_out - st[4]
+        t = st[2] + y
+        st[4] = t - st[2] - y
+        st[2] = t
+    if v_in == v_in and not np.isinf(v_in):
+        st[0] += 1
+        y = v_in - st[3]
+        t = st[2] + y
+        st[3] = t - st[2] - y
+        st[2] = t
+        if np.signbit(v_in):
+            st[1] += 1
+        if v_in == st[6]:
+            st[5] += 1
+        else:
+            st[5] = 1
+        st[6] = v_in
+    nobs = st[0]
+    if nobs < length:
+        return np.nan
+    if is_sum:
+        return st[6] * nobs if st[5] >= nobs else st[2]
+    res = st[2] / nobs
+    if st[5] >= nobs:
+        res = st[6]
+    elif st[1] == 0 and res < 0:
+        res = 0.0
+    elif st[1] == nobs and res > 0:
+        res = 0.0
+    return res
+
+
+@njit(cache=True)
+def _new_state(first):
+    st = np.zeros(7)
+    st[6] = first
+    return st
+
+
+@njit(cache=True, error_model="numpy")
+def _dmi_jit(h, lo, c, length, tr, atr, pdi, mdi, adx):
+    n_rows, n = h.shape
+    for r in range(n_rows):
+        trbuf = np.empty(n)
+        pbuf = np.empty(n)
+        mbuf = np.empty(n)
+        dxbuf = np.empty(n)
+        s_tr = s_p = s_m = s_dx = np.zeros(7)
+        for i in range(n):
+            hi, li = h[r, i], lo[r, i]
+            if i == 0:
+                t = hi - li
+                up = np.nan
+                dn = np.nan
+            else:
+                pc = c[r, i - 1]
+                t = max(hi - li, abs(hi - pc), abs(li - pc))
+                up = hi - h[r, i - 1]
+                dn = -(li - lo[r, i - 1])
+            pdm = up if (up > dn and up > 0) else 0.0
+            mdm = dn if (dn > up and dn > 0) else 0.0
+            trbuf[i], pbuf[i], mbuf[i] = t, pdm, mdm
+            if i == 0:
+                s_tr, s_p, s_m = _new_state(t), _new_state(pdm), _new_state(mdm)
+            rem = i >= length
+            j = i - length if rem else 0
+            a_n = _roll_step(s_tr, t, trbuf[j], rem, length, False)
+            ps = _roll_step(s_p, pdm, pbuf[j], rem, length, True)
+            ms = _roll_step(s_m, mdm, mbuf[j], rem, length, True)
+            p_di = 100 * ps / a_n
+            m_di = 100 * ms / a_n
+            den = p_di + m_di
+            dx = np.nan if (den == 0 or den != den) else abs(p_di - m_di) / den * 100
+            dxbuf[i] = dx
+            if i == 0:
+                s_dx = _new_state(dx)
+            tr[r, i], atr[r, i], pdi[r, i], mdi[r, i] = t, a_n, p_di, m_di
+            adx[r, i] = _roll_step(s_dx, dx, dxbuf[j], rem, length, False)
+
+
+@njit(cache=True)
+def _rolling_jit(x, length, is_sum, out):
+    n_rows, n = x.shape
+    for r in range(n_rows):
+        st = _new_state(x[r, 0])
+        for i in range(n):
+            rem = i >= length
+            out[r, i] = _roll_step(st, x[r, i], x[r, i - length] if rem else 0.0, rem, length, is_sum)
+
+
+@njit(cache=True)
+def _ema_jit(x, length, out):
+    alpha = 1.0 / (1.0 + (length - 1) / 2.0)
+    old, new = 1.0 - alpha, alpha
+    n_rows, n = x.shape
+    for r in range(n_rows):
+        w = x[r, 0]
+        out[r, 0] = w
+        for i in range(1, n):
+            cur = x[r, i]
+            if cur == cur:
+                if w != w:
+                    w = cur
+                elif w != cur:
+                    w = (old * w + new * cur) / (old + new)
+            out[r, i] = w
+
+
+@njit(cache=True, error_model="numpy")
+def _rsi_jit(x, length, out):
+    n_rows, n = x.shape
+    for r in range(n_rows):
+        ubuf = np.empty(n)
+        dbuf = np.empty(n)
+        s_u = s_d = np.zeros(7)
+        for i in range(n):
+            d = x[r, i] - x[r, i - 1] if i > 0 else np.nan
+            u = d if d > 0 else 0.0
+            dn = -(d if d < 0 else 0.0)
+            ubuf[i], dbuf[i] = u, dn
+            if i == 0:
+                s_u, s_d = _new_state(u), _new_state(dn)
+            rem = i >= length
+            j = i - length if rem else 0
+            mu = _roll_step(s_u, u, ubuf[j], rem, length, False)
+            md = _roll_step(s_d, dn, dbuf[j], rem, length, False)
+            if mu != mu or md != md or md == 0:
+                out[r, i] = 0.0
+            else:
+                out[r, i] = 100 - (100 / (1 + mu / md))
+
+
+# ---------- NumPy / pandas fallback (vectorized over the whole array) ----------
+
+def shift(x: np.ndarray, n: int = 1) -> np.ndarray:
+    out = np.full_like(x, np.nan)
+    out[..., n:] = x[..., :-n]
+    return out
+
+
+def rolling(x: np.ndarray, length: int, how: str = "mean") -> np.ndarray:
+    """
+    `pd.Series.rolling(length).mean()` / `.sum()` along the last axis,
+    computed by pandas itself (bars as rows, one column per symbol) so the
+    running-sum rounding is exactly that of the pandas indicators.
+    """
+    a = _as_2d(x)
+    r = pd.DataFrame(a.T).rolling(length)
+    out = (r.mean() if how == "mean" else r.sum()).to_numpy().T
+    return np.ascontiguousarray(out).reshape(np.shape(x))
+
+
+def _dmi_np(h, lo, c, length):
+    tr = true_range(h, lo, c)
+    up_move = h - shift(h)
+    down_move = -(lo - shift(lo))
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    atr = rolling(tr, length)
+    pdi = 100 * rolling(plus_dm, length, "sum") / atr
+    mdi = 100 * rolling(minus_dm, length, "sum") / atr
+    den = pdi + mdi
+    dx = (np.abs(pdi - mdi) / np.where(den == 0, np.nan, den)) * 100
+    return tr, atr, pdi, mdi, rolling(dx, length)
+
+
+def _ema_np(x, length):
+    alpha = 1.0 / (1.0 + (length - 1) / 2.0)
+    old, new = 1.0 - alpha, alpha
+    y = np.empty_like(x)
+    y[:, 0] = x[:, 0]
+    for t in range(1, x.shape[1]):
+        w, xt = y[:, t - 1], x[:, t]
+        upd = (old * w + new * xt) / (old + new)
+        y[:, t] = np.where(np.isnan(xt) | (w == xt), w, np.where(np.isnan(w), xt, upd))
+    return y
+
+
+def _rsi_np(x, length):
+    d = x - shift(x)
+    up = rolling(np.where(d > 0, d, 0.0), length)
+    down = rolling(-np.where(d < 0, d, 0.0), length)
+    out = 100 - (100 / (1 + up / np.where(down == 0, np.nan, down)))
+    return np.nan_to_num(out, nan=0.0)
+
+
+# ---------- public entry points ----------
+
+def true_range(high, low, close) -> np.ndarray:
+    """max(high-low, |high-prev_close|, |low-prev_close|); the first bar is high-low."""
+    h, lo, c = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+    pc = shift(c)
+    return np.fmax(h - lo, np.fmax(np.abs(h - pc), np.abs(lo - pc)))
+
+
+def rolling_mean(x, length: int, jit: Optional[bool] = None) -> np.ndarray:
+    shape = np.shape(x)
+    a = _as_2d(x)
+    if _use_jit(jit) and a.shape[1]:
+        out = np.empty_like(a)
+        _rolling_jit(a, int(length), False, out)
+        return out.reshape(shape)
+    return rolling(a, length).reshape(shape)
+
+
+def atr(high, low, close, length: int = 14, jit: Optional[bool] = None) -> np.ndarray:
+    return rolling_mean(true_range(high, low, close), length, jit)
+
+
+def dmi(high, low, close, length: int = 14, jit: Optional[bool] = None) -> Tuple[np.ndarray, ...]:
+    """
+    (true_range, atr, +DI, -DI, ADX) in one pass, same shape as the inputs.
+    DI/ADX are returned unfilled (NaN during warm-up), as the pandas
+    intermediates are before `indicators.adx` fills them with 0.
+    """
+    shape = np.shape(close)
+    h, lo, c = _as_2d(high), _as_2d(low), _as_2d(close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if _use_jit(jit):
+            outs = tuple(np.empty_like(c) for _ in range(5))
+            if c.shape[1]:
+                _dmi_jit(h, lo, c, int(length), *outs)
+        else:
+            outs = _dmi_np(h, lo, c, length)
+    return tuple(o.reshape(shape) for o in outs)
+
+
+def ema(x, length: int, jit: Optional[bool] = None) -> np.ndarray:
+    shape = np.shape(x)
+    a = _as_2d(x)
+    if a.shape[1] == 0:
+        return a.reshape(shape).copy()
+    if _use_jit(jit):
+        out = np.empty_like(a)
+        _ema_jit(a, int(length), out)
+    else:
+        out = _ema_np(a, length)
+    return out.reshape(shape)
+
+
+def rsi(x, length: int = 14, jit: Optional[bool] = None) -> np.ndarray:
+    shape = np.shape(x)
+    a = _as_2d(x)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if _use_jit(jit) and a.shape[1]:
+            out = np.empty_like(a)
+            _rsi_jit(a, int(length), out)
+        else:
+            out = _rsi_np(a, length)
+    return out.reshape(shape)
@@ -6,10 +6,17 @@ import pandas as pd
 from .config import Config
 from .logging_utils import get_logger
 from .broker.alpaca import AlpacaBroker
-from .strategy import compute_signals, Signal
-from .data import download_ohlc, illiquidity_pass
+from .strategy import compute_signals, Signal, SignalStream
+from .panel import build_panel, compute_panel_signals
+from .data import download_ohlc, download_ohlc_many, illiquidity_pass
 from .regime import compute_htf_regime
+from . import indicator_cache
+from .resample import HTFResampler, can_resample
 from .risk import position_size
+from .warmup import plan_fetch_starts
+from .backtest.metrics import EquityStats, bars_per_year
+from .calendar import _parse_timeframe
+from .instrument import CycleMetrics, MetricsFile, frames_mb, histograms
 from .portfolio import enforce_portfolio_limits
 from .utils import gen_coid, read_tickers_file
 
@@ -31,6 +38,16 @@ class OMS:
         self.broker = AlpacaBroker()
         self._daily_loss_lock = False
         self._symbol_cooloff: Dict[str, float] = {}
+        # HTF bars are derived from the base bars already in hand when the timeframes allow it
+        g = cfg.general
+        self._streams: Dict[str, SignalStream] = {}
+        self._htf = HTFResampler(g.bar_timeframe, g.htf_timeframe, g.rth_only) if can_resample(g.bar_timeframe, g.htf_timeframe) else None
+        self._ind_cache = indicator_cache.configure(cfg)
+        # account equity once per cycle (one per bar): running Sharpe/drawdown without keeping the history
+        self._equity_stats = EquityStats(bars_per_year(g.bar_timeframe, g.rth_only))
+        self._bar_step = _parse_timeframe(g.bar_timeframe)
+        p = cfg.perf
+        self._metrics_file = MetricsFile(p.metrics_file, p.metrics_file_mb, p.metrics_file_backups) if p.metrics_file else None
 
     def locked_out_today(self) -> bool:
         return self._daily_loss_lock or self.broker.lockout_today()
@@ -41,6 +58,42 @@ class OMS:
     def _fetch(self, sym: str, start: str, end: str, interval: str) -> pd.DataFrame:
         return download_ohlc(sym, start, end, interval, self.cfg)
 
+    def _fetch_many(self, syms: List[str], start: str, end, interval: str) -> Dict[str, pd.DataFrame]:
+        return download_ohlc_many(syms, start, end, interval, self.cfg)
+
+    def _latest_longs(self, syms: List[str], frames: Dict[str, pd.DataFrame], m: CycleMetrics) -> Dict[str, bool]:
+        engine = self.cfg.strategy.signal_engine
+        if engine == "panel":
+            return compute_panel_signals(build_panel({s: frames[s] for s in syms}), self.cfg).latest_long()
+        out = {}
+        for s in syms:
+            with m.symbol(s):
+                if engine == "stream":
+                    out[s] = self._stream_signal(s, frames[s]) == Signal.LONG
+                else:
+                    out[s] = compute_signals(frames[s], self.cfg).iloc[-1] == Signal.LONG
+        return out
+
+    def _since_bar_close(self, df: pd.DataFrame) -> float:
+        """Seconds since the close of the newest closed bar in `df` (bars are stamped at their open)."""
+        now = pd.Timestamp.now(tz="UTC")
+        close = df.index[-1] + self._bar_step
+        if close > now:   # last bar still forming; its open is the previous bar's close
+            close = df.index[-1]
+        return (now - close).total_seconds()
+
+    def _stream_signal(self, sym: str, df: pd.DataFrame) -> int:
+        # Commit all but the last bar; it may still be revised by the next fetch
+        committed = df.iloc[:-1]
+        stream = self._streams.get(sym)
+        if stream is None or stream.last_ts not in committed.index:
+            stream = self._streams[sym] = SignalStream(self.cfg)
+            stream.update_frame(committed)
+        else:
+            stream.update_frame(committed[committed.index > stream.last_ts])
+        last = df.iloc[-1]
+        return stream.peek(df.index[-1], last["high"], last["low"], last["close"])
+
     def trade_cycle(self, verbose_symbol_logs: bool = False, tickers_override: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Execute 1 cycle and return details for logging:
@@ -51,9 +104,16 @@ class OMS:
           "orders": [ {symbol, qty, entry, tp, sl, coid}, ... ],
           "positions": [ "SYM", ... ]
         }
+        Stage and per-symbol timings, network use and memory go into the
+        `cycle_summary` log line and, with `perf.metrics_file`, the metrics file.
         """
+        m = CycleMetrics()
         today = pd.Timestamp.utcnow().strftime("%Y-%m-%d")
-        start = (pd.Timestamp.utcnow() - pd.Timedelta(days=90)).strftime("%Y-%m-%d")
+        # fetch up to now: `today` alone would end at midnight and drop today's session so far
+        now = pd.Timestamp.now(tz="America/New_York")
+        # Lookback sized from indicator warm-up rather than a fixed window
+        starts = {k: ts.strftime("%Y-%m-%d") for k, ts in plan_fetch_starts(self.cfg, today).items()}
+        start = starts["base"]
         interval = self._bar_interval_str()
 
         tickers = tickers_override if tickers_override is not None else read_tickers_file("tickers.txt")
@@ -66,45 +126,51 @@ class OMS:
         candidates: List[str] = []
 
         # 1) Fetch & liquidity screen
-        for sym in tickers:
-            if sym in self.cfg.universe.exclude:
-                skipped_syms.append(sym)
-                if verbose_symbol_logs:
-                    scanned_log.append({"symbol": sym, "stage": "excluded", "note": "in exclude list"})
-                continue
+        with m.stage("fetch"):
+            frames = self._fetch_many([t for t in tickers if t not in self.cfg.universe.exclude], start, now, interval)
+        with m.stage("liquidity"):
+            for sym in tickers:
+                if sym in self.cfg.universe.exclude:
+                    skipped_syms.append(sym)
+                    if verbose_symbol_logs:
+                        scanned_log.append({"symbol": sym, "stage": "excluded", "note": "in exclude list"})
+                    continue
 
-            df = self._fetch(sym, start, today, interval)
-            if df.empty:
-                skipped_syms.append(sym)
-                if verbose_symbol_logs:
-                    scanned_log.append({"symbol": sym, "stage": "fetch", "note": "empty_data"})
-                continue
+                df = frames.get(sym, pd.DataFrame())
+                if df.empty:
+                    skipped_syms.append(sym)
+                    if verbose_symbol_logs:
+                        scanned_log.append({"symbol": sym, "stage": "fetch", "note": "empty_data"})
+                    continue
 
-            df_cache[sym] = df
+                df_cache[sym] = df
 
-            if not illiquidity_pass(df, self.cfg.universe.min_price, self.cfg.universe.min_dollar_vol_20d):
-                skipped_syms.append(sym)
-                if verbose_symbol_logs:
-                    last_close = float(df["close"].iloc[-1])
-                    scanned_log.append(
-                        {
-                            "symbol": sym,
-                            "stage": "liquidity_fail",
-                            "note": "min_price/min_dollar_vol failed",
-                            "last_close": last_close,
-                        }
-                    )
-                continue
+                with m.symbol(sym):
+                    liquid = illiquidity_pass(df, self.cfg.universe.min_price, self.cfg.universe.min_dollar_vol_20d)
+                if not liquid:
+                    skipped_syms.append(sym)
+                    if verbose_symbol_logs:
+                        last_close = float(df["close"].iloc[-1])
+                        scanned_log.append(
+                            {
+                                "symbol": sym,
+                                "stage": "liquidity_fail",
+                                "note": "min_price/min_dollar_vol failed",
+                                "last_close": last_close,
+                            }
+                        )
+                    continue
 
-            if verbose_symbol_logs:
-                scanned_log.append({"symbol": sym, "stage": "liquidity_pass"})
-            candidates.append(sym)
+                if verbose_symbol_logs:
+                    scanned_log.append({"symbol": sym, "stage": "liquidity_pass"})
+                candidates.append(sym)
 
         # 2) Signal computation
         long_syms: List[str] = []
+        with m.stage("signals"):
+            long_flags = self._latest_longs(candidates, df_cache, m)
         for sym in candidates:
-            sigs = compute_signals(df_cache[sym], self.cfg)
-            if sigs.iloc[-1] == Signal.LONG:
+            if long_flags[sym]:
                 long_syms.append(sym)
                 if verbose_symbol_logs:
                     scanned_log.append({"symbol": sym, "stage": "signal_long"})
@@ -114,84 +180,97 @@ class OMS:
 
         # 3) HTF alignment (optional)
         if self.cfg.strategy.htf_align_required:
-            aligned = []
-            for sym in long_syms:
-                htf = self._fetch(sym, start, today, self.cfg.general.htf_timeframe)
-                if htf.empty:
-                    if verbose_symbol_logs:
-                        scanned_log.append({"symbol": sym, "stage": "htf_missing"})
-                    continue
-                trend, chop = compute_htf_regime(htf, self.cfg.regime.trend_adx_min, self.cfg.regime.chop_adx_max)
-                if trend.iloc[-1] and not chop.iloc[-1]:
-                    aligned.append(sym)
-                    if verbose_symbol_logs:
-                        scanned_log.append({"symbol": sym, "stage": "htf_aligned"})
+            with m.stage("htf"):
+                aligned = []
+                if self._htf is not None:
+                    htf_frames = {sym: self._htf.get(sym, df_cache[sym]) for sym in long_syms}
                 else:
-                    if verbose_symbol_logs:
-                        scanned_log.append({"symbol": sym, "stage": "htf_blocked"})
+                    htf_frames = self._fetch_many(long_syms, starts["htf"], now, self.cfg.general.htf_timeframe) if long_syms else {}
+                for sym in long_syms:
+                    htf = htf_frames.get(sym, pd.DataFrame())
+                    if htf.empty:
+                        if verbose_symbol_logs:
+                            scanned_log.append({"symbol": sym, "stage": "htf_missing"})
+                        continue
+                    with m.symbol(sym):
+                        trend, chop = compute_htf_regime(htf, self.cfg.regime.trend_adx_min, self.cfg.regime.chop_adx_max)
+                    if trend.iloc[-1] and not chop.iloc[-1]:
+                        aligned.append(sym)
+                        if verbose_symbol_logs:
+                            scanned_log.append({"symbol": sym, "stage": "htf_aligned"})
+                    else:
+                        if verbose_symbol_logs:
+                            scanned_log.append({"symbol": sym, "stage": "htf_blocked"})
             long_syms = aligned
 
         # 4) Portfolio/risk constraints
-        equity = self.broker.account_equity()
-        open_pos = self.broker.positions()
-        filtered_syms = enforce_portfolio_limits(self.cfg, open_pos, long_syms, equity)
+        with m.stage("broker_account"):
+            equity = self.broker.account_equity()
+            open_pos = self.broker.positions()
+        self._equity_stats.update(equity)
+        with m.stage("limits"):
+            filtered_syms = enforce_portfolio_limits(self.cfg, open_pos, long_syms, equity)
 
-        # 5) Cooloff
-        now = time.time()
-        filtered_syms = [s for s in filtered_syms if self._symbol_cooloff.get(s, 0) < now]
+            # 5) Cooloff
+            now = time.time()
+            filtered_syms = [s for s in filtered_syms if self._symbol_cooloff.get(s, 0) < now]
 
         # 6) Place orders
         orders: List[Dict[str, Any]] = []
-        for sym in filtered_syms:
-            df = df_cache[sym]
-            last_price = float(df["close"].iloc[-1])
-            plan = position_size(self.cfg, df, last_price, equity)
-            if plan.qty <= 0:
-                if verbose_symbol_logs:
-                    scanned_log.append({"symbol": sym, "stage": "sizing_zero", "note": "qty<=0"})
-                continue
-
-            coid = gen_coid(
-                sym,
-                pd.Timestamp.utcnow().strftime("%Y%m%d%H%M"),
-                f"{sym}|{last_price}|{plan.qty}|{plan.stop_price}|{plan.take_profit}",
-            )
-
-            try:
-                self.broker.submit_bracket(
-                    symbol=sym,
-                    qty=plan.qty,
-                    side="buy",
-                    entry_price=last_price,
-                    take_profit=plan.take_profit,
-                    stop_price=plan.stop_price,
-                    client_order_id=coid,
-                )
-                orders.append(
-                    {
-                        "symbol": sym,
-                        "qty": int(plan.qty),
-                        "entry": float(last_price),
-                        "tp": float(plan.take_profit),
-                        "sl": float(plan.stop_price),
-                        "coid": coid,
-                    }
-                )
-                self.logger.info(
-                    {
-                        "event": "order_submitted",
-                        "symbol": sym,
-                        "qty": plan.qty,
-                        "entry": last_price,
-                        "tp": plan.take_profit,
-                        "sl": plan.stop_price,
-                        "coid": coid,
-                    }
+        with m.stage("orders"):
+            for sym in filtered_syms:
+                df = df_cache[sym]
+                last_price = float(df["close"].iloc[-1])
+                with m.symbol(sym):
+                    plan = position_size(self.cfg, df, last_price, equity)
+                if plan.qty <= 0:
+                    if verbose_symbol_logs:
+                        scanned_log.append({"symbol": sym, "stage": "sizing_zero", "note": "qty<=0"})
+                    continue
+
+                coid = gen_coid(
+                    sym,
+                    pd.Timestamp.utcnow().strftime("%Y%m%d%H%M"),
+                    f"{sym}|{last_price}|{plan.qty}|{plan.stop_price}|{plan.take_profit}",
                 )
-                # optional cooloff to avoid immediate re-entry
-                self._symbol_cooloff[sym] = time.time() + self.cfg.risk.symbol_cooloff_min * 60
-            except Exception as e:
-                self.logger.error({"event": "order_error", "symbol": sym, "error": str(e)})
+
+                try:
+                    with m.stage("submit"), m.symbol(sym):
+                        self.broker.submit_bracket(
+                            symbol=sym,
+                            qty=plan.qty,
+                            side="buy",
+                            entry_price=last_price,
+                            take_profit=plan.take_profit,
+                            stop_price=plan.stop_price,
+                            client_order_id=coid,
+                        )
+                    m.latency("bar_close_to_submit", self._since_bar_close(df))
+                    orders.append(
+                        {
+                            "symbol": sym,
+                            "qty": int(plan.qty),
+                            "entry": float(last_price),
+                            "tp": float(plan.take_profit),
+                            "sl": float(plan.stop_price),
+                            "coid": coid,
+                        }
+                    )
+                    self.logger.info(
+                        {
+                            "event": "order_submitted",
+                            "symbol": sym,
+                            "qty": plan.qty,
+                            "entry": last_price,
+                            "tp": plan.take_profit,
+                            "sl": plan.stop_price,
+                            "coid": coid,
+                        }
+                    )
+                    # optional cooloff to avoid immediate re-entry
+                    self._symbol_cooloff[sym] = time.time() + self.cfg.risk.symbol_cooloff_min * 60
+                except Exception as e:
+                    self.logger.error({"event": "order_error", "symbol": sym, "error": str(e)})
 
         # 7) Build return payload
         result = {
@@ -199,8 +278,12 @@ class OMS:
             "skipped": skipped_syms,
             "candidates": long_syms,        # pre-portfolio filters list of LONG signals (post-htf)
             "orders": orders,
-            "positions": list(self.broker.positions().keys()),
         }
+        with m.stage("broker_positions"):
+            result["positions"] = list(self.broker.positions().keys())
+        metrics = m.finish(symbols=len(tickers), df_cache_mb=round(frames_mb(df_cache), 2))
+        if self._metrics_file is not None:
+            self._metrics_file.write({"ts": pd.Timestamp.utcnow().isoformat(), **metrics, "histograms": histograms()})
 
         # Optional concise summary line for humans
         self.logger.info(
@@ -211,6 +294,10 @@ class OMS:
                 "signal_longs": len(long_syms),
                 "orders": len(orders),
                 "positions_open": len(result["positions"]),
+                "indicator_cache": self._ind_cache.stats(),
+                "equity_sharpe": self._equity_stats.sharpe,
+                "equity_maxdd": self._equity_stats.maxdd,
+                "metrics": metrics,
             }
         )
 
@@ -0,0 +1,122 @@
+"""
+Universe-wide indicator engine over aligned (symbols x bars) arrays.
+
+Rows are aligned on the union of all bar timestamps, with NaN where a
+symbol has no bar. Indicators are computed per row over that symbol's own
+bars only (missing bars are squeezed out, computed on, then scattered
+back), so every row matches what `strategy.compute_signals` gives for the
+symbol's frame -- but the whole universe is processed in one set of array
+operations instead of one pandas pipeline per symbol.
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from . import kernels
+from .strategy import signal_codes
+
+OHLCV = ("open", "high", "low", "close", "volume")
+
+
+@dataclass
+class Panel:
+    symbols: List[str]
+    index: pd.DatetimeIndex
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @property
+    def valid(self) -> np.ndarray:
+        return ~np.isnan(self.close)
+
+
+def build_panel(frames: Dict[str, pd.DataFrame]) -> Panel:
+    """Align per-symbol OHLCV frames on the union of their timestamps."""
+    frames = {s: df for s, df in frames.items() if df is not None and not df.empty}
+    symbols = list(frames)
+    if not symbols:
+        empty = np.empty((0, 0))
+        return Panel([], pd.DatetimeIndex([]), empty, empty, empty, empty, empty)
+    tz = frames[symbols[0]].index.tz
+    stamps = np.unique(np.concatenate([df.index.asi8 for df in frames.values()]))
+    index = pd.DatetimeIndex(stamps).tz_localize("UTC").tz_convert(tz) if tz is not None else pd.DatetimeIndex(stamps)
+    arrays = {c: np.full((len(symbols), len(index)), np.nan) for c in OHLCV}
+    for i, sym in enumerate(symbols):
+        df = frames[sym]
+        pos = np.searchsorted(stamps, df.index.asi8)
+        for c in OHLCV:
+            if c in df.columns:
+                arrays[c][i, pos] = df[c].to_numpy(dtype=np.float64)
+    return Panel(symbols, index, **arrays)
+
+
+@dataclass
+class PanelSignals:
+    symbols: List[str]
+    index: pd.DatetimeIndex
+    valid: np.ndarray
+    efast: np.ndarray
+    eslow: np.ndarray
+    adx: np.ndarray
+    rsi: np.ndarray
+    slope: np.ndarray
+    long: np.ndarray
+
+    def row(self, symbol: str) -> int:
+        return self.symbols.index(symbol)
+
+    def latest_long(self) -> Dict[str, bool]:
+        """LONG flag on each symbol's own last bar."""
+        out = {}
+        for i, sym in enumerate(self.symbols):
+            pos = np.flatnonzero(self.valid[i])
+            out[sym] = bool(pos.size and self.long[i, pos[-1]])
+        return out
+
+    def signal_series(self, symbol: str) -> pd.Series:
+        """`compute_signals`-shaped Series on the symbol's own bars."""
+        i = self.row(symbol)
+        m = self.valid[i]
+        return signal_codes(self.long[i, m], self.index[m])
+
+
+def compute_panel_signals(panel: Panel, cfg) -> PanelSignals:
+    st = cfg.strategy
+    valid = panel.valid
+    if valid.size == 0:
+        z = np.zeros((len(panel.symbols), 0))
+        return PanelSignals(panel.symbols, panel.index, valid, z, z, z, z, z, z.astype(bool))
+
+    # Squeeze each row's bars to the left so windows never span a missing bar
+    order = np.argsort(~valid, axis=1, kind="stable")
+
+    def squeeze(x):
+        return np.take_along_axis(x, order, axis=1)
+
+    def expand(y):
+        out = np.empty_like(y)
+        np.put_along_axis(out, order, y, axis=1)
+        return out
+
+    h, lo, c = squeeze(panel.high), squeeze(panel.low), squeeze(panel.close)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        efast = kernels.ema(c, st.ema_fast)
+        eslow = kernels.ema(c, st.ema_slow)
+        adx_val = np.nan_to_num(kernels.dmi(h, lo, c, st.adx_len)[4], nan=0.0)
+        r = kernels.rsi(c, st.rsi_len)
+        slope = (efast - kernels.shift(efast, 3)) / efast * 10000.0
+        longs = (
+            (efast > eslow) & (adx_val >= st.adx_min) & (r >= st.rsi_min) & (r <= st.rsi_max)
+            & (slope >= st.ema_slope_bps)
+        )
+
+    longs = expand(longs) & valid
+    return PanelSignals(
+        panel.symbols, panel.index, valid,
+        expand(efast), expand(eslow), expand(adx_val), expand(r), expand(slope), longs,
+    )
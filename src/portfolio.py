@@ -8,12 +8,18 @@ def enforce_portfolio_limits(cfg: Config, open_positions: Dict[str, float], prop
     allowed = []
     if net_exposure >= cfg.risk.max_net_exposure_pct:
         return allowed
+    # symbols without an open position each take one of the free position slots
+    slots = cfg.risk.max_concurrent_positions - sum(1 for v in open_positions.values() if v)
     # Throttle by correlation groups (placeholder: deterministic order)
     candidates = throttle_similar(proposed, cfg.portfolio.correlation_block_threshold)
     for sym in candidates:
         pos_notional = abs(open_positions.get(sym, 0.0))
         if pos_notional / equity >= cfg.risk.max_position_pct: 
             continue
+        if not pos_notional:
+            if slots <= 0:
+                continue
+            slots -= 1
         # sector cap omitted for brevity (requires sector map/lookup)
         allowed.append(sym)
         if (sum(abs(open_positions.get(s,0.0)) for s in allowed) / equity) >= cfg.risk.max_net_exposure_pct:
@@ -1,19 +1,49 @@
+from typing import Optional
+import numpy as np
 import pandas as pd
-from .indicators import ema, adx, atr
+from . import indicator_cache as ic
+from .resample import bar_ends, can_resample, resample_session
+from .strategy import Signal
 
 def compute_htf_regime(htf: pd.DataFrame, adx_min: float, chop_max: float):
-    ema50 = ema(htf["close"], 50)
-    ema200 = ema(htf["close"], 200)
-    adx_val, _, _ = adx(htf, 14)
+    ema50 = ic.ema(htf, 50)
+    ema200 = ic.ema(htf, 200)
+    adx_val, _, _ = ic.adx(htf, 14)
     trend = (ema50 > ema200) & (adx_val >= adx_min)
     chop = (adx_val <= chop_max)
     return trend.fillna(False), chop.fillna(False)
 
 def high_volatility_flag(df30m: pd.DataFrame, mult: float = 2.0) -> bool:
     # ATR% 30m against 60d median (very rough proxy)
-    a = atr(df30m, 14)
+    a = ic.atr(df30m, 14)
     atr_pct = (a / df30m["close"]) * 100
     med = atr_pct.rolling(60*13//14).median()  # ~60 trading days on 30m bars rough
     flag = (atr_pct.iloc[-1] > mult * (med.iloc[-1] if not pd.isna(med.iloc[-1]) else atr_pct.iloc[-1]))
     return bool(flag)
 
+def htf_regime_gate(cfg, base: pd.DataFrame, htf: Optional[pd.DataFrame] = None) -> np.ndarray:
+    """
+    Per base bar, the live HTF check (trend and not chop) as of that bar's
+    close: an as-of join on bar close times, so bar i only sees HTF bars
+    closed by the end of bar i. `htf` defaults to `base` resampled to
+    `general.htf_timeframe`.
+    """
+    g = cfg.general
+    if htf is None:
+        if not can_resample(g.bar_timeframe, g.htf_timeframe):
+            raise ValueError(f"{g.htf_timeframe} bars cannot be built from {g.bar_timeframe} bars; pass htf")
+        htf = resample_session(base, g.bar_timeframe, g.htf_timeframe, g.rth_only)
+        htf.attrs.update(symbol=base.attrs.get("symbol"), timeframe=g.htf_timeframe)
+    if base.empty or htf.empty:
+        return np.zeros(len(base), dtype=bool)
+    trend, chop = compute_htf_regime(htf, cfg.regime.trend_adx_min, cfg.regime.chop_adx_max)
+    ok = (trend & ~chop).to_numpy(dtype=bool)
+    pos = np.searchsorted(bar_ends(htf.index, g.htf_timeframe, g.rth_only),
+                          bar_ends(base.index, g.bar_timeframe, g.rth_only), side="right") - 1
+    return np.where(pos >= 0, ok[np.maximum(pos, 0)], False)
+
+def align_htf(cfg, base: pd.DataFrame, sig: pd.Series, htf: Optional[pd.DataFrame] = None) -> pd.Series:
+    """`sig` with LONGs outside an aligned HTF regime dropped, as OMS step 3; as is when not required."""
+    if not cfg.strategy.htf_align_required:
+        return sig
+    return sig.where(htf_regime_gate(cfg, base, htf), Signal.NONE)
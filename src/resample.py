@@ -0,0 +1,140 @@
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .calendar import _parse_timeframe
+
+RTH_OPEN = pd.Timedelta(hours=9, minutes=30)
+RTH_CLOSE = pd.Timedelta(hours=16)
+EXT_OPEN = pd.Timedelta(hours=4)
+EXT_CLOSE = pd.Timedelta(hours=20)
+
+
+def can_resample(base_tf: str, htf_tf: str) -> bool:
+    """True if `htf_tf` bars can be built from `base_tf` bars (a whole multiple, or daily)."""
+    try:
+        base, htf = _parse_timeframe(base_tf), _parse_timeframe(htf_tf)
+    except ValueError:
+        return False
+    if htf >= pd.Timedelta(days=1):
+        return htf == pd.Timedelta(days=1)
+    return htf > base and htf % base == pd.Timedelta(0)
+
+
+def bar_ends(index: pd.DatetimeIndex, timeframe: str, rth_only: bool = True) -> np.ndarray:
+    """
+    Close time (int64 ns) of each bar labelled by its start, binned as in
+    `resample_session`: `timeframe` after the label, cut at the session
+    close; daily bars close at the session close.
+    """
+    step = _parse_timeframe(timeframe)
+    # on market wall-clock ns; sessions never span a DST switch, so the bar's span carries over to UTC
+    wall = (index if index.tz is None else index.tz_convert("America/New_York").tz_localize(None)).asi8
+    day_ns = pd.Timedelta(days=1).value
+    close_at = wall - wall % day_ns + (RTH_CLOSE if rth_only else EXT_CLOSE).value
+    end = close_at if step >= pd.Timedelta(days=1) else np.minimum(wall + step.value, close_at)
+    return index.asi8 + (end - wall)
+
+
+def resample_session(
+    df: pd.DataFrame,
+    base_tf: str,
+    htf_tf: str,
+    rth_only: bool = True,
+    drop_partial: bool = True,
+) -> pd.DataFrame:
+    """
+    Aggregate base OHLCV bars into `htf_tf` bars anchored at the 09:30 ET
+    session open (60m -> 09:30, 10:30, ...; 2h -> 09:30, 11:30, 13:30,
+    15:30; 1d -> one bar per session). The session-end bin may be shorter
+    than `htf_tf` and counts as complete once the session is over.
+    With `drop_partial`, a trailing bin the base bars do not yet fully
+    cover is dropped, so callers only ever see closed HTF bars.
+    """
+    if df.empty:
+        return df.iloc[0:0]
+    base_step = _parse_timeframe(base_tf).value
+    step = _parse_timeframe(htf_tf).value
+    utc = df.index.asi8
+    # session arithmetic on market wall-clock ns; a session never spans a DST switch
+    wall = df.index.tz_convert("America/New_York").tz_localize(None).asi8
+    day = wall - wall % pd.Timedelta(days=1).value
+    tod = wall - day
+    close_at = (RTH_CLOSE if rth_only else EXT_CLOSE).value
+
+    keep = (tod >= RTH_OPEN.value) & (tod < RTH_CLOSE.value) if rth_only else (tod >= EXT_OPEN.value) & (tod < EXT_CLOSE.value)
+    if not keep.all():
+        df, utc, wall, day, tod = df[keep], utc[keep], wall[keep], day[keep], tod[keep]
+        if df.empty:
+            return df
+
+    if step >= pd.Timedelta(days=1).value:
+        lab = day
+        ends = day + close_at
+    else:
+        k = np.floor_divide(tod - RTH_OPEN.value, step)  # negative bins before the open
+        lab = day + RTH_OPEN.value + k * step
+        ends = np.minimum(lab + step, day + close_at)
+
+    # Bars are sorted, so each bin is a contiguous run
+    starts = np.flatnonzero(np.r_[True, lab[1:] != lab[:-1]])
+    o = df["open"].to_numpy(dtype=np.float64)
+    h = df["high"].to_numpy(dtype=np.float64)
+    lo = df["low"].to_numpy(dtype=np.float64)
+    c = df["close"].to_numpy(dtype=np.float64)
+    out = pd.DataFrame(
+        {
+            "open": o[starts],
+            "high": np.maximum.reduceat(h, starts),
+            "low": np.minimum.reduceat(lo, starts),
+            "close": c[np.r_[starts[1:] - 1, len(c) - 1]],
+        },
+        index=pd.DatetimeIndex(utc[starts] + (lab[starts] - wall[starts]), name="timestamp")
+        .tz_localize("UTC").tz_convert("America/New_York"),
+    )
+    if "volume" in df.columns:
+        out["volume"] = np.add.reduceat(df["volume"].to_numpy(dtype=np.float64), starts)
+
+    if drop_partial and wall[-1] + base_step < ends[starts[-1]]:
+        out = out.iloc[:-1]
+    return out
+
+
+class HTFResampler:
+    """
+    Per-symbol cache of closed HTF bars derived from base bars. Each call
+    only re-aggregates base bars from the last cached HTF bar onward; closed
+    HTF bars are never recomputed.
+    """
+
+    def __init__(self, base_tf: str, htf_tf: str, rth_only: bool = True):
+        self.base_tf = base_tf
+        self.htf_tf = htf_tf
+        self.rth_only = rth_only
+        self._step = _parse_timeframe(htf_tf)
+        self._cache: Dict[str, Tuple[pd.DataFrame, pd.Timestamp]] = {}
+
+    def get(self, symbol: str, base: pd.DataFrame) -> pd.DataFrame:
+        if base.empty:
+            return base.iloc[0:0]
+        cached = self._cache.get(symbol)
+        first = base.index[0]
+        if cached is not None and not cached[0].empty and cached[0].index[0] <= first + pd.Timedelta(days=1):
+            hist, resume = cached
+            fresh = resample_session(base[base.index >= resume], self.base_tf, self.htf_tf, self.rth_only)
+            hist = hist[(hist.index + self._step > first) & (hist.index < resume)]
+            out = pd.concat([hist, fresh]) if not fresh.empty else hist
+        else:
+            out = resample_session(base, self.base_tf, self.htf_tf, self.rth_only)
+        out.attrs.update(symbol=symbol, timeframe=self.htf_tf)
+        if not out.empty:
+            # next call re-aggregates from the last closed bin, the cheapest safe resume point
+            self._cache[symbol] = (out, out.index[-1])
+        return out
+
+    def clear(self, symbol: Optional[str] = None) -> None:
+        if symbol is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(symbol, None)
@@ -1,6 +1,6 @@
 import math
 from dataclasses import dataclass
-from .indicators import atr
+from .indicator_cache import atr
 from .config import Config
 import pandas as pd
 
@@ -19,8 +19,10 @@ def estimate_spread_bps(df: pd.DataFrame) -> float:
     return float((last["high"] - last["low"]) / last["close"] * 10000.0)
 
 def position_size(cfg: Config, df: pd.DataFrame, price: float, equity: float) -> TradePlan:
-    a = atr(df, 14).iloc[-1]
-    spread_bps_est = estimate_spread_bps(df)
+    return plan_trade(cfg, price, atr(df, 14).iloc[-1], estimate_spread_bps(df), equity)
+
+def plan_trade(cfg: Config, price: float, a: float, spread_bps_est: float, equity: float) -> TradePlan:
+    """`position_size` from the signal bar's ATR and spread estimate (no frame needed)."""
     if spread_bps_est > cfg.risk.spread_bps_max:
         return TradePlan(0,0,0,0,0,0)
 
@@ -1,19 +1,108 @@
+import copy
+from typing import Any, Dict
+import numpy as np
 import pandas as pd
-from .indicators import ema, adx, rsi, ema_slope_bps
+from .indicators import ema_slope_bps
+from . import indicator_cache as ic
+from .streaming import ADXState, EMAState, RSIState, SlopeState
 
 class Signal:
-    NONE="NONE"; LONG="LONG"; SHORT="SHORT"
+    """
+    Signal codes. Signals are int8 arrays / Series of these; the names are
+    presentation only (`label`, `labels`).
+    """
+    NONE = 0; LONG = 1; SHORT = -1
+    DTYPE = np.int8
+    NAMES = {NONE: "NONE", LONG: "LONG", SHORT: "SHORT"}
+
+    @classmethod
+    def label(cls, code) -> str:
+        return cls.NAMES[int(code)]
+
+    @classmethod
+    def labels(cls, sig: pd.Series) -> pd.Series:
+        """Signal names for display and logs."""
+        return sig.map(cls.NAMES)
+
+def signal_codes(longs, index=None) -> pd.Series:
+    """int8 signal Series from a LONG mask (NaN counts as no signal)."""
+    codes = np.where(np.asarray(longs, dtype=bool), Signal.LONG, Signal.NONE).astype(Signal.DTYPE)
+    return pd.Series(codes, index=index if index is not None else getattr(longs, "index", None))
 
 def compute_signals(df15: pd.DataFrame, cfg) -> pd.Series:
-    efast = ema(df15["close"], cfg.strategy.ema_fast)
-    eslow = ema(df15["close"], cfg.strategy.ema_slow)
-    adx_val, pdi, mdi = adx(df15, cfg.strategy.adx_len)
-    r = rsi(df15["close"], cfg.strategy.rsi_len)
+    efast = ic.ema(df15, cfg.strategy.ema_fast)
+    eslow = ic.ema(df15, cfg.strategy.ema_slow)
+    adx_val, pdi, mdi = ic.adx(df15, cfg.strategy.adx_len)
+    r = ic.rsi(df15, cfg.strategy.rsi_len)
     slope = ema_slope_bps(efast, 3)
 
     longs = (efast > eslow) & (adx_val >= cfg.strategy.adx_min) & (r.between(cfg.strategy.rsi_min, cfg.strategy.rsi_max)) & (slope >= cfg.strategy.ema_slope_bps)
     # Shorts disabled by default in config
-    sig = pd.Series(Signal.NONE, index=df15.index)
-    sig = sig.mask(longs, Signal.LONG)
-    return sig.fillna(Signal.NONE)
+    return signal_codes(longs.to_numpy(dtype=bool, na_value=False), df15.index)
+
+class SignalStream:
+    """
+    Incremental `compute_signals` for one symbol: seed once from history,
+    then `update` per closed bar in O(1). `peek` evaluates a bar that may
+    still be revised (the forming last bar) without committing it.
+    """
+
+    def __init__(self, cfg):
+        st = cfg.strategy
+        self.thresholds = {
+            "adx_min": st.adx_min, "rsi_min": st.rsi_min, "rsi_max": st.rsi_max, "ema_slope_bps": st.ema_slope_bps,
+        }
+        self.efast = EMAState(st.ema_fast)
+        self.eslow = EMAState(st.ema_slow)
+        self.adx = ADXState(st.adx_len)
+        self.rsi = RSIState(st.rsi_len)
+        self.slope = SlopeState(3)
+        self.last_ts = None
+
+    def update(self, ts, high: float, low: float, close: float) -> int:
+        high, low, close = float(high), float(low), float(close)
+        ef = self.efast.update(close)
+        es = self.eslow.update(close)
+        adx_val, _, _ = self.adx.update(high, low, close)
+        r = self.rsi.update(close)
+        slope = self.slope.update(ef)
+        self.last_ts = ts
+        t = self.thresholds
+        longs = (ef > es) and (adx_val >= t["adx_min"]) and (t["rsi_min"] <= r <= t["rsi_max"]) and (slope >= t["ema_slope_bps"])
+        return Signal.LONG if longs else Signal.NONE
+
+    def update_frame(self, df: pd.DataFrame) -> int:
+        sig = Signal.NONE
+        for ts, h, l, c in zip(df.index, df["high"].to_numpy(), df["low"].to_numpy(), df["close"].to_numpy()):
+            sig = self.update(ts, h, l, c)
+        return sig
+
+    def update_many(self, index, high, low, close) -> np.ndarray:
+        """`update` over arrays of bars; returns the LONG flag of every bar."""
+        out = np.zeros(len(close), dtype=bool)
+        cols = (np.asarray(x, dtype=float).tolist() for x in (high, low, close))
+        for i, (h, l, c) in enumerate(zip(*cols)):
+            out[i] = self.update(None, h, l, c) == Signal.LONG
+        if len(out):
+            self.last_ts = index[-1]
+        return out
+
+    def peek(self, ts, high: float, low: float, close: float) -> int:
+        return copy.deepcopy(self).update(ts, high, low, close)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "thresholds": dict(self.thresholds),
+            "efast": self.efast.to_dict(), "eslow": self.eslow.to_dict(), "adx": self.adx.to_dict(),
+            "rsi": self.rsi.to_dict(), "slope": self.slope.to_dict(),
+            "last_ts": None if self.last_ts is None else pd.Timestamp(self.last_ts).isoformat(),
+        }
 
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SignalStream":
+        s = cls.__new__(cls)
+        s.thresholds = dict(d["thresholds"])
+        s.efast, s.eslow = EMAState.from_dict(d["efast"]), EMAState.from_dict(d["eslow"])
+        s.adx, s.rsi, s.slope = ADXState.from_dict(d["adx"]), RSIState.from_dict(d["rsi"]), SlopeState.from_dict(d["slope"])
+        s.last_ts = None if d["last_ts"] is None else pd.Timestamp(d["last_ts"])
+        return s
@@ -0,0 +1,277 @@
+"""
+Incremental (O(1) per bar) counterparts of the batch indicators in
+`indicators.py`. Each state is fed one bar at a time and reproduces the
+pandas computation step for step -- the EWM recurrence and the
+Kahan-compensated rolling sum/mean pandas uses -- so seeded on the same
+history they return the same floats as the batch versions. All states
+round-trip through `to_dict()` / `from_dict()` (plain JSON types).
+"""
+import math
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+NAN = float("nan")
+
+
+def _isnan(x: float) -> bool:
+    return x != x
+
+
+class EMAState:
+    """`series.ewm(span=length, adjust=False).mean()`, one value at a time."""
+
+    def __init__(self, length: int):
+        self.length = length
+        alpha = 1.0 / (1.0 + (length - 1) / 2.0)  # pandas derives alpha from com, not 2/(span+1)
+        self._old = 1.0 - alpha
+        self._new = alpha
+        self.value = NAN
+        self.started = False
+
+    def update(self, x: float) -> float:
+        if not self.started:
+            self.value, self.started = x, True
+        elif x == x:
+            if self.value != self.value:
+                self.value = x
+            elif self.value != x:
+                self.value = (self._old * self.value + self._new * x) / (self._old + self._new)
+        return self.value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"length": self.length, "value": self.value, "started": self.started}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "EMAState":
+        s = cls(d["length"])
+        s.value, s.started = d["value"], d["started"]
+        return s
+
+
+class RollingState:
+    """
+    `series.rolling(length).mean()` / `.sum()` with pandas' own bookkeeping
+    (compensated add/remove, same-value run tracking, sign clamping).
+    """
+
+    def __init__(self, length: int, kind: str = "mean"):
+        if kind not in ("mean", "sum"):
+            raise ValueError(f"Unsupported rolling kind: {kind}")
+        self.length = length
+        self.kind = kind
+        self.window: deque = deque()
+        self.nobs = 0
+        self.neg_ct = 0
+        self.sum_x = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.same_ct = 0
+        self.prev: Optional[float] = None
+
+    def _add(self, v: float) -> None:
+        if _isnan(v):
+            return
+        self.nobs += 1
+        y = v - self.comp_add
+        t = self.sum_x + y
+        self.comp_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, v) < 0:
+            self.neg_ct += 1
+        if v == self.prev:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev = v
+
+    def _remove(self, v: float) -> None:
+        if _isnan(v):
+            return
+        self.nobs -= 1
+        y = -v - self.comp_remove
+        t = self.sum_x + y
+        self.comp_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, v) < 0:
+            self.neg_ct -= 1
+
+    def update(self, x: float) -> float:
+        if math.isinf(x):
+            x = NAN  # pandas treats +/-inf as missing in rolling aggregations
+        if self.prev is None:
+            self.prev = x
+        if len(self.window) == self.length:
+            self._remove(self.window.popleft())
+        self.window.append(x)
+        self._add(x)
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.nobs < self.length:
+            return NAN
+        if self.kind == "sum":
+            return self.prev * self.nobs if self.same_ct >= self.nobs else self.sum_x
+        result = self.sum_x / self.nobs
+        if self.same_ct >= self.nobs:
+            result = self.prev
+        elif self.neg_ct == 0 and result < 0:
+            result = 0.0
+        elif self.neg_ct == self.nobs and result > 0:
+            result = 0.0
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "length": self.length, "kind": self.kind, "window": list(self.window),
+            "nobs": self.nobs, "neg_ct": self.neg_ct, "sum_x": self.sum_x,
+            "comp_add": self.comp_add, "comp_remove": self.comp_remove,
+            "same_ct": self.same_ct, "prev": self.prev,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "RollingState":
+        s = cls(d["length"], d["kind"])
+        s.window = deque(d["window"])
+        for k in ("nobs", "neg_ct", "sum_x", "comp_add", "comp_remove", "same_ct", "prev"):
+            setattr(s, k, d[k])
+        return s
+
+
+class RSIState:
+    """`indicators.rsi` (SMA of gains/losses, 0 when there are no losses)."""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.up = RollingState(length)
+        self.down = RollingState(length)
+        self.prev_close = NAN
+
+    def update(self, close: float) -> float:
+        delta = close - self.prev_close
+        self.prev_close = close
+        up = self.up.update(delta if delta > 0 else 0.0)
+        down = self.down.update(-(delta if delta < 0 else 0.0))
+        if _isnan(up) or _isnan(down) or down == 0:
+            return 0.0
+        return 100 - (100 / (1 + up / down))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"length": self.length, "up": self.up.to_dict(), "down": self.down.to_dict(), "prev_close": self.prev_close}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "RSIState":
+        s = cls(d["length"])
+        s.up, s.down = RollingState.from_dict(d["up"]), RollingState.from_dict(d["down"])
+        s.prev_close = d["prev_close"]
+        return s
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    hl = high - low
+    if _isnan(prev_close):
+        return hl
+    return max(hl, abs(high - prev_close), abs(low - prev_close))
+
+
+class ATRState:
+    """`indicators.atr`: rolling mean of true range."""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.tr = RollingState(length)
+        self.prev_close = NAN
+
+    def update(self, high: float, low: float, close: float) -> float:
+        out = self.tr.update(_true_range(high, low, self.prev_close))
+        self.prev_close = close
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"length": self.length, "tr": self.tr.to_dict(), "prev_close": self.prev_close}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ATRState":
+        s = cls(d["length"])
+        s.tr, s.prev_close = RollingState.from_dict(d["tr"]), d["prev_close"]
+        return s
+
+
+class ADXState:
+    """`indicators.adx`; `update` returns (adx, +DI, -DI) with the same NaN -> 0 fill."""
+
+    def __init__(self, length: int = 14):
+        self.length = length
+        self.atr = ATRState(length)
+        self.plus = RollingState(length, "sum")
+        self.minus = RollingState(length, "sum")
+        self.dx = RollingState(length)
+        self.prev_high = NAN
+        self.prev_low = NAN
+
+    def update(self, high: float, low: float, close: float) -> Tuple[float, float, float]:
+        up_move = high - self.prev_high
+        down_move = -(low - self.prev_low)
+        self.prev_high, self.prev_low = high, low
+        plus_dm = up_move if (up_move > down_move and up_move > 0) else 0.0
+        minus_dm = down_move if (down_move > up_move and down_move > 0) else 0.0
+
+        atr_n = self.atr.update(high, low, close)
+        plus_di = _div(100 * self.plus.update(plus_dm), atr_n)
+        minus_di = _div(100 * self.minus.update(minus_dm), atr_n)
+        denom = plus_di + minus_di
+        dx = NAN if (denom == 0 or _isnan(denom)) else _div(abs(plus_di - minus_di), denom) * 100
+        adx_val = self.dx.update(dx)
+        return (
+            0.0 if _isnan(adx_val) else adx_val,
+            0.0 if _isnan(plus_di) else plus_di,
+            0.0 if _isnan(minus_di) else minus_di,
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "length": self.length, "atr": self.atr.to_dict(), "plus": self.plus.to_dict(),
+            "minus": self.minus.to_dict(), "dx": self.dx.to_dict(),
+            "prev_high": self.prev_high, "prev_low": self.prev_low,
+        }
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "ADXState":
+        s = cls(d["length"])
+        s.atr = ATRState.from_dict(d["atr"])
+        s.plus, s.minus, s.dx = (RollingState.from_dict(d[k]) for k in ("plus", "minus", "dx"))
+        s.prev_high, s.prev_low = d["prev_high"], d["prev_low"]
+        return s
+
+
+def _div(a: float, b: float) -> float:
+    """IEEE division like NumPy/pandas: x/0 -> +/-inf, 0/0 -> nan."""
+    try:
+        return a / b
+    except ZeroDivisionError:
+        if _isnan(a) or a == 0:
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1.0, b)
+
+
+class SlopeState:
+    """`indicators.ema_slope_bps` over an incoming (EMA) series."""
+
+    def __init__(self, bars: int = 3):
+        self.bars = bars
+        self.hist: deque = deque(maxlen=bars + 1)
+
+    def update(self, x: float) -> float:
+        self.hist.append(x)
+        if len(self.hist) <= self.bars:
+            return NAN
+        return _div(x - self.hist[0], x) * 10000.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"bars": self.bars, "hist": list(self.hist)}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "SlopeState":
+        s = cls(d["bars"])
+        s.hist.extend(d["hist"])
+        return s
@@ -0,0 +1,104 @@
+"""
+Warm-up planning: how many bars each indicator chain needs before its
+values are converged, and how far back to fetch to get them.
+
+Rolling windows are exact once full. An EMA never fully forgets its seed;
+after k bars the seed still carries weight (1 - alpha)^k, so it is counted
+as converged once that weight drops below `tol`.
+"""
+import math
+from typing import Dict
+
+import pandas as pd
+
+from .calendar import _parse_timeframe
+from .bar_store import to_market_ts
+from .resample import can_resample
+
+RTH_SESSION = pd.Timedelta(hours=6, minutes=30)
+EXT_SESSION = pd.Timedelta(hours=16)
+DOLLAR_VOL_WINDOW = 20      # data.rolling_dollar_vol
+SLOPE_BARS = 3              # strategy: ema_slope_bps(efast, 3)
+REGIME_EMA = (50, 200)      # regime.compute_htf_regime
+REGIME_ADX = 14
+HOLIDAY_PAD = 1 / 20        # weekday-only calendar: allow ~1 holiday per 4 weeks
+
+
+def ema_bars(length: int, tol: float = 0.01) -> int:
+    """Bars until the seed's weight in `ewm(span=length, adjust=False)` falls below `tol`."""
+    alpha = 1.0 / (1.0 + (length - 1) / 2.0)
+    if alpha >= 1.0:
+        return 1
+    return int(math.ceil(math.log(tol) / math.log(1.0 - alpha)))
+
+
+def adx_bars(length: int) -> int:
+    # one diff, a full DM/TR window, then a full window of DX
+    return 2 * length
+
+
+def rsi_bars(length: int) -> int:
+    return length + 1
+
+
+def signal_requirements(cfg, tol: float = 0.01) -> Dict[str, int]:
+    st = cfg.strategy
+    return {
+        "ema_fast_slope": ema_bars(st.ema_fast, tol) + SLOPE_BARS,
+        "ema_slow": ema_bars(st.ema_slow, tol),
+        "adx": adx_bars(st.adx_len),
+        "rsi": rsi_bars(st.rsi_len),
+        "atr": 14,
+        "dollar_vol": DOLLAR_VOL_WINDOW,
+    }
+
+
+def regime_requirements(tol: float = 0.01) -> Dict[str, int]:
+    req = {f"ema{n}": ema_bars(n, tol) for n in REGIME_EMA}
+    req["adx"] = adx_bars(REGIME_ADX)
+    return req
+
+
+def signal_warmup_bars(cfg, tol: float = 0.01) -> int:
+    return max(signal_requirements(cfg, tol).values())
+
+
+def htf_warmup_bars(tol: float = 0.01) -> int:
+    return max(regime_requirements(tol).values())
+
+
+def bars_per_session(timeframe: str, rth_only: bool = True) -> int:
+    step = _parse_timeframe(timeframe)
+    if step >= pd.Timedelta(days=1):
+        return 1
+    return int(math.ceil((RTH_SESSION if rth_only else EXT_SESSION) / step))
+
+
+def fetch_start(end, bars: int, timeframe: str, rth_only: bool = True) -> pd.Timestamp:
+    """
+    Session-aware start date that leaves at least `bars` closed bars of
+    `timeframe` before `end` (the session containing `end` is not counted,
+    it may have barely started).
+    """
+    sessions = int(math.ceil(bars / bars_per_session(timeframe, rth_only)))
+    sessions += int(math.ceil(sessions * HOLIDAY_PAD)) + 1
+    day = to_market_ts(end).tz_localize(None).normalize()
+    return (day - pd.offsets.BDay(sessions)).tz_localize(to_market_ts(end).tz)
+
+
+def plan_fetch_starts(cfg, end) -> Dict[str, pd.Timestamp]:
+    """
+    {"base": ..., "htf": ...}: how far back to fetch base and HTF bars for
+    one cycle ending at `end`. `perf.warmup_tol` sets EMA convergence. When
+    HTF bars are resampled from base bars, the base fetch also covers the
+    HTF warm-up.
+    """
+    g, tol = cfg.general, cfg.perf.warmup_tol
+    base = fetch_start(end, signal_warmup_bars(cfg, tol), g.bar_timeframe, g.rth_only)
+    out = {"base": base, "htf": base}
+    if cfg.strategy.htf_align_required:
+        htf = fetch_start(end, htf_warmup_bars(tol), g.htf_timeframe, g.rth_only)
+        out["htf"] = htf
+        if can_resample(g.bar_timeframe, g.htf_timeframe):
+            out["base"] = min(base, htf)
+    return out
@@ -0,0 +1,96 @@
+"""
+Shared test data: synthetic OHLCV bars and the legacy backtest bar loop.
+
+Plain functions rather than fixtures, so tests import them
+(`from conftest import ohlcv`) and the benchmarks can use the same data
+(`from tests.conftest import ohlcv`).
+"""
+import numpy as np
+import pandas as pd
+
+from src.bar_store import MARKET_TZ
+from src.strategy import Signal
+
+RTH_OPEN = pd.Timedelta(hours=9, minutes=30)
+RTH_MINUTES = 390
+
+
+def bar_index(periods=None, *, sessions=None, start="2024-01-02", end=None, freq="15min", hours="rth") -> pd.DatetimeIndex:
+    """
+    Bar stamps in market time, named "timestamp" as the loaders return them.
+
+    "rth": `freq` bars from 09:30 to the close on each business day from
+    `start` (`sessions` days, through `end`, or enough for `periods` bars).
+    "24h": `periods` bars back to back from 09:30 on `start`.
+    "daily": one midnight stamp per business day.
+    """
+    if hours == "24h":
+        idx = pd.date_range(pd.Timestamp(start) + RTH_OPEN, periods=periods, freq=freq)
+    elif hours == "daily":
+        idx = pd.bdate_range(start, end=end, periods=periods if end is None else None)
+    elif hours == "rth":
+        minutes = int(pd.Timedelta(freq) / pd.Timedelta(minutes=1))
+        per_day = RTH_MINUTES // minutes
+        if sessions is None and end is None:
+            sessions = -(-periods // per_day)
+        days = pd.bdate_range(start, end=end, periods=sessions)
+        offs = RTH_OPEN + pd.to_timedelta(np.arange(per_day) * minutes, unit="min")
+        idx = pd.DatetimeIndex((days.values[:, None] + offs.values[None, :]).ravel()[:periods])
+    else:
+        raise ValueError(f"Unknown hours: {hours!r} (expected 'rth', '24h' or 'daily')")
+    return pd.DatetimeIndex(idx, name="timestamp").tz_localize(MARKET_TZ)
+
+
+def ohlcv(index, seed=0, *, drift=0.0, vol=3e-3, wick=4e-3, fixed_wick=False, volume=1e6, drop=0.0) -> pd.DataFrame:
+    """
+    Lognormal walk of closes on `index` (a DatetimeIndex, or a bar count for
+    `bar_index`), each bar opening at the previous close. High/low sit a
+    uniform(0, `wick`) fraction outside the body (exactly `wick` with
+    `fixed_wick`); `volume=None` draws it uniform(5e5, 2e6). `drop` removes
+    that fraction of bars at random, for ragged bars across symbols.
+    """
+    idx = bar_index(index) if isinstance(index, (int, np.integer)) else index
+    rng = np.random.default_rng(seed)
+    n = len(idx)
+    c = 100 * np.exp(np.cumsum(rng.normal(drift, vol, n)))
+    o = np.r_[c[0], c[:-1]]
+    up, down = (1 + wick, 1 - wick) if fixed_wick else (1 + rng.uniform(0, wick, n), 1 - rng.uniform(0, wick, n))
+    df = pd.DataFrame({"open": o, "high": np.maximum(o, c) * up, "low": np.minimum(o, c) * down, "close": c,
+                       "volume": rng.uniform(5e5, 2e6, n) if volume is None else volume}, index=idx)
+    return df[rng.random(n) > drop] if drop else df
+
+
+def legacy_simulate(df, sig, a, cfg, fine=None, bar=pd.Timedelta(minutes=15)):
+    """
+    The per-bar `df.iloc` loop simulate_symbol ran before the array kernel:
+    equity curve and trade log. A bar touching both TP and stop exits at TP,
+    unless `fine` bars are given; then it is settled on the fine bars inside
+    it (`bar` wide), whichever level the first touching one reaches, stop
+    when it reaches both.
+    """
+    eq = [1.0]
+    pos = 0
+    entry = stop = tp = 0.0
+    trades = []
+    for i in range(1, len(df)):
+        row = df.iloc[i]
+        price_open = float(row["open"])
+        hit_tp, hit_stop = float(row["high"]) >= tp, float(row["low"]) <= stop
+        if pos > 0 and hit_tp and hit_stop and fine is not None:
+            f = fine[(fine.index >= df.index[i]) & (fine.index < df.index[i] + bar)]
+            touch = (f["high"] >= tp) | (f["low"] <= stop)
+            hit_tp = not (f["low"] <= stop)[touch].iloc[0]
+        if pos > 0 and (hit_tp or hit_stop):
+            px = tp if hit_tp else stop
+            r = (px - entry) / (entry - stop)
+            eq.append(eq[-1] * (1 + r * 0.01))
+            trades.append({"side": "long", "entry": entry, "exit": px, "R": r})
+            pos = 0
+        else:
+            eq.append(eq[-1])
+        if pos == 0 and sig.iloc[i - 1] == Signal.LONG:
+            entry = price_open * (1 + (cfg.risk.slippage_bps + cfg.risk.commission_bps) * 1e-4)
+            stop = entry - cfg.risk.atr_k_stop * float(a.iloc[i - 1])
+            tp = entry + cfg.risk.take_profit_R * (entry - stop)
+            pos = 1
+    return pd.Series(eq, index=df.index[: len(eq)]), pd.DataFrame(trades)
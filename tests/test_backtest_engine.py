@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.engine import BacktestEngine
+from src.config import load_config
+from src.indicators import atr
+from src.strategy import Signal
+from conftest import bar_index, legacy_simulate, ohlcv
+
+def _bars(n=3000, seed=5):
+    return ohlcv(bar_index(n, hours="24h"), seed)
+
+@pytest.mark.parametrize("seed", [5, 6])
+def test_array_loop_bit_identical_to_legacy(seed):
+    cfg = load_config("config.yaml")
+    df = _bars(seed=seed)
+    sig = pd.Series(np.where(np.random.default_rng(seed).random(len(df)) < 0.2, Signal.LONG, Signal.NONE), index=df.index)
+    eq, tl = BacktestEngine(cfg, None).simulate_symbol("SYN", "2024-01-02", "2024-12-31", df=df, sig=sig)
+    ref_eq, ref_tl = legacy_simulate(df, sig, atr(df, 14).bfill().ffill(), cfg)
+    assert len(tl) > 20
+    pd.testing.assert_series_equal(eq, ref_eq, check_exact=True)
+    pd.testing.assert_frame_equal(tl, ref_tl, check_exact=True)
+
+def test_parallel_run_matches_serial(monkeypatch):
+    from src.backtest import engine as eng
+    cfg = load_config("config.yaml")
+    frames = {f"S{k}": _bars(800, seed=k) for k in range(4)}
+    frames["EMPTY"] = pd.DataFrame()
+    cfg.backtest.result_cache_dir = ""
+    monkeypatch.setattr(eng, "download_ohlc_many", lambda syms, *a, **k: {s: frames[s] for s in syms})
+    bt = BacktestEngine(cfg, None)
+    tickers = list(frames)
+    serial = bt.run(tickers, "2024-01-02", "2024-12-31", workers=1)
+    par = bt.run(tickers, "2024-01-02", "2024-12-31", workers=3)
+    pd.testing.assert_series_equal(par[0], serial[0], check_freq=False)
+    pd.testing.assert_frame_equal(par[1], serial[1])
+    assert list(par[2]) == list(serial[2]) and par[2] == serial[2]
@@ -0,0 +1,72 @@
+import pandas as pd
+import src.data as data
+from src.bar_store import BarStore
+from src.config import load_config
+
+def _bars(start, periods):
+    idx = pd.date_range(start, periods=periods, freq="15min", tz="America/New_York")
+    close = pd.Series(range(1, periods + 1), index=idx, dtype=float)
+    return pd.DataFrame({"open": close, "high": close + 0.5, "low": close - 0.5, "close": close, "volume": 1000.0})
+
+def test_roundtrip_partitions_by_day(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = _bars("2024-01-02 09:30", 70)   # spills into the next day
+    store.write("NVDA", "15m", df, "2024-01-02", "2024-01-04")
+    files = sorted(p.name for p in (tmp_path / "NVDA" / "15m").glob("*.parquet"))
+    assert files == ["2024-01-02.parquet", "2024-01-03.parquet"]
+    out = BarStore(str(tmp_path)).read("NVDA", "15m", "2024-01-02", "2024-01-04")
+    pd.testing.assert_frame_equal(out, df, check_names=False, check_freq=False)
+
+def test_missing_from_resumes_at_last_bar(tmp_path):
+    store = BarStore(str(tmp_path))
+    df = _bars("2024-01-02 09:30", 10)
+    store.write("NVDA", "15m", df, "2024-01-02", "2024-01-02 12:00")
+    assert store.missing_from("NVDA", "15m", "2024-01-02", "2024-01-02 11:00") is None
+    assert store.missing_from("NVDA", "15m", "2024-01-02", "2024-01-03") == df.index[-1]
+    assert store.missing_from("NVDA", "15m", "2024-01-01", "2024-01-02 11:00") == pd.Timestamp("2024-01-01", tz="America/New_York")
+
+def test_download_ohlc_fetches_only_the_tail(tmp_path, monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.data.store_dir = str(tmp_path)
+    full = _bars("2024-01-02 09:30", 20)
+    calls = []
+
+    def fake_download(jobs, end, interval, provider, proxies, cfg):
+        calls.append(jobs)
+        return {s: (start, full.loc[data.to_market_ts(start):]) for syms, start in jobs for s in syms}
+
+    monkeypatch.setattr(data, "_download_many", fake_download)
+    first = data.download_ohlc("MSFT", "2024-01-02", "2024-01-03", "15m", cfg)
+    second = data.download_ohlc("MSFT", "2024-01-02", "2024-01-03", "15m", cfg)
+    assert len(first) == len(second) == 20
+    assert len(calls) == 1   # second call is served from disk
+
+def test_download_ohlc_many_batches_symbols(tmp_path, monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.data.store_dir = str(tmp_path)
+    full = _bars("2024-01-02 09:30", 20)
+    calls = []
+
+    def fake_download(jobs, end, interval, provider, proxies, cfg):
+        calls.append([s for syms, _ in jobs for s in syms])
+        return {s: (start, full) for syms, start in jobs for s in syms if s != "NOPE"}
+
+    monkeypatch.setattr(data, "_download_many", fake_download)
+    out = data.download_ohlc_many(["MSFT", "NOPE", "AAPL"], "2024-01-02", "2024-01-03", "15m", cfg)
+    assert list(out) == ["MSFT", "NOPE", "AAPL"]
+    assert out["NOPE"].empty and len(out["AAPL"]) == 20
+    assert calls == [["MSFT", "NOPE", "AAPL"]]
+
+def test_empty_span_is_recorded_as_covered(tmp_path, monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.data.store_dir = str(tmp_path)
+    calls = []
+
+    def fake_download(jobs, end, interval, provider, proxies, cfg):
+        calls.append(jobs)
+        return {s: (start, pd.DataFrame()) for syms, start in jobs for s in syms}   # no bars on a holiday
+
+    monkeypatch.setattr(data, "_download_many", fake_download)
+    assert data.download_ohlc("MSFT", "2024-07-04", "2024-07-04 23:00", "15m", cfg).empty
+    assert data.download_ohlc("MSFT", "2024-07-04", "2024-07-04 23:00", "15m", cfg).empty
+    assert len(calls) == 1
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest import chunked, engine as eng
+from src.backtest.metrics import EquityStats
+from src import data
+from src.bar_store import HAVE_PARQUET, to_market_ts
+from src.config import load_config
+from conftest import bar_index, ohlcv
+
+def _ohlcv(idx, seed, vol=3e-3):
+    return ohlcv(idx, seed, drift=3e-4, vol=vol, wick=3e-3, drop=0.03)  # ragged bars across symbols
+
+def _frames():
+    idx = bar_index(sessions=80)
+    return {f"S{k}": _ohlcv(idx, k) for k in range(3)}
+
+def _daily_frames():
+    # daily bars stamped at midnight ET: every chunk boundary falls exactly on a bar
+    idx = bar_index(start="2021-01-04", end="2024-06-28", hours="daily")
+    return {f"D{k}": _ohlcv(idx, k, vol=1.5e-2) for k in range(3)}
+
+CASES = [("15m", _frames, ("2024-02-01", "2024-04-20"), 9), ("1d", _daily_frames, ("2023-01-03", "2024-06-03"), 30)]
+
+@pytest.mark.parametrize("timeframe,make,span,chunk_days", CASES, ids=[c[0] for c in CASES])
+def test_chunked_matches_batch(monkeypatch, timeframe, make, span, chunk_days):
+    frames = make()
+    def fake(syms, start, end, *a, **k):   # both ends inclusive, as the bar store and Alpaca
+        return {s: frames[s].loc[to_market_ts(start):to_market_ts(end)] for s in syms}
+    monkeypatch.setattr(eng, "download_ohlc_many", fake)
+    monkeypatch.setattr(chunked, "download_ohlc_many", fake)
+    cfg = load_config("config.yaml")
+    cfg.backtest.result_cache_dir = ""
+    cfg.general.bar_timeframe = timeframe
+    cfg.strategy.adx_min, cfg.strategy.ema_slope_bps = 10, 0
+    if timeframe == "1d":
+        cfg.strategy.htf_align_required = False
+    args = (list(frames), *span)
+    eq, tl, per = eng.BacktestEngine(cfg, None).run(*args)
+    cfg.backtest.chunk_days = chunk_days
+    ceq, ctl, cper = eng.BacktestEngine(cfg, None).run(*args)
+    assert len(tl) > 10
+    pd.testing.assert_frame_equal(ctl, tl)
+    pd.testing.assert_index_equal(ceq.index, eq.index, check_names=False)
+    np.testing.assert_allclose(ceq.to_numpy(), eq.to_numpy(), rtol=1e-13)
+    assert list(cper) == list(per)
+    for sym in per:
+        for m, v in per[sym].items():
+            assert cper[sym][m] == pytest.approx(v, rel=1e-9, abs=1e-12), (sym, m)
+
+def test_equity_stats_in_pieces():
+    eq = pd.Series(np.cumprod(1 + np.random.default_rng(0).normal(0, 1e-3, 500)))
+    st = EquityStats()
+    for part in np.array_split(eq.to_numpy(), 7):
+        st.update_many(part)
+    assert st.sharpe == pytest.approx(eng._sharpe_from_equity(eq), rel=1e-10)
+    assert st.maxdd == pytest.approx(eng._max_drawdown(eq), rel=1e-12)
+
+@pytest.mark.skipif(not HAVE_PARQUET, reason="pyarrow not installed")
+def test_chunks_do_not_pile_up_in_the_bar_store(tmp_path, monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.data.store_dir = str(tmp_path)
+    cfg.backtest.result_cache_dir = ""
+    cfg.strategy.adx_min, cfg.strategy.ema_slope_bps = 10, 0
+    frames = _frames()
+    store = data._store_for(cfg)
+    for s, df in frames.items():
+        store.write(s, "15m", df, "2023-12-01", "2024-06-01")
+    monkeypatch.setattr(data, "_download_many", lambda *a, **k: pytest.fail("store covers the span"))
+    resident, chunk_rows = [], []
+    real = chunked.download_ohlc_many
+    def spy(*a, **k):
+        out = real(*a, **k)
+        chunk_rows.append(sum(len(df) for df in out.values()))
+        resident.append(sum(len(f) for f, _ in store._mem.values()))
+        return out
+    monkeypatch.setattr(chunked, "download_ohlc_many", spy)
+    _, tl, _ = chunked.run_chunked(cfg, list(frames), "2024-02-01", "2024-04-20", "2024-01-02", 9)
+    assert len(chunk_rows) > 5 and len(tl) > 0
+    assert max(resident) <= max(chunk_rows)
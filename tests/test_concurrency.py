@@ -0,0 +1,21 @@
+import time
+from src.concurrency import TokenBucket, map_ordered
+
+def test_map_ordered_keeps_order_and_isolates_errors():
+    def work(x):
+        if x == 3:
+            raise ValueError("boom")
+        time.sleep(0.01 * (5 - x))  # later items finish first
+        return x * 10
+
+    out = map_ordered(work, range(5), workers=4)
+    assert [it for it, _, _ in out] == [0, 1, 2, 3, 4]
+    assert [res for _, res, err in out if err is None] == [0, 10, 20, 40]
+    assert isinstance(out[3][2], ValueError)
+
+def test_token_bucket_throttles_after_burst():
+    bucket = TokenBucket(rate_per_min=600, burst=2)   # 10 tokens/sec
+    t0 = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    assert time.monotonic() - t0 >= 0.15
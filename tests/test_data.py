@@ -0,0 +1,76 @@
+import threading
+import time
+import types
+import pandas as pd
+import src.data as data
+from src.config import load_config
+from src.data import _raw_bars_to_frame
+
+def test_raw_bars_decode_columnar():
+    rows = [
+        {"t": "2024-01-02T14:45:00Z", "o": 2.0, "h": 2.5, "l": 1.5, "c": 2.2, "v": 300, "n": 3, "vw": 2.1},
+        {"t": "2024-01-02T14:30:00Z", "o": 1.0, "h": 1.5, "l": 0.5, "c": 1.2, "v": 100, "n": 1, "vw": 1.1},
+    ]
+    df = _raw_bars_to_frame(rows)
+    assert list(df.columns) == ["open", "high", "low", "close", "volume"]
+    assert str(df.index.tz) == "America/New_York"
+    assert df.index[0] == pd.Timestamp("2024-01-02 09:30", tz="America/New_York")   # sorted
+    assert df["volume"].tolist() == [100.0, 300.0]
+    assert _raw_bars_to_frame([]).empty
+
+def _yahoo_cfg():
+    cfg = load_config("config.yaml")
+    cfg.data.provider = "yahoo"
+    cfg.data.yahoo_rate_limit_per_min = 0
+    return cfg
+
+def test_download_many_keeps_empty_successes_only(monkeypatch):
+    bars = pd.DataFrame({"Open": [1.0], "High": [1.0], "Low": [1.0], "Close": [1.0], "Volume": [1.0]},
+                        index=pd.DatetimeIndex(["2024-01-02 09:30"]))
+
+    def download(symbol, **kw):
+        if symbol == "ERR":
+            raise ConnectionError("boom")
+        return bars if symbol == "OK" else pd.DataFrame()
+
+    monkeypatch.setattr(data, "HAVE_YF", True)
+    monkeypatch.setattr(data, "yf", types.SimpleNamespace(download=download), raising=False)
+    got = data._download_many([(["OK", "EMPTY", "ERR"], "2024-01-02")], "2024-01-03", "15m", "yahoo", None, _yahoo_cfg())
+    assert sorted(got) == ["EMPTY", "OK"]
+    assert got["EMPTY"][1].empty and list(got["OK"][1].columns) == ["open", "high", "low", "close", "volume"]
+
+def test_yahoo_fallback_survives_shared_state(monkeypatch):
+    state = {"dfs": {}, "active": 0, "peak": 0}
+    lock = threading.Lock()
+
+    def download(symbol, **kw):   # like yfinance 0.2.x: resets and reads module-global results
+        with lock:
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+        state["dfs"] = {}
+        time.sleep(0.005)
+        state["dfs"][symbol] = pd.DataFrame({"Close": [float(len(symbol))]}, index=pd.DatetimeIndex(["2024-01-02 09:30"]))
+        time.sleep(0.005)
+        out = state["dfs"].get(symbol, pd.DataFrame())
+        with lock:
+            state["active"] -= 1
+        return out
+
+    monkeypatch.setattr(data, "HAVE_YF", True)
+    monkeypatch.setattr(data, "yf", types.SimpleNamespace(download=download), raising=False)
+    cfg = _yahoo_cfg()
+    cfg.data.fetch_workers = 8
+    syms = [f"S{'X' * k}" for k in range(12)]
+    results = {}
+
+    def fetch(group):   # two callers at once, e.g. the live loop and a backtest
+        results.update(data._download_many([(group, "2024-01-02")], "2024-01-03", "15m", "yahoo", None, cfg))
+
+    threads = [threading.Thread(target=fetch, args=(syms[i::2],)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(results) == sorted(syms)
+    assert all(results[s][1]["close"].iloc[0] == len(s) for s in syms)
+    assert state["peak"] == 1
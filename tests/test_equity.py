@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.equity import SparseEquity, portfolio_mean
+from src.backtest.metrics import EquityStats
+
+def _curve(n, seed, start="2024-01-02 09:30"):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range(start, periods=n, freq="15min", tz="America/New_York", name="timestamp")
+    steps = np.where(rng.random(n) < 0.02, 1 + rng.normal(0, 0.01, n), 1.0)
+    steps[0] = 1.0
+    return pd.Series(np.cumprod(steps), index=idx)
+
+def test_change_points_round_trip():
+    eq = _curve(3000, 0)
+    sp = SparseEquity.from_series(eq)
+    assert sp.n == len(eq) and len(sp.ts) < len(eq) / 10
+    pd.testing.assert_series_equal(sp.densify(eq.index), eq, check_exact=True, check_freq=False, check_names=False)
+    back = SparseEquity.from_frame(sp.to_frame())
+    assert back.n == sp.n and np.array_equal(back.ts, sp.ts) and np.array_equal(back.values, sp.values)
+
+def test_stats_match_dense_curve():
+    eq = _curve(3000, 1)
+    dense = EquityStats(6552)
+    dense.update_many(eq.to_numpy())
+    sparse = SparseEquity.from_series(eq).stats(6552)
+    assert sparse.n == dense.n and sparse.maxdd == dense.maxdd and sparse.last == dense.last
+    assert sparse.sharpe == pytest.approx(dense.sharpe, rel=1e-9)
+    assert sparse.calmar == pytest.approx(dense.calmar, rel=1e-12)
+
+def test_portfolio_mean_matches_ffill_mean():
+    curves = [_curve(800, 2), _curve(500, 3, "2024-01-05 09:30"), _curve(300, 4, "2024-01-03 11:00")]
+    ref = pd.concat(curves, axis=1).ffill().fillna(1.0).mean(axis=1)
+    out = portfolio_mean([SparseEquity.from_series(c) for c in curves], ref.index)
+    np.testing.assert_allclose(out.to_numpy(), ref.to_numpy(), rtol=1e-13)
+    assert out.index.equals(ref.index)
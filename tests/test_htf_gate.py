@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+from src.config import load_config
+from src.regime import align_htf, compute_htf_regime, htf_regime_gate
+from src.resample import bar_ends, resample_session
+from src.strategy import Signal
+from conftest import bar_index, ohlcv
+
+def _bars(sessions=40, seed=3):
+    return ohlcv(bar_index(sessions=sessions, start="2024-03-01"), seed, drift=2e-4, wick=2e-3, fixed_wick=True, drop=0.05)
+
+def test_bar_ends_cut_at_session_close():
+    idx = pd.DatetimeIndex(["2024-03-01 09:30", "2024-03-01 15:30", "2024-03-01 15:45"]).tz_localize("America/New_York")
+    ends = pd.DatetimeIndex(bar_ends(idx, "60m")).tz_localize("UTC").tz_convert("America/New_York")
+    assert [t.strftime("%H:%M") for t in ends] == ["10:30", "16:00", "16:00"]
+    assert bar_ends(idx, "1d")[0] == bar_ends(idx, "60m")[1]
+
+def test_gate_uses_only_closed_htf_bars():
+    cfg = load_config("config.yaml")
+    cfg.regime.trend_adx_min, cfg.regime.chop_adx_max = 15, 10
+    df = _bars()
+    gate = htf_regime_gate(cfg, df)
+    assert 0 < gate.mean() < 1
+    # what the live cycle would see after bar i closes: closed HTF bars from the bars so far
+    for i in np.random.default_rng(0).choice(len(df), 60, replace=False):
+        htf = resample_session(df.iloc[: i + 1], "15m", "60m")
+        trend, chop = compute_htf_regime(htf, 15, 10)
+        live = bool(trend.iloc[-1] and not chop.iloc[-1]) if len(htf) else False
+        assert gate[i] == live, i
+
+def test_align_htf_masks_longs_only_when_required():
+    cfg = load_config("config.yaml")
+    df = _bars()
+    sig = pd.Series(Signal.LONG, index=df.index)
+    gated = align_htf(cfg, df, sig)
+    assert (gated == Signal.LONG).sum() == htf_regime_gate(cfg, df).sum()
+    cfg.strategy.htf_align_required = False
+    assert align_htf(cfg, df, sig) is sig
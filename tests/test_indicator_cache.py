@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+from src import indicators
+from src.config import load_config
+from src.indicator_cache import IndicatorCache, get_cache
+from src.risk import position_size
+from src.strategy import compute_signals
+
+def _bars(n=400, sym="AAA", seed=1):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="15min", tz="America/New_York")
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    df = pd.DataFrame({"open": c, "high": c * 1.002, "low": c * 0.998, "close": c, "volume": 1e6}, index=idx)
+    df.attrs.update(symbol=sym, timeframe="15m")
+    return df
+
+def test_shared_entries_across_strategy_and_risk():
+    cfg = load_config("config.yaml")
+    cache = get_cache()
+    cache.clear()
+    df = _bars()
+    before = cache.stats()
+    compute_signals(df, cfg)
+    position_size(cfg, df, float(df["close"].iloc[-1]), 100_000)  # ATR(14) rides on the ADX(14) entry
+    compute_signals(df, cfg)
+    s = cache.stats()
+    assert s["misses"] - before["misses"] == 4  # ema fast, ema slow, dmi, rsi
+    assert s["hits"] - before["hits"] == 5
+
+def test_key_tracks_new_and_revised_bars():
+    cache = IndicatorCache(max_mb=8)
+    df = _bars()
+    calls = []
+    f = lambda d: cache.get(d, "atr", (14,), lambda: calls.append(1) or indicators.atr(d, 14))
+    f(df); f(df)
+    revised = df.copy()
+    revised.iloc[-1, revised.columns.get_loc("close")] *= 1.01
+    pd.testing.assert_series_equal(f(revised), indicators.atr(revised, 14))
+    f(df.iloc[:-1])
+    untagged = pd.DataFrame(df)
+    untagged.attrs = {}
+    f(untagged)
+    assert len(calls) == 4 and cache.hits == 1
+
+def test_lru_evicts_under_budget():
+    cache = IndicatorCache(max_mb=0.05)  # ~52 KB; each 400-bar series is ~6.4 KB
+    for k in range(20):
+        cache.get(_bars(sym=f"S{k}"), "atr", (14,), lambda: indicators.atr(_bars(), 14))
+    s = cache.stats()
+    assert s["evictions"] > 0 and s["bytes"] <= cache.max_bytes
+    first = _bars(sym="S0")
+    cache.get(first, "atr", (14,), lambda: indicators.atr(first, 14))
+    assert cache.stats()["misses"] == 21
@@ -0,0 +1,64 @@
+import json
+import threading
+import numpy as np
+import pytest
+from src.instrument import NET, CycleMetrics, Histogram, MetricsFile, NetCounters, histogram, watch_session
+
+def test_histogram_percentiles_within_a_bucket():
+    vals = np.random.default_rng(0).lognormal(np.log(0.02), 1.0, 20_000)
+    h = Histogram()
+    for v in vals:
+        h.record(float(v))
+    for p in (50, 95, 99):
+        assert h.percentile(p) == pytest.approx(np.percentile(vals, p), rel=0.1)
+    assert h.percentile(100) == vals.max() and h.n == len(vals)
+    assert np.isnan(Histogram().percentile(50))
+
+def test_net_counters_are_thread_safe():
+    net = NetCounters()
+    snap = net.snapshot()
+    threads = [threading.Thread(target=lambda: [net.record("alpaca", 10) for _ in range(1000)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert net.since(snap) == {"alpaca": {"calls": 8000, "bytes": 80_000}}
+
+def test_watch_session_counts_responses_once():
+    class Resp:
+        def __init__(self, headers, content=b""):
+            self.headers, self.content = headers, content
+
+    class Session:
+        hooks = {"response": []}
+
+    s = Session()
+    watch_session(s, "unit")
+    watch_session(s, "unit")
+    snap = NET.snapshot()
+    for hook in s.hooks["response"]:
+        hook(Resp({"Content-Length": "120"}))
+        hook(Resp({}, b"x" * 7))
+    assert NET.since(snap) == {"unit": {"calls": 2, "bytes": 127}}
+
+def test_cycle_metrics_and_file(tmp_path):
+    m = CycleMetrics(top_symbols=2)
+    n0 = histogram("stage.fetch").n
+    with m.stage("fetch"):
+        pass
+    for sym in ("A", "B", "C"):
+        with m.stage("signals"), m.symbol(sym):
+            sum(range(1000 if sym == "B" else 10))
+    m.latency("bar_close_to_submit", 1.5)
+    rec = m.finish(df_cache_mb=1.0)
+    assert set(rec["stages_ms"]) == {"fetch", "signals"} and histogram("stage.fetch").n == n0 + 1
+    assert list(rec["slowest_symbols_ms"])[0] == "B" and len(rec["slowest_symbols_ms"]) == 2
+    assert rec["bar_close_to_submit_ms"] == [1500.0] and rec["df_cache_mb"] == 1.0
+    assert rec["peak_rss_mb"] is None or rec["peak_rss_mb"] > 0
+
+    path = tmp_path / "m" / "cycle.jsonl"
+    f = MetricsFile(str(path), max_mb=200 / 2**20, backups=1)
+    for _ in range(5):
+        f.write(rec)
+    assert json.loads(path.read_text().splitlines()[-1])["stages_ms"] == rec["stages_ms"]
+    assert (tmp_path / "m" / "cycle.jsonl.1").exists()   # rotated
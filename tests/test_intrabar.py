@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.backtest.engine import BacktestEngine
+from src.backtest.intrabar import IntrabarResolver
+from src.config import load_config
+from src.indicators import atr
+from src.resample import resample_session
+from src.strategy import Signal
+from conftest import bar_index, legacy_simulate, ohlcv
+
+def _minute_bars(sessions=15, seed=2):
+    idx = bar_index(sessions=sessions, start="2024-04-01", freq="1min")
+    return ohlcv(idx, seed, vol=1.5e-3, wick=5e-4, fixed_wick=True, volume=1e4)
+
+def test_ambiguous_bars_settled_from_finer_bars_only():
+    cfg = load_config("config.yaml")
+    cfg.backtest.intrabar_timeframe = "1m"
+    cfg.risk.atr_k_stop, cfg.risk.take_profit_R = 0.4, 0.5   # tight brackets: many bars touch both
+    m1 = _minute_bars()
+    df = resample_session(m1, "1m", "15m")
+    sig = pd.Series(np.where(np.random.default_rng(0).random(len(df)) < 0.3, Signal.LONG, Signal.NONE), index=df.index)
+    calls = []
+    def fetch(sym, start, end):
+        calls.append(start)
+        return m1[(m1.index >= pd.Timestamp(start, tz="America/New_York")) & (m1.index < pd.Timestamp(end, tz="America/New_York"))]
+    engine = BacktestEngine(cfg, None)
+    engine.intrabar = IntrabarResolver(cfg, fetch)
+    _, tl = engine.simulate_symbol("SYN", "2024-04-01", "2024-05-01", df=df, sig=sig)
+    _, ref = legacy_simulate(df, sig, atr(df, 14).bfill().ffill(), cfg, fine=m1)   # every bar touching both levels settled on 1m
+    pd.testing.assert_frame_equal(tl, ref)
+    st = engine.intrabar.stats()
+    assert st["stop_first"] > 0 and st["resolved"] > st["stop_first"]
+    assert len(calls) == len(set(calls)) == st["fetches"] < 15   # one fetch per session with an ambiguous bar
+
+    cfg.backtest.intrabar_timeframe = ""
+    _, legacy = BacktestEngine(cfg, None).simulate_symbol("SYN", "2024-04-01", "2024-05-01", df=df, sig=sig)
+    assert (legacy["R"] > 0).sum() > (tl["R"] > 0).sum()   # TP-first flattered the hit rate
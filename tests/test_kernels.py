@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src import indicators, kernels
+
+JIT = [False] + ([True] if kernels.HAVE_NUMBA else [])
+
+# Reference copies of the original pandas implementations
+def _ref_true_range(df):
+    prev_close = df["close"].shift(1)
+    return pd.concat([df["high"]-df["low"], (df["high"]-prev_close).abs(), (df["low"]-prev_close).abs()], axis=1).max(axis=1)
+
+def _ref_adx(df, length=14):
+    up_move = df["high"].diff()
+    down_move = -df["low"].diff()
+    plus_dm = np.where((up_move > down_move) & (up_move > 0), up_move, 0.0)
+    minus_dm = np.where((down_move > up_move) & (down_move > 0), down_move, 0.0)
+    atr_n = _ref_true_range(df).rolling(length).mean()
+    plus_di = 100 * pd.Series(plus_dm, index=df.index).rolling(length).sum() / atr_n
+    minus_di = 100 * pd.Series(minus_dm, index=df.index).rolling(length).sum() / atr_n
+    dx = ((plus_di - minus_di).abs() / (plus_di + minus_di).replace(0, np.nan)) * 100
+    return atr_n, dx.rolling(length).mean(), plus_di, minus_di
+
+def _bars(n=3000, seed=3):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 3e-3, n)))
+    c[200:230] = c[199]  # flat stretch: zero TR / DM windows
+    return pd.DataFrame({"high": c * (1 + rng.uniform(0, 3e-3, n)), "low": c * (1 - rng.uniform(0, 3e-3, n)), "close": c})
+
+def _check(got, ref, jit):
+    np.testing.assert_array_equal(got, ref)   # both paths reproduce pandas' rolling sums exactly
+
+@pytest.mark.parametrize("jit", JIT)
+def test_dmi_matches_pandas(jit):
+    df = _bars()
+    h, lo, c = (df[k].to_numpy() for k in ("high", "low", "close"))
+    tr, atr_n, pdi, mdi, adx_val = kernels.dmi(h, lo, c, 14, jit=jit)
+    r_atr, r_adx, r_pdi, r_mdi = _ref_adx(df)
+    np.testing.assert_array_equal(tr, _ref_true_range(df).to_numpy())
+    for got, ref in ((atr_n, r_atr), (pdi, r_pdi), (mdi, r_mdi), (adx_val, r_adx)):
+        _check(got, ref.to_numpy(), jit)
+    _check(kernels.atr(h, lo, c, 14, jit=jit), r_atr.to_numpy(), jit)
+
+@pytest.mark.parametrize("jit", JIT)
+def test_panel_rows_match_single_rows(jit):
+    df = _bars(500)
+    h, lo, c = (np.vstack([df[k].to_numpy()] * 3) for k in ("high", "low", "close"))
+    outs = kernels.dmi(h, lo, c, 10, jit=jit)
+    single = kernels.dmi(h[0], lo[0], c[0], 10, jit=jit)
+    for o, s in zip(outs, single):
+        assert o.shape == (3, 500)
+        np.testing.assert_array_equal(o[2], s)
+    assert np.allclose(kernels.ema(c, 9, jit=jit)[1], df["close"].ewm(span=9, adjust=False).mean(), rtol=1e-12)
+
+def test_indicator_wrappers_keep_series_types():
+    df = _bars(300)
+    df.index = pd.date_range("2024-01-02 09:30", periods=len(df), freq="15min", tz="America/New_York")
+    a, p, m = indicators.adx(df, 14)
+    r_atr, r_adx, r_pdi, r_mdi = _ref_adx(df)
+    for got, ref in ((a, r_adx), (p, r_pdi), (m, r_mdi)):
+        assert isinstance(got, pd.Series) and got.index.equals(df.index)
+        np.testing.assert_allclose(got, ref.fillna(0), rtol=1e-10, atol=1e-10)
+    assert indicators.atr(df, 14).index.equals(df.index)
+    assert not indicators.adx(df.iloc[0:0], 14)[0].size
+
+def test_fallback_matches_pandas_exactly(monkeypatch):
+    monkeypatch.setattr(kernels, "HAVE_NUMBA", False)   # as on an install without numba
+    df = _bars()
+    r_atr, r_adx, r_pdi, r_mdi = _ref_adx(df)
+    a, p, m = indicators.adx(df, 14)
+    for got, ref in ((a, r_adx), (p, r_pdi), (m, r_mdi)):
+        np.testing.assert_array_equal(got.to_numpy(), ref.fillna(0).to_numpy())
+    np.testing.assert_array_equal(indicators.atr(df, 14).to_numpy(), r_atr.to_numpy())
+    np.testing.assert_array_equal(kernels.rsi(df["close"].to_numpy(), 14), indicators.rsi(df["close"], 14).to_numpy())
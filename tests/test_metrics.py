@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.metrics import EquityStats, TradeStats, bars_per_year, calmar, summarize_metrics
+
+def _equity(n=2000, seed=0):
+    return pd.Series(np.cumprod(1 + np.random.default_rng(seed).normal(2e-4, 2e-3, n)))
+
+def test_bars_per_year_follows_timeframe():
+    assert bars_per_year("15m") == 26 * 252
+    assert bars_per_year("1m") == 390 * 252
+    assert bars_per_year("1d") == 252
+    assert bars_per_year("15m", rth_only=False) == 64 * 252
+
+def test_per_bar_and_block_updates_agree_with_pandas():
+    eq = _equity()
+    one, blocks = EquityStats(bars_per_year("5m")), EquityStats(bars_per_year("5m"))
+    for v in eq:
+        one.update(v)
+    for part in np.array_split(eq.to_numpy(), 9):
+        blocks.update_many(part)
+    rets = eq.pct_change().dropna()
+    ref = rets.mean() / rets.std() * np.sqrt(78 * 252)
+    assert one.sharpe == pytest.approx(ref, rel=1e-9)
+    assert blocks.sharpe == pytest.approx(ref, rel=1e-9)
+    dd = float((eq / eq.cummax() - 1).min())
+    assert one.maxdd == blocks.maxdd == pytest.approx(dd, rel=1e-12)
+    years = (len(eq) - 1) / (78 * 252)
+    assert one.calmar == pytest.approx(((eq.iloc[-1] / eq.iloc[0]) ** (1 / years) - 1) / abs(dd), rel=1e-9)
+    assert calmar(eq, 78 * 252) == pytest.approx(one.calmar, rel=1e-12)
+
+def test_trade_stats():
+    tr = TradeStats()
+    for r in (1.3, -1.0, 1.3, 0.0, -1.0):
+        tr.update(r)
+    assert tr.n == 5 and tr.hitrate == pytest.approx(0.4) and tr.profit_factor == pytest.approx(1.3)
+    tr = TradeStats()
+    tr.update_many([0.5, 1.0])
+    assert tr.profit_factor == 1.5   # no losers: gross win, as the engine reported
+
+def test_summarize_metrics_report():
+    eq = _equity(300)
+    out = summarize_metrics(eq, pd.DataFrame({"R": [1.3, -1.0, 1.3]}))
+    assert "Bars: 300" in out and "Trades: 3" in out and "HitRate: 66.67%" in out
+    assert summarize_metrics(pd.Series(dtype=float), pd.DataFrame()) == "No results.\n"
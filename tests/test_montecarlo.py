@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.engine import _max_drawdown
+from src.backtest.montecarlo import equity_paths, max_drawdowns, monte_carlo, portfolio_returns, sample_indices
+
+def _log(n=200, seed=1):
+    r = np.where(np.random.default_rng(seed).random(n) < 0.45, 1.3, -1.0)
+    return pd.DataFrame({"side": "long", "R": r})
+
+def test_paths_match_engine_compounding():
+    r = _log(50)["R"].to_numpy()
+    eq = equity_paths(r[None, :])[0]
+    ref = np.cumprod(np.r_[1.0, 1 + r * 0.01])
+    np.testing.assert_allclose(eq, ref, rtol=1e-14)
+    assert max_drawdowns(eq[None, :])[0] == pytest.approx(_max_drawdown(pd.Series(eq)), rel=1e-12)
+
+def test_samplers():
+    rng = np.random.default_rng(0)
+    perm = sample_indices(30, 100, "shuffle", rng)
+    assert (np.sort(perm, axis=1) == np.arange(30)).all()
+    blk = sample_indices(30, 100, "block", rng, block=6)
+    assert blk.shape == (100, 30)
+    # within each block the indices run consecutively (mod n)
+    steps = (np.diff(blk.reshape(100, 5, 6), axis=2) % 30)
+    assert (steps == 1).all()
+    with pytest.raises(ValueError):
+        sample_indices(30, 1, "nope", rng)
+
+def test_monte_carlo_bands():
+    log = _log()
+    res = monte_carlo(log, n_paths=5000, method="iid", trades_per_year=250, max_cells=100_000)
+    assert len(res.final_equity) == len(res.max_drawdown) == len(res.sharpe) == 5000
+    b = res.bands()
+    assert list(b.index) == ["final_equity", "max_drawdown", "sharpe"]
+    assert (b["p5"] <= b["p50"]).all() and (b["p50"] <= b["p95"]).all()
+    assert b.loc["final_equity", "p5"] < res.actual["final_equity"] < b.loc["final_equity", "p95"]
+    # same seed, same paths; shuffling only reorders, so final equity is fixed
+    np.testing.assert_array_equal(monte_carlo(log, 5000, trades_per_year=250).final_equity, res.final_equity)
+    sh = monte_carlo(log, 500, method="shuffle")
+    np.testing.assert_allclose(sh.final_equity, res.actual["final_equity"], rtol=1e-12)
+    assert sh.max_drawdown.std() > 0
+
+def test_no_paths_gives_nan_bands():
+    for res in (monte_carlo(pd.DataFrame(), 100), monte_carlo(_log(), n_paths=0), monte_carlo(_log(), n_paths=-3)):
+        assert len(res.final_equity) == len(res.max_drawdown) == len(res.sharpe) == 0
+        b = res.bands()
+        assert list(b.index) == ["final_equity", "max_drawdown", "sharpe"]
+        assert b.drop(columns="actual").isna().all().all()
+        assert b["actual"].notna().all()
+    assert monte_carlo(_log(), n_paths=0).actual == monte_carlo(_log(), n_paths=10).actual
+
+def test_portfolio_returns_compound_to_realized_equity():
+    ts = pd.date_range("2024-01-02 10:00", periods=6, freq="h", tz="America/New_York")
+    tl = pd.DataFrame({"symbol": list("ABABCA"), "exit_ts": ts[[3, 0, 5, 1, 4, 2]],
+                       "pnl": [500.0, -200.0, 1200.0, 300.0, -800.0, 50.0], "R": [1.0, -1.0, 2.0, 0.5, -1.0, 0.1]})
+    out = portfolio_returns(tl, 100_000.0)
+    assert out["exit_ts"].is_monotonic_increasing and out["pnl"].tolist() == [-200.0, 300.0, 50.0, 500.0, -800.0, 1200.0]
+    assert out["ret"].iloc[1] == 300.0 / 99_800.0
+    res = monte_carlo(out, 200, column="ret", risk_per_r=1.0)
+    assert res.actual["final_equity"] == pytest.approx(1 + tl["pnl"].sum() / 100_000.0, rel=1e-14)
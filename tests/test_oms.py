@@ -0,0 +1,56 @@
+import pandas as pd
+import src.oms as oms
+from src.config import load_config
+from src.risk import TradePlan
+from conftest import ohlcv
+
+class FakeBroker:
+    def __init__(self):
+        self.orders = []
+
+    def lockout_today(self):
+        return False
+
+    def account_equity(self):
+        return 100_000.0
+
+    def positions(self):
+        return {}
+
+    def submit_bracket(self, **kw):
+        self.orders.append(kw)
+
+class Logs:
+    def __init__(self):
+        self.records = []
+
+    def info(self, rec):
+        self.records.append(rec)
+
+    error = info
+
+def test_cycle_fetches_up_to_now_and_times_broker_calls_apart(monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.perf.metrics_file = ""
+    monkeypatch.setattr(oms, "AlpacaBroker", FakeBroker)
+    now = pd.Timestamp.now(tz="America/New_York")
+    # 15m bars up to the one forming now, 24h a day so the test runs at any hour
+    idx = pd.date_range(end=now.floor("15min"), periods=600, freq="15min", name="timestamp")
+    frames = {s: ohlcv(idx, k) for k, s in enumerate(("AAA", "BBB"))}
+    ends = []
+    def fetch_many(self, syms, start, end, interval):
+        ends.append(end)
+        return {s: frames[s].loc[:end] for s in syms}
+    monkeypatch.setattr(oms.OMS, "_fetch_many", fetch_many)
+    monkeypatch.setattr(oms.OMS, "_latest_longs", lambda self, syms, frames, m: {s: True for s in syms})
+    monkeypatch.setattr(oms, "position_size", lambda cfg, df, px, eq: TradePlan(10, px * 0.98, px * 1.04, 0, 0, 0))
+    cfg.strategy.htf_align_required = False
+    logs = Logs()
+    o = oms.OMS(cfg, logs)
+    o.trade_cycle(tickers_override=list(frames))
+    assert len(o.broker.orders) == 2
+    assert all(now <= e <= pd.Timestamp.now(tz="America/New_York") for e in ends)
+    metrics = next(r for r in logs.records if r.get("event") == "cycle_summary")["metrics"]
+    assert {"broker_account", "broker_positions"} <= set(metrics["stages_ms"]) and "broker" not in metrics["stages_ms"]
+    lat = metrics["bar_close_to_submit_ms"]
+    assert len(lat) == 2 and all(0 <= ms < 15 * 60 * 1e3 for ms in lat)   # from the newest closed bar
@@ -0,0 +1,37 @@
+import numpy as np
+import pandas as pd
+from src.config import load_config
+from src.panel import build_panel, compute_panel_signals
+from src.strategy import compute_signals, Signal
+
+def _frames(n_syms=6, n=1200, seed=7):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="15min", tz="America/New_York")
+    out = {}
+    for k in range(n_syms):
+        c = 100 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+        df = pd.DataFrame(
+            {"open": c, "high": c * (1 + rng.uniform(0, 2e-3, n)), "low": c * (1 - rng.uniform(0, 2e-3, n)),
+             "close": c, "volume": 1e6},
+            index=idx,
+        )
+        # ragged starts and missing bars
+        out[f"S{k}"] = df[rng.random(n) > 0.05].iloc[k * 20:]
+    return out
+
+def test_panel_matches_compute_signals_per_symbol():
+    cfg = load_config("config.yaml")
+    cfg.strategy.adx_min, cfg.strategy.ema_slope_bps = 10, 0
+    frames = _frames()
+    ps = compute_panel_signals(build_panel(frames), cfg)
+    for sym, df in frames.items():
+        ref = compute_signals(df, cfg)
+        pd.testing.assert_series_equal(ps.signal_series(sym), ref, check_names=False, check_freq=False)
+    latest = ps.latest_long()
+    assert latest == {s: compute_signals(df, cfg).iloc[-1] == Signal.LONG for s, df in frames.items()}
+
+def test_build_panel_masks_missing_bars():
+    frames = _frames(n_syms=2, n=50)
+    p = build_panel(frames)
+    assert p.close.shape == (2, len(p.index))
+    assert p.valid.sum(axis=1).tolist() == [len(frames["S0"]), len(frames["S1"])]
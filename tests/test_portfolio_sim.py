@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+from src.backtest.engine import BacktestEngine
+from src.backtest.portfolio_sim import merged_timeline, simulate_portfolio
+from src.config import load_config
+from src.portfolio import enforce_portfolio_limits
+from src.strategy import Signal
+from conftest import bar_index, ohlcv
+
+def _bars(seed, n=1500):
+    return ohlcv(bar_index(n, hours="24h"), seed, drop=0.05)
+
+def _setup(n_syms=4):
+    cfg = load_config("config.yaml")
+    frames = {f"S{k}": _bars(k) for k in range(n_syms)}
+    sigs = {s: pd.Series(np.where(np.random.default_rng(k + 50).random(len(df)) < 0.2, Signal.LONG, Signal.NONE), index=df.index)
+            for k, (s, df) in enumerate(frames.items())}
+    return cfg, frames, sigs
+
+def test_merged_timeline_orders_by_time_then_symbol():
+    ts, sym, bar = merged_timeline([np.array([1, 3, 5]), np.array([1, 2, 5, 6])])
+    assert ts.tolist() == [1, 1, 2, 3, 5, 5, 6]
+    assert sym.tolist() == [0, 1, 1, 0, 0, 1, 1]
+    assert bar.tolist() == [0, 0, 1, 1, 2, 2, 3]
+
+def test_unconstrained_portfolio_takes_every_independent_trade():
+    cfg, frames, sigs = _setup()
+    r = cfg.risk
+    r.max_net_exposure_pct, r.max_position_pct, r.max_concurrent_positions = 1e9, 1e9, 1000
+    r.symbol_cooloff_min, r.spread_bps_max, r.account_risk_per_trade = 0, 1e9, 1e-4
+    eq, tl, per = simulate_portfolio(cfg, frames, "2024-01-02", sigs)
+    engine = BacktestEngine(cfg, None)
+    for s, df in frames.items():
+        _, ref = engine.simulate_symbol(s, "2024-01-02", "2025-01-01", df=df, sig=sigs[s])
+        got = tl[tl["symbol"] == s].reset_index(drop=True)
+        assert len(ref) > 10
+        pd.testing.assert_frame_equal(got[["side", "entry", "exit", "R"]], ref)
+        assert per[s]["trades"] == len(ref)
+    assert eq.index.is_monotonic_increasing and eq.iloc[0] == 1.0
+    assert len(eq) == len(pd.concat([df.index.to_series() for df in frames.values()]).unique())
+
+def test_limits_cap_open_positions_and_cooloff():
+    cfg, frames, sigs = _setup(6)
+    r = cfg.risk
+    r.max_net_exposure_pct, r.max_position_pct, r.spread_bps_max = 1e9, 1e9, 1e9
+    r.max_concurrent_positions, r.symbol_cooloff_min = 2, 120
+    _, tl, _ = simulate_portfolio(cfg, frames, "2024-01-02", sigs)
+    assert len(tl) > 10
+    events = pd.concat([pd.Series(1, index=tl["entry_ts"]), pd.Series(-1, index=tl["exit_ts"])]).sort_index(kind="stable")
+    # exits at a timestamp are processed before entries
+    events = events.groupby(level=0).apply(lambda x: x.sort_values()).droplevel(0)
+    assert events.cumsum().max() <= 2
+    gaps = tl.sort_values("entry_ts").groupby("symbol")["entry_ts"].diff().dropna()
+    assert (gaps > pd.Timedelta(minutes=120)).all()
+
+def test_enforce_portfolio_limits_concurrency():
+    cfg = load_config("config.yaml")
+    cfg.risk.max_concurrent_positions = 2
+    cfg.risk.max_net_exposure_pct = 10.0
+    assert enforce_portfolio_limits(cfg, {"A": 1000.0}, ["A", "B", "C"], 100_000) == ["A", "B"]
+    assert enforce_portfolio_limits(cfg, {"A": 1000.0, "B": 1000.0}, ["C"], 100_000) == []
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from src.resample import HTFResampler, can_resample, resample_session
+
+def _session_bars(days=3):
+    sessions = pd.bdate_range("2024-03-04", periods=days)
+    idx = pd.DatetimeIndex(
+        [d + pd.Timedelta(hours=h, minutes=m) for d in sessions for h in range(4, 20) for m in (0, 15, 30, 45)]
+    ).tz_localize("America/New_York")
+    c = 100 + np.cumsum(np.random.default_rng(0).normal(0, 0.1, len(idx)))
+    return pd.DataFrame({"open": c, "high": c + 0.1, "low": c - 0.1, "close": c, "volume": 1.0}, index=idx)
+
+def test_hourly_bins_anchor_on_rth_open():
+    out = resample_session(_session_bars(1), "15m", "60m")
+    assert [t.strftime("%H:%M") for t in out.index] == ["09:30", "10:30", "11:30", "12:30", "13:30", "14:30", "15:30"]
+    assert out["volume"].tolist() == [4, 4, 4, 4, 4, 4, 2]   # short session-end bin
+
+def test_partial_htf_bar_dropped():
+    df = _session_bars(1)
+    df = df[df.index < pd.Timestamp("2024-03-04 11:00", tz="America/New_York")]
+    out = resample_session(df, "15m", "60m")
+    assert out.index[-1] == pd.Timestamp("2024-03-04 09:30", tz="America/New_York")
+
+def test_daily_bar_aggregates_session():
+    df = _session_bars(2)
+    out = resample_session(df, "15m", "1d")
+    rth = df.between_time("09:30", "15:45")
+    assert len(out) == 2
+    assert out["high"].iloc[0] == rth.loc["2024-03-04", "high"].max()
+
+def test_incremental_matches_full_resample():
+    df = _session_bars(3)
+    r = HTFResampler("15m", "2h")
+    for cut in range(40, len(df), 5):
+        pd.testing.assert_frame_equal(r.get("X", df.iloc[:cut]), resample_session(df.iloc[:cut], "15m", "2h"))
+
+def test_can_resample():
+    assert can_resample("15m", "60m") and can_resample("15m", "2h") and can_resample("15m", "1d")
+    assert not can_resample("15m", "25m") and not can_resample("60m", "15m")
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+from src.backtest import engine as eng
+from src.bar_store import HAVE_PARQUET
+from src.config import load_config
+from conftest import bar_index, ohlcv
+
+pytestmark = pytest.mark.skipif(not HAVE_PARQUET, reason="pyarrow not installed")
+
+def _bars(seed, n=900):
+    return ohlcv(bar_index(n, hours="24h"), seed, drift=3e-4, wick=3e-3, fixed_wick=True)
+
+def test_only_changed_symbols_are_resimulated(tmp_path, monkeypatch):
+    cfg = load_config("config.yaml")
+    cfg.backtest.result_cache_dir = str(tmp_path)
+    frames = {f"S{k}": _bars(k) for k in range(3)}
+    monkeypatch.setattr(eng, "download_ohlc_many", lambda syms, *a, **k: {s: frames[s] for s in syms})
+    calls = []
+    real = eng.BacktestEngine.simulate_symbol
+    monkeypatch.setattr(eng.BacktestEngine, "simulate_symbol", lambda self, sym, *a, **k: calls.append(sym) or real(self, sym, *a, **k))
+    bt = eng.BacktestEngine(cfg, None)
+    first = bt.run(list(frames), "2024-01-05", "2024-12-31")
+    assert calls == ["S0", "S1", "S2"]
+
+    calls.clear()
+    again = bt.run(list(frames), "2024-01-05", "2024-12-31")
+    assert calls == []
+    pd.testing.assert_series_equal(again[0], first[0], check_freq=False)
+    pd.testing.assert_frame_equal(again[1], first[1])
+    assert again[2] == first[2]
+
+    frames["S1"] = frames["S1"].iloc[:-5]   # new bars for one symbol
+    frames["S3"] = _bars(3)                # and a new ticker
+    bt.run(list(frames), "2024-01-05", "2024-12-31")
+    assert calls == ["S1", "S3"]
+
+    calls.clear()
+    cfg.risk.atr_k_stop = 2.0
+    bt.run(list(frames), "2024-01-05", "2024-12-31")
+    assert calls == ["S0", "S1", "S2", "S3"]
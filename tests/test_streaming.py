@@ -0,0 +1,52 @@
+import json
+import numpy as np
+import pandas as pd
+from src.config import load_config
+from src.indicators import ema, rsi, atr, adx, ema_slope_bps
+from src.strategy import compute_signals, Signal, SignalStream
+from src.streaming import ADXState, ATRState, EMAState, RSIState, SlopeState
+
+def _random_walk(n=1500, seed=3):
+    rng = np.random.default_rng(seed)
+    c = 100 * np.exp(np.cumsum(rng.normal(0, 2e-3, n)))
+    c[200:230] = c[200]   # flat stretch: zero ranges / zero losses
+    h = c * (1 + rng.uniform(0, 2e-3, n))
+    lo = c * (1 - rng.uniform(0, 2e-3, n))
+    h[200:230] = lo[200:230] = c[200]
+    idx = pd.date_range("2024-01-02 09:30", periods=n, freq="15min", tz="America/New_York")
+    return pd.DataFrame({"open": c, "high": h, "low": lo, "close": c, "volume": 1e6}, index=idx)
+
+def _feed(state, df, fn):
+    return np.array([fn(state, row) for row in df.itertuples()])
+
+def test_stream_states_match_batch_exactly():
+    df = _random_walk()
+    e = _feed(EMAState(21), df, lambda s, r: s.update(r.close))
+    assert np.array_equal(e, ema(df["close"], 21).to_numpy(), equal_nan=True)
+    r = _feed(RSIState(14), df, lambda s, r: s.update(r.close))
+    assert np.array_equal(r, rsi(df["close"], 14).to_numpy(), equal_nan=True)
+    a = _feed(ATRState(14), df, lambda s, r: s.update(r.high, r.low, r.close))
+    assert np.array_equal(a, atr(df, 14).to_numpy(), equal_nan=True)
+    d = np.array(_feed(ADXState(14), df, lambda s, r: s.update(r.high, r.low, r.close)))
+    for k, ref in enumerate(adx(df, 14)):
+        assert np.array_equal(d[:, k], ref.to_numpy(), equal_nan=True)
+    sl = SlopeState(3)
+    s = np.array([sl.update(v) for v in e])
+    assert np.array_equal(s, ema_slope_bps(ema(df["close"], 21), 3).to_numpy(), equal_nan=True)
+
+def test_signal_stream_matches_compute_signals_and_roundtrips():
+    cfg = load_config("config.yaml")
+    cfg.strategy.adx_min, cfg.strategy.ema_slope_bps = 10, 0   # make LONGs common enough to matter
+    df = _random_walk()
+    batch = compute_signals(df, cfg)
+    stream = SignalStream(cfg)
+    stream.update_frame(df.iloc[:1000])
+    stream = SignalStream.from_dict(json.loads(json.dumps(stream.to_dict())))
+    body = df.iloc[1000:-1]
+    got = [stream.update(ts, r.high, r.low, r.close) for ts, r in zip(body.index, body.itertuples())]
+    assert got == batch.iloc[1000:-1].tolist()
+    assert Signal.LONG in got
+    assert batch.dtype == np.int8 and Signal.labels(batch).isin(["NONE", "LONG"]).all()
+    last = df.iloc[-1]
+    assert stream.peek(df.index[-1], last["high"], last["low"], last["close"]) == batch.iloc[-1]
+    assert stream.last_ts == df.index[-2]   # peek did not commit
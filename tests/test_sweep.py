@@ -0,0 +1,36 @@
+import pandas as pd
+import pytest
+from src.backtest import engine as eng
+from src.backtest.sweep import SweepRunner, expand_grid
+from src.config import load_config
+from conftest import bar_index, ohlcv
+
+def _frames():
+    return {f"S{k}": ohlcv(bar_index(900 - 100 * k, hours="24h"), k, drift=3e-4, wick=3e-3, fixed_wick=True)
+            for k in range(3)}
+
+def test_expand_grid_rejects_unknown_keys():
+    assert len(expand_grid({"ema_fast": [5, 9], "adx_min": [10, 20, 30]})) == 6
+    with pytest.raises(ValueError):
+        expand_grid({"atr_len": [14]})
+
+def test_rows_match_backtest_run(monkeypatch):
+    frames = _frames()
+    monkeypatch.setattr(eng, "download_ohlc_many", lambda syms, *a, **k: {s: frames[s] for s in syms})
+    cfg = load_config("config.yaml")
+    cfg.backtest.result_cache_dir = ""
+    combos = expand_grid({"ema_fast": [5, 9], "ema_slow": [21], "adx_min": [10, 20], "ema_slope_bps": [0, 5]})
+    runner = SweepRunner(cfg, frames, "2024-01-05")
+    table = runner.run(combos)
+    assert len(table) == 8 and table["sharpe"].is_monotonic_decreasing
+    assert runner.indicators_computed == 3 * 7  # EMA 5/9/21, slope of EMA 5/9, ADX, RSI per symbol
+    for params in combos[:3]:
+        c = cfg.model_copy(deep=True)
+        for k, v in params.items():
+            setattr(c.strategy, k, v)
+        eq, tl, _ = eng.BacktestEngine(c, None).run(list(frames), "2024-01-05", "2024-12-31")
+        row = table.loc[(table[list(params)] == pd.Series(params)).all(axis=1)].iloc[0]
+        assert row["trades"] == len(tl)
+        assert row["net_pnl"] == pytest.approx(eq.iloc[-1] - 1.0, rel=1e-12, abs=1e-15)
+        assert row["sharpe"] == pytest.approx(eng._sharpe_from_equity(eq), rel=1e-9)
+        assert row["maxdd"] == pytest.approx(eng._max_drawdown(eq), rel=1e-12)
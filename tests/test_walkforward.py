@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.backtest.walkforward import make_windows, run_walk_forward
+from src.config import load_config
+from conftest import bar_index, ohlcv
+
+def _frames(sessions=120):
+    idx = bar_index(sessions=sessions)
+    return {f"S{k}": ohlcv(idx, k, drift=2e-4, wick=3e-3, fixed_wick=True) for k in range(3)}
+
+def test_make_windows_slide_and_reject_overlap():
+    w = make_windows("2024-01-01", "2024-06-30", train_days=60, test_days=30)
+    assert len(w) == 4
+    assert all(b == c for _, b, c, _ in w) and w[1][0] - w[0][0] == pd.Timedelta(days=30)
+    with pytest.raises(ValueError):
+        make_windows("2024-01-01", "2024-06-30", 60, 30, step_days=10)
+
+def test_walk_forward_parallel_matches_serial_and_stitches():
+    cfg = load_config("config.yaml")
+    frames = _frames()
+    grid = {"ema_fast": [5, 9], "adx_min": [10, 20]}
+    args = (cfg, list(frames), "2024-01-10", "2024-06-14", grid, 40, 20)
+    serial = run_walk_forward(*args, frames=frames)
+    par = run_walk_forward(*args, workers=2, frames=frames)
+    pd.testing.assert_frame_equal(par.windows, serial.windows)
+    pd.testing.assert_series_equal(par.equity, serial.equity)
+    w = serial.windows
+    assert len(w) >= 5 and set(w["ema_fast"]) <= {5, 9}
+    assert serial.equity.index.is_monotonic_increasing
+    assert serial.equity.iloc[-1] == pytest.approx(np.prod(1 + w["test_net_pnl"]), rel=1e-12)
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from src.config import load_config
+from src.warmup import ema_bars, fetch_start, plan_fetch_starts, signal_warmup_bars
+
+def test_ema_bars_meets_tolerance():
+    for n in (9, 21, 200):
+        k = ema_bars(n, 0.01)
+        x = np.zeros(k + 1)
+        x[0] = 1.0  # seed weight after k bars of zeros
+        w = pd.Series(x).ewm(span=n, adjust=False).mean()
+        assert w.iloc[k] < 0.01 <= w.iloc[k - 1]
+
+def test_fetch_start_counts_sessions():
+    # 150 x 15m RTH bars = 6 sessions (26 bars each) + holiday pad + current session
+    start = fetch_start("2024-03-15", 150, "15m")
+    assert start.tz is not None and start.weekday() < 5
+    assert len(pd.bdate_range(start.tz_localize(None), "2024-03-14")) == 8
+
+def test_plan_covers_htf_when_resampled():
+    cfg = load_config("config.yaml")
+    starts = plan_fetch_starts(cfg, "2024-06-28")
+    assert starts["base"] == starts["htf"] < fetch_start("2024-06-28", signal_warmup_bars(cfg), "15m")
+    cfg.strategy.htf_align_required = False
+    assert plan_fetch_starts(cfg, "2024-06-28")["base"] > starts["base"]